@@ -0,0 +1,121 @@
+"""
+Many vacuum worlds stepped at once with NumPy.
+
+BatchEnvironment holds N grids of the same size as one boolean array
+(True = dirty), with the agent positions and performance scores as arrays.
+step() applies one action per world in a single vectorized call, with the
+same scoring as Environment: +10 for cleaning a dirty cell, -1 for cleaning
+a clean one, -1 per move and -5 for bumping into a wall. Nothing is printed.
+"""
+import time
+
+import numpy as np
+
+NOOP, CLEAN, UP, DOWN, LEFT, RIGHT = range(6)
+
+
+class BatchEnvironment:
+    """N vacuum worlds of width x height, stepped together."""
+
+    def __init__(self, count, width, height, seed=None):
+        """
+        Args:
+            count (int): Number of worlds.
+            width (int): Columns of every grid.
+            height (int): Rows of every grid.
+            seed: Seed for the random dirt and starting positions.
+        """
+        rng = np.random.default_rng(seed)
+        self.width = width
+        self.height = height
+        self.dirty = rng.random((count, height, width)) < 0.5
+        self.agent_x = rng.integers(0, width, count)
+        self.agent_y = rng.integers(0, height, count)
+        self.performance = np.zeros(count, dtype=np.int64)
+        self.rng = rng
+
+    @classmethod
+    def from_environments(cls, environments, seed=None):
+        """Batches copies of existing Environment objects, which must all have the same size."""
+        width, height = environments[0].width, environments[0].height
+        if any(env.width != width or env.height != height for env in environments):
+            raise ValueError("All environments must have the same width and height")
+        batch = cls(0, width, height, seed)
+        batch.dirty = np.array([env.grid for env in environments], dtype=bool).reshape(-1, height, width)
+        batch.agent_x = np.array([env.agent_x for env in environments], dtype=np.int64)
+        batch.agent_y = np.array([env.agent_y for env in environments], dtype=np.int64)
+        batch.performance = np.array([env.performance for env in environments], dtype=np.int64)
+        return batch
+
+    def __len__(self):
+        return len(self.performance)
+
+    def current_dirty(self):
+        """Whether each agent's own cell is dirty."""
+        return self.dirty[np.arange(len(self)), self.agent_y, self.agent_x]
+
+    def step(self, actions):
+        """Applies one action code per world (NOOP, CLEAN, UP, DOWN, LEFT or RIGHT)."""
+        actions = np.asarray(actions)
+        x, y = self.agent_x, self.agent_y
+        worlds = np.arange(len(self))
+
+        cleaning = actions == CLEAN
+        was_dirty = cleaning & self.dirty[worlds, y, x]
+        self.dirty[worlds[was_dirty], y[was_dirty], x[was_dirty]] = False
+        self.performance += np.where(was_dirty, 10, 0) - (cleaning & ~was_dirty)
+
+        up = (actions == UP) & (y > 0)
+        down = (actions == DOWN) & (y < self.height - 1)
+        left = (actions == LEFT) & (x > 0)
+        right = (actions == RIGHT) & (x < self.width - 1)
+        moved = up | down | left | right
+        bumped = (actions >= UP) & ~moved
+        y += down.astype(y.dtype) - up
+        x += right.astype(x.dtype) - left
+        self.performance -= moved + 5 * bumped
+
+    def reflex_actions(self):
+        """Simple reflex policy: clean a dirty cell, otherwise move in a random direction."""
+        moves = self.rng.integers(UP, RIGHT + 1, len(self))
+        return np.where(self.current_dirty(), CLEAN, moves)
+
+    def deliberate_actions(self):
+        """
+        Policy of Agent.scanning_agent (the original deliberate agent): head
+        for the first dirty cell in row-major order, x first then y, and clean
+        it on arrival. Worlds with no dirt left do nothing.
+        """
+        flat = self.dirty.reshape(len(self), -1)
+        any_dirty = flat.any(axis=1)
+        target = flat.argmax(axis=1)
+        dx = target % self.width - self.agent_x
+        dy = target // self.width - self.agent_y
+        actions = np.select([dx > 0, dx < 0, dy > 0, dy < 0], [RIGHT, LEFT, DOWN, UP], CLEAN)
+        return np.where(any_dirty, actions, NOOP)
+
+    def run(self, policy, steps):
+        """
+        Runs 'policy' ('reflex' or 'deliberate') for 'steps' steps in every world.
+        Returns the throughput in environment-steps per second.
+        """
+        choose = {'reflex': self.reflex_actions, 'deliberate': self.deliberate_actions}[policy]
+        started = time.perf_counter()
+        for _ in range(steps):
+            self.step(choose())
+        elapsed = time.perf_counter() - started
+        return len(self) * steps / elapsed if elapsed else float('inf')
+
+
+if __name__ == '__main__':
+    import sys
+
+    # python BatchEnvironment.py [worlds] [steps]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    for policy in ('reflex', 'deliberate'):
+        batch = BatchEnvironment(count, 5, 4, seed=1)
+        rate = batch.run(policy, steps)
+        print(f"{policy}: {count} worlds x {steps} steps, {rate:,.0f} env-steps/s, "
+              f"mean performance {batch.performance.mean():.2f}, "
+              f"{batch.dirty.any(axis=(1, 2)).sum()} worlds still dirty")
@@ -0,0 +1,162 @@
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+from Puzzle import SearchBudget, SearchLimitExceeded, ida_star_search, is_solvable, solve_8_puzzle
+
+
+def default_goal(size):
+    """Tiles 1..n-1 in row-major order with the blank last."""
+    return to_rows(list(range(1, size * size)) + [0])
+
+
+def to_rows(board):
+    """Accepts a flat list or a list of rows and returns a tuple of row tuples."""
+    if board and isinstance(board[0], (list, tuple)):
+        return tuple(tuple(row) for row in board)
+    size = int(len(board)**0.5)
+    return tuple(tuple(board[r * size:(r + 1) * size]) for r in range(size))
+
+
+def solve_instance(task):
+    """
+    Worker entry point. 'task' is (instance dict, options dict); returns a result
+    dict ready to be written as one JSON line.
+    """
+    instance, options = task
+    result = {'id': instance.get('id')}
+    started = time.perf_counter()
+    if 'error' in instance:
+        # A line read_instances could not parse
+        result.update(status='error', error=instance['error'], seconds=0.0)
+        return result
+    try:
+        board = to_rows(instance['board'])
+        goal = to_rows(instance['goal']) if instance.get('goal') else default_goal(len(board))
+        solver = instance.get('solver', options['solver'])
+        budget = SearchBudget(options.get('max_nodes'), options.get('time_limit'))
+
+        if not is_solvable(board, goal):
+            result['status'] = 'unsolvable'
+        else:
+            if solver == 'ida':
+                path, _ = ida_star_search(board, goal, budget=budget)
+            else:
+                path = solve_8_puzzle(board, goal, packed=len(board) <= 4, budget=budget)
+            result['status'] = 'solved'
+            result['moves'] = [move for move, _ in path]
+            result['length'] = len(path)
+        result['nodes'] = budget.nodes
+    except SearchLimitExceeded as e:
+        result['status'] = 'limit'
+        result['error'] = str(e)
+        result['nodes'] = budget.nodes
+    except (KeyError, ValueError, TypeError) as e:
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - started, 6)
+    return result
+
+
+def read_instances(lines):
+    """
+    Parses JSON lines lazily, skipping blank lines; assigns ids by line number
+    if missing. A line that is not a JSON object becomes {'id': line number,
+    'error': message}, which solve_instance reports as an error result.
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            instance = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {'id': number, 'error': f"line {number}: JSONDecodeError: {e}"}
+            continue
+        if not isinstance(instance, dict):
+            yield {'id': number, 'error': f"line {number}: expected a JSON object, got {type(instance).__name__}"}
+            continue
+        instance.setdefault('id', number)
+        yield instance
+
+
+def solve_batch(instances, workers=None, chunksize=1, solver='astar', max_nodes=None, time_limit=None):
+    """
+    Solves instances on a process pool and yields result dicts in completion
+    order, so callers can stream them while the rest are still running.
+    """
+    options = {'solver': solver, 'max_nodes': max_nodes, 'time_limit': time_limit}
+    tasks = ((instance, options) for instance in instances)
+    if workers == 1:
+        for task in tasks:
+            yield solve_instance(task)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(solve_instance, tasks, chunksize):
+            yield result
+
+
+def generate_instances(count, size=3, depth=30, seed=0):
+    """Random boards made by 'depth' random blank moves from the goal (never undoing the last one)."""
+    rng = random.Random(seed)
+    goal = [value for row in default_goal(size) for value in row]
+    for number in range(count):
+        board = goal[:]
+        blank = board.index(0)
+        previous = None
+        for _ in range(depth):
+            row, col = divmod(blank, size)
+            options = [r * size + c for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+                       if 0 <= r < size and 0 <= c < size and r * size + c != previous]
+            target = rng.choice(options)
+            board[blank], board[target] = board[target], 0
+            previous, blank = blank, target
+        yield {'id': number, 'board': [board[r * size:(r + 1) * size] for r in range(size)]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve sliding-puzzle instances from a JSON-lines file in parallel.")
+    parser.add_argument('input', nargs='?', default='-', help="JSON-lines instances ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="JSON-lines results ('-' for stdout)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('-c', '--chunksize', type=int, default=4, help="instances sent to a worker at a time")
+    parser.add_argument('--solver', choices=['astar', 'ida'], default='astar')
+    parser.add_argument('--max-nodes', type=int, default=None, help="per-instance node limit")
+    parser.add_argument('--time-limit', type=float, default=None, help="per-instance time limit in seconds")
+    parser.add_argument('--generate', type=int, metavar='COUNT',
+                        help="write COUNT random instances to the output instead of solving")
+    parser.add_argument('--size', type=int, default=3, help="board size for --generate")
+    parser.add_argument('--depth', type=int, default=30, help="scramble depth for --generate")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for --generate")
+    args = parser.parse_args(argv)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        if args.generate is not None:
+            for instance in generate_instances(args.generate, args.size, args.depth, args.seed):
+                output.write(json.dumps(instance) + '\n')
+            return 0
+
+        source = sys.stdin if args.input == '-' else open(args.input)
+        started = time.perf_counter()
+        count = 0
+        with source:
+            for result in solve_batch(read_instances(source), args.workers, args.chunksize,
+                                      args.solver, args.max_nodes, args.time_limit):
+                output.write(json.dumps(result) + '\n')
+                output.flush()
+                count += 1
+        elapsed = time.perf_counter() - started
+        print(f"Processed {count} instances in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.1f}/s) "
+              f"with {args.workers or multiprocessing.cpu_count()} workers", file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
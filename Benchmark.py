@@ -0,0 +1,319 @@
+"""
+Reproducible benchmarks for the solvers in this directory.
+
+    python Benchmark.py -o results.json                 # run everything
+    python Benchmark.py --quick --only puzzle           # fewer repetitions, a subset
+    python Benchmark.py --baseline baseline.json        # flag regressions against a saved run
+
+Every instance is generated from a fixed seed, each case is warmed up and
+then timed over several repetitions, and peak memory is measured in a
+separate tracemalloc run so that it does not distort the timings.
+"""
+import argparse
+import importlib.machinery
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+
+def load_script(filename):
+    """Imports a file of this directory that is not a valid module name (e.g. '8queen', 'BFS.Py')."""
+    name = '_bench_' + ''.join(c if c.isalnum() else '_' for c in filename)
+    loader = importlib.machinery.SourceFileLoader(name, os.path.join(HERE, filename))
+    spec = importlib.util.spec_from_loader(name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+# ---------------------------------------------------------------- generators
+
+def scrambled_board(size, depth, rng):
+    """Random walk of 'depth' blank moves from the goal that never undoes the previous move."""
+    board = list(range(1, size * size)) + [0]
+    blank = size * size - 1
+    previous = None
+    for _ in range(depth):
+        row, col = divmod(blank, size)
+        options = [r * size + c for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+                   if 0 <= r < size and 0 <= c < size and r * size + c != previous]
+        target = rng.choice(options)
+        board[blank], board[target] = board[target], 0
+        previous, blank = blank, target
+    return board
+
+
+def puzzles_at_depth(size, depth, count, seed):
+    """'count' boards whose optimal solution length is exactly 'depth' (checked with IDA*)."""
+    from Puzzle import ida_star_search
+    rng = random.Random(seed)
+    goal = tuple(tuple(range(r * size + 1, r * size + size + 1)) for r in range(size))
+    goal = goal[:-1] + (goal[-1][:-1] + (0,),)
+    boards = []
+    walk = depth
+    while len(boards) < count:
+        board = scrambled_board(size, walk, rng)
+        rows = tuple(tuple(board[r * size:(r + 1) * size]) for r in range(size))
+        path, _ = ida_star_search(rows, goal)
+        if len(path) == depth:
+            boards.append(rows)
+        elif len(path) < depth:
+            walk += 1  # Random walks fold back on themselves; walk further
+    return boards, goal
+
+
+def random_graph(nodes, edges, seed, max_cost=10):
+    """Directed dict-of-dicts graph with a Hamiltonian cycle, so every query has a path."""
+    rng = random.Random(seed)
+    graph = {i: {} for i in range(nodes)}
+    for i in range(nodes):
+        graph[i][(i + 1) % nodes] = rng.randint(1, max_cost)
+    for _ in range(edges - nodes):
+        graph[rng.randrange(nodes)][rng.randrange(nodes)] = rng.randint(1, max_cost)
+    return graph
+
+
+def weighted_grid(side, seed, max_cost=10):
+    from Node import grid_graph
+    rng = random.Random(seed)
+    graph = grid_graph(side, side)
+    for neighbors in graph.values():
+        for neighbor in neighbors:
+            neighbors[neighbor] = rng.randint(1, max_cost)
+    return graph
+
+
+# ---------------------------------------------------------------- cases
+
+def case_puzzle(size, depth, solver, count=5):
+    def setup():
+        from Puzzle import ida_star_search, solve_8_puzzle
+        boards, goal = puzzles_at_depth(size, depth, count, seed=size * 1000 + depth)
+        if solver == 'astar':
+            return lambda: [solve_8_puzzle(board, goal) for board in boards]
+        if solver == 'packed':
+            return lambda: [solve_8_puzzle(board, goal, packed=True) for board in boards]
+        return lambda: [ida_star_search(board, goal) for board in boards]
+    return setup
+
+
+def case_puzzlenode(depth, count=5):
+    def setup():
+        from PuzzleNode import a_star_search
+        boards, goal = puzzles_at_depth(3, depth, count, seed=3000 + depth)
+        boards = [[list(row) for row in board] for board in boards]
+        goal = [list(row) for row in goal]
+        return lambda: [a_star_search(board, goal) for board in boards]
+    return setup
+
+
+def case_bfs_py(depth, count=3):
+    def setup():
+        module = load_script('BFS.Py')
+        boards, _ = puzzles_at_depth(3, depth, count, seed=4000 + depth)
+        states = [[value for row in board for value in row] for board in boards]
+        return lambda: [module.breadth_first_search(module.BFS(board[:], divmod(board.index(0), 3)))
+                        for board in states]
+    return setup
+
+
+def case_node_astar(graph_factory, queries=10):
+    def setup():
+        from Node import a_star
+        graph = graph_factory()
+        rng = random.Random(7)
+        nodes = list(graph)
+        pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+        return lambda: [a_star(graph, s, t, lambda node: 0) for s, t in pairs]
+    return setup
+
+
+def case_graph_bfs(nodes, edges, csr=False, queries=10):
+    def setup():
+        from Graph import Graph
+        source = random_graph(nodes, edges, seed=nodes)
+        graph = Graph()
+        for node, neighbors in source.items():
+            graph.add_edge(node, list(neighbors.items()))
+        if csr:
+            graph = graph.to_csr()
+        rng = random.Random(11)
+        pairs = [(rng.randrange(nodes), rng.randrange(nodes)) for _ in range(queries)]
+        return lambda: [graph.breadth_first_search(s, t) for s, t in pairs]
+    return setup
+
+
+def case_queens(n):
+    def setup():
+        module = load_script('8queen')
+
+        def run():
+            board = [[0] * n for _ in range(n)]
+            return module.solve_n_queens_util(board, 0)
+        return run
+    return setup
+
+
+def case_nqueens(n, count=False):
+    def setup():
+        from NQueens import count_solutions, first_solution
+        return (lambda: count_solutions(n)) if count else (lambda: first_solution(n))
+    return setup
+
+
+def case_min_conflicts(n):
+    def setup():
+        from NQueens import min_conflicts
+        return lambda: min_conflicts(n, seed=n)
+    return setup
+
+
+def case_cryptarithmetic(words, result):
+    def setup():
+        module = load_script('cript arthemetic.py')
+        return lambda: module.solve_columnwise(words, result, all_solutions=True)
+    return setup
+
+
+def case_game(depth):
+    def setup():
+        from GameSearch import ConnectFour, Searcher
+        return lambda: Searcher(ConnectFour([3, 3, 2])).search(max_depth=depth)
+    return setup
+
+
+def case_map_coloring(width, height, colors=4):
+    def setup():
+        from MapColoring import MapColoring, planar_map
+        states, neighbors = planar_map(width, height, seed=width * height)
+        palette = ['Red', 'Green', 'Blue', 'Yellow'][:colors]
+        return lambda: MapColoring(states, neighbors, palette).get_coloring()
+    return setup
+
+
+CASES = {
+    'puzzle8_astar_d20': case_puzzle(3, 20, 'astar'),
+    'puzzle8_packed_d20': case_puzzle(3, 20, 'packed'),
+    'puzzle8_ida_d20': case_puzzle(3, 20, 'ida'),
+    'puzzle15_packed_d24': case_puzzle(4, 24, 'packed', count=3),
+    'puzzle15_ida_d36': case_puzzle(4, 36, 'ida', count=3),
+    'puzzlenode_astar_d18': case_puzzlenode(18),
+    'bfs_py_d16': case_bfs_py(16),
+    'node_astar_grid100': case_node_astar(lambda: weighted_grid(100, seed=100)),
+    'node_astar_random10k': case_node_astar(lambda: random_graph(10000, 40000, seed=10000)),
+    'graph_bfs_random20k': case_graph_bfs(20000, 80000),
+    'csr_bfs_random20k': case_graph_bfs(20000, 80000, csr=True),
+    'queens_8': case_queens(8),
+    'queens_12': case_queens(12),
+    'queens_16': case_queens(16),
+    'nqueens_first_16': case_nqueens(16),
+    'nqueens_first_24': case_nqueens(24),
+    'nqueens_count_12': case_nqueens(12, count=True),
+    'min_conflicts_100k': case_min_conflicts(100000),
+    'crypt_send_more_money': case_cryptarithmetic(['SEND', 'MORE'], 'MONEY'),
+    'crypt_ten_letters': case_cryptarithmetic(['CROSS', 'ROADS'], 'DANGER'),
+    'connect_four_d8': case_game(8),
+    'map_coloring_6x6': case_map_coloring(6, 6),
+    'map_coloring_7x7': case_map_coloring(7, 7),
+    'map_coloring_32x32': case_map_coloring(32, 32),
+    'map_coloring_70x70': case_map_coloring(70, 70),
+}
+
+
+# ---------------------------------------------------------------- runner
+
+def measure(setup, warmup, repetitions):
+    run = setup()
+    for _ in range(warmup):
+        run()
+    times = []
+    for _ in range(repetitions):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'median': statistics.median(times),
+        'min': min(times),
+        'mean': statistics.fmean(times),
+        'repetitions': repetitions,
+        'peak_memory': peak,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Returns (name, baseline median, new median, ratio) for every case slower than threshold allows."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        ratio = result['median'] / previous['median'] if previous['median'] else float('inf')
+        if ratio > 1 + threshold:
+            regressions.append((name, previous['median'], result['median'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the solver benchmarks.")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="where to write the JSON results")
+    parser.add_argument('--only', action='append', default=[], help="run cases whose name contains this text")
+    parser.add_argument('--quick', action='store_true', help="1 warm-up run and 3 repetitions")
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--baseline', help="results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.warmup, args.repetitions = 1, 3
+
+    selected = [name for name in CASES if not args.only or any(text in name for text in args.only)]
+    results = {}
+    for name in selected:
+        result = measure(CASES[name], args.warmup, args.repetitions)
+        results[name] = result
+        print(f"{name:24} median {result['median'] * 1000:10.2f} ms   min {result['min'] * 1000:10.2f} ms   "
+              f"peak {result['peak_memory'] / 1024:10.0f} KiB")
+
+    document = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'warmup': args.warmup,
+            'repetitions': args.repetitions,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
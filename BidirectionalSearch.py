@@ -0,0 +1,110 @@
+from collections import deque
+
+from SearchStats import instrumented
+
+
+def reconstruct(parents, state):
+    """Walks a parent map back from 'state' to the root; returns root..state."""
+    path = []
+    while state is not None:
+        path.append(state)
+        state = parents[state]
+    path.reverse()
+    return path
+
+
+@instrumented
+def breadth_first_search(start, goal, successors, stats=None):
+    """
+    Plain forward BFS with a parent map, for comparison.
+
+    Returns:
+    - path: list of states from start to goal, or None if no path exists.
+    - stats: {'expanded': number of states whose successors were generated}.
+
+    A SearchStats passed as 'stats' receives the full counters as well.
+    """
+    parents = {start: None}
+    queue = deque([start])
+    expanded = 0
+
+    while queue:
+        state = queue.popleft()
+        if state == goal:
+            return reconstruct(parents, state), {'expanded': expanded}
+        expanded += 1
+        if stats:
+            stats.expand(len(queue) + 1, state)
+        for neighbor in successors(state):
+            if neighbor not in parents:
+                parents[neighbor] = state
+                queue.append(neighbor)
+                if stats:
+                    stats.generate()
+            elif stats:
+                stats.duplicate()
+
+    return None, {'expanded': expanded}
+
+
+@instrumented
+def bidirectional_bfs(start, goal, successors, predecessors=None, stats=None):
+    """
+    Level-synchronous bidirectional BFS. Each round expands one whole level of
+    the smaller frontier, so the first state seen by both sides lies on a
+    shortest path.
+
+    Args:
+        start, goal: Hashable states.
+        successors: Function returning the states reachable in one step.
+        predecessors: Function returning the states that reach a state in one
+                      step. Defaults to 'successors' for reversible problems.
+        stats: Optional SearchStats that receives the full counters.
+
+    Returns:
+    - path: list of states from start to goal, or None if no path exists.
+    - stats: {'expanded': number of states whose neighbors were generated}.
+    """
+    if start == goal:
+        return [start], {'expanded': 0}
+    predecessors = predecessors or successors
+
+    forward_parents = {start: None}
+    backward_parents = {goal: None}
+    forward_frontier = [start]
+    backward_frontier = [goal]
+    expanded = 0
+
+    while forward_frontier and backward_frontier:
+        forward = len(forward_frontier) <= len(backward_frontier)
+        if forward:
+            frontier, parents, others, expand = forward_frontier, forward_parents, backward_parents, successors
+        else:
+            frontier, parents, others, expand = backward_frontier, backward_parents, forward_parents, predecessors
+
+        next_frontier = []
+        for state in frontier:
+            expanded += 1
+            if stats:
+                stats.expand(len(forward_frontier) + len(backward_frontier) + len(next_frontier), state)
+            for neighbor in expand(state):
+                if neighbor in parents:
+                    if stats:
+                        stats.duplicate()
+                    continue
+                parents[neighbor] = state
+                if stats:
+                    stats.generate()
+                if neighbor in others:
+                    # Forward half runs start..meeting, backward half meeting..goal
+                    path = reconstruct(forward_parents, neighbor)
+                    path.extend(reversed(reconstruct(backward_parents, neighbor)[:-1]))
+                    return path, {'expanded': expanded}
+                next_frontier.append(neighbor)
+
+        if forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None, {'expanded': expanded}
@@ -0,0 +1,316 @@
+import heapq
+import operator
+import random
+from collections import deque
+
+from SearchStats import instrumented
+
+RESTART = object()  # Returned by a search run that hit its failure limit
+RESTART_FAILURES = 100  # Failed values allowed per unit of the Luby restart sequence
+
+
+def luby(i):
+    """i-th term (from 1) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ..."""
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    if (1 << k) - 1 == i:
+        return 1 << (k - 1)
+    return luby(i - (1 << (k - 1)) + 1)
+
+
+class CSP:
+    """
+    Binary constraint satisfaction problem with bitset domains.
+
+    Every variable's domain is an int whose bit k stands for its k-th value.
+    A constraint between x and y is stored as supports: for each value index
+    of x, the bitmask of y's values compatible with it. Removing values,
+    testing for an empty domain and revising an arc are then bit operations.
+
+    solve() is backtracking with:
+    - MRV variable ordering, ties broken by conflict weight (domain wipeouts the
+      variable took part in) and then by degree (most unassigned neighbours)
+    - least-constraining-value ordering
+    - forward checking, or maintained arc consistency (AC-3) with inference='mac'
+    - conflict-directed backjumping over the levels that pruned a failed variable
+    - randomized restarts on the Luby schedule
+    """
+
+    def __init__(self, variables, domains, verbose=False):
+        """
+        Args:
+            variables: Hashable variable names.
+            domains: A dict {variable: values}, or one list of values shared by all variables.
+            verbose: Print every assignment and backjump.
+        """
+        self.variables = list(variables)
+        self.index = {var: i for i, var in enumerate(self.variables)}
+        if isinstance(domains, dict):
+            self.values = [list(domains[var]) for var in self.variables]
+        else:
+            self.values = [list(domains) for _ in self.variables]
+        self.arcs = [{} for _ in self.variables]  # arcs[i][j] = supports of j for each value of i
+        self.verbose = verbose
+
+    def add_constraint(self, x, y, relation):
+        """Constrains x and y to value pairs for which relation(x_value, y_value) is true."""
+        i, j = self.index[x], self.index[y]
+        if i == j:
+            raise ValueError(f"Constraint between {x!r} and itself")
+        forward = [sum(1 << b for b, w in enumerate(self.values[j]) if relation(v, w)) for v in self.values[i]]
+        backward = [sum(1 << a for a, v in enumerate(self.values[i]) if relation(v, w)) for w in self.values[j]]
+        self._intersect(i, j, forward)
+        self._intersect(j, i, backward)
+
+    def add_different(self, x, y):
+        self.add_constraint(x, y, operator.ne)
+
+    def _intersect(self, i, j, supports):
+        existing = self.arcs[i].get(j)
+        self.arcs[i][j] = supports if existing is None else [a & b for a, b in zip(existing, supports)]
+
+    def _revise_all(self, domains, pruned_by, queue, assigned, trail, level_bit):
+        """
+        AC-3 from the variables in 'queue', whose domains just shrank. Returns
+        None, or the conflict set (levels as bits) of a variable left without values.
+        """
+        arcs = self.arcs
+        queued = set(queue)
+        while queue:
+            y = queue.popleft()
+            queued.discard(y)
+            domain_y = domains[y]
+            for z, supports in arcs[y].items():
+                if assigned[z] >= 0:
+                    continue
+                # arcs[z][y] gives, for each value of z, its supports in y
+                support_of_z = arcs[z][y]
+                old = domains[z]
+                new = old
+                rest = old
+                while rest:
+                    bit = rest & -rest
+                    rest ^= bit
+                    if not support_of_z[bit.bit_length() - 1] & domain_y:
+                        new ^= bit
+                if new != old:
+                    trail.append((z, old, pruned_by[z]))
+                    domains[z] = new
+                    pruned_by[z] |= pruned_by[y] | level_bit
+                    if not new:
+                        return pruned_by[z]
+                    if z not in queued:
+                        queued.add(z)
+                        queue.append(z)
+        return None
+
+    @instrumented
+    def solve(self, inference='forward', backjumping=True, assigned=None, restarts=True, seed=0, stats=None):
+        """
+        Finds one solution.
+
+        Args:
+            inference: 'forward' (forward checking) or 'mac' (AC-3 after every assignment).
+            backjumping: Jump back to the deepest level in the conflict set instead of the previous one.
+            assigned: Optional {variable: value} that must be kept.
+            restarts: Restart with randomly broken MRV ties after a Luby-sequence number of failures.
+                      Conflict weights survive restarts, so later runs branch on the hard region first.
+            seed: Seed for the restart tie-breaking.
+            stats: Optional SearchStats: one expansion per variable chosen, one generated node per value tried.
+
+        Returns:
+            {variable: value}, or None if there is no solution.
+        """
+        if inference not in ('forward', 'mac'):
+            raise ValueError(f"Unknown inference {inference!r}")
+        mac = inference == 'mac'
+        n = len(self.variables)
+        domains = [(1 << len(v)) - 1 for v in self.values]
+        for var, value in (assigned or {}).items():
+            i = self.index[var]
+            domains[i] &= 1 << self.values[i].index(value)
+        if not all(domains):
+            return None
+        if mac and self._revise_all(domains, [0] * n, deque(range(n)), [-1] * n, [], 0) is not None:
+            return None
+
+        rng = random.Random(seed)
+        tie = list(range(n))
+        weight = [0] * n  # Domain wipeouts each variable took part in, kept across restarts
+        run = 1
+        while True:
+            limit = luby(run) * RESTART_FAILURES if restarts else None
+            result = self._search(domains[:], mac, backjumping, tie, weight, limit, stats)
+            if result is not RESTART:
+                return result
+            rng.shuffle(tie)
+            run += 1
+
+    def _search(self, domains, mac, backjumping, tie, weight, limit, stats):
+        """One backtracking run; returns a solution, None, or RESTART once 'limit' values have failed."""
+        n = len(self.variables)
+        values, arcs = self.values, self.arcs
+        pruned_by = [0] * n  # Levels (as bits) whose assignments removed values from each domain
+        conflicts = [0] * n  # Levels (as bits) blamed for failed values of each variable
+        value_of = [-1] * n
+        degree = [len(a) for a in arcs]
+
+        # MRV queue of (domain size, -weight, -degree, tie rank, variable), refreshed
+        # lazily: every shrink pushes a new entry and outdated entries are re-pushed when popped
+        queue = [(domains[i].bit_count(), -weight[i], -degree[i], tie[i], i) for i in range(n)]
+        heapq.heapify(queue)
+
+        def requeue(i):
+            if value_of[i] < 0:
+                heapq.heappush(queue, (domains[i].bit_count(), -weight[i], -degree[i], tie[i], i))
+
+        def select():
+            while True:
+                entry = heapq.heappop(queue)
+                i = entry[4]
+                if value_of[i] >= 0:
+                    continue
+                current = (domains[i].bit_count(), -weight[i], -degree[i], tie[i], i)
+                if current != entry:
+                    heapq.heappush(queue, current)
+                    continue
+                return i
+
+        def ordered_values(x):
+            """Value indices of x, the ones removing fewest neighbour values first."""
+            domain = domains[x]
+            candidates = [a for a in range(len(values[x])) if domain >> a & 1]
+            if len(candidates) > 1:
+                open_arcs = [(domains[y], supports) for y, supports in arcs[x].items() if value_of[y] < 0]
+                candidates.sort(key=lambda a: sum((d & ~s[a]).bit_count() for d, s in open_arcs))
+            candidates.reverse()  # Popped from the end
+            return candidates
+
+        def assign(x, a, level, trail):
+            """Sets x to value index a and prunes neighbours; returns None or a conflict set."""
+            value_of[x] = a
+            trail.append((x, domains[x], pruned_by[x]))
+            domains[x] = 1 << a
+            level_bit = 1 << level
+            changed = deque()
+            for y in arcs[x]:
+                if value_of[y] < 0:
+                    degree[y] -= 1
+            for y, supports in arcs[x].items():
+                if value_of[y] >= 0:
+                    continue
+                old = domains[y]
+                new = old & supports[a]
+                if new != old:
+                    trail.append((y, old, pruned_by[y]))
+                    domains[y] = new
+                    pruned_by[y] |= level_bit
+                    if not new:
+                        weight[x] += 1
+                        weight[y] += 1
+                        return pruned_by[y]
+                    changed.append(y)
+            if mac and changed:
+                return self._revise_all(domains, pruned_by, changed, value_of, trail, level_bit)
+            return None
+
+        def undo(x, trail):
+            restored = value_of[x] >= 0
+            value_of[x] = -1
+            while trail:
+                y, domain, pruned = trail.pop()
+                domains[y] = domain
+                pruned_by[y] = pruned
+                requeue(y)
+            if restored:
+                requeue(x)
+                for y in arcs[x]:
+                    if value_of[y] < 0:
+                        degree[y] += 1
+                        requeue(y)
+
+        if n == 0:
+            return {}
+        failures = 0
+        first = select()
+        frames = [(first, ordered_values(first), [])]
+        if stats:
+            stats.expand(1, self.variables[first])
+
+        while True:
+            x, candidates, trail = frames[-1]
+            level = len(frames) - 1
+            undo(x, trail)
+
+            if candidates:
+                a = candidates.pop()
+                if stats:
+                    stats.generate()
+                if self.verbose:
+                    print(f"Assign {self.variables[x]} = {values[x][a]}")
+                conflict = assign(x, a, level, trail)
+                if conflict is not None:
+                    conflicts[x] |= conflict & ~(1 << level)
+                    failures += 1
+                    if limit and failures > limit:
+                        return RESTART
+                    continue
+                if len(frames) == n:
+                    return {self.variables[i]: values[i][value_of[i]] for i in range(n)}
+                for entry in trail:
+                    requeue(entry[0])
+                y = select()
+                conflicts[y] = 0
+                frames.append((y, ordered_values(y), []))
+                if stats:
+                    stats.expand(len(frames), self.variables[y])
+                continue
+
+            # Every value of x failed: jump back to the deepest level responsible
+            frames.pop()
+            if backjumping:
+                culprits = (conflicts[x] | pruned_by[x]) & ~(1 << level)
+            else:
+                culprits = (1 << level) - 1
+            conflicts[x] = 0
+            if not culprits:
+                return None
+            target = culprits.bit_length() - 1
+            while len(frames) > target + 1:
+                skipped, _, skipped_trail = frames.pop()
+                undo(skipped, skipped_trail)
+                conflicts[skipped] = 0
+            culprit = frames[target][0]
+            conflicts[culprit] |= culprits & ~(1 << target)
+            if self.verbose:
+                print(f"Backjump from {self.variables[x]} to {self.variables[culprit]}")
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    from MapColoring import planar_map
+    from SearchStats import SearchStats
+
+    australia = CSP(['WA', 'NT', 'SA', 'Q', 'NSW', 'V', 'T'], ['Red', 'Green', 'Blue'])
+    for x, y in [('WA', 'NT'), ('WA', 'SA'), ('NT', 'SA'), ('NT', 'Q'), ('SA', 'Q'),
+                 ('SA', 'NSW'), ('SA', 'V'), ('Q', 'NSW'), ('NSW', 'V')]:
+        australia.add_different(x, y)
+    print(australia.solve())
+
+    # python CSP.py [side]: four-colour a random side x side planar map
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    regions, neighbors = planar_map(side, side, seed=1)
+    for inference in ('forward', 'mac'):
+        csp = CSP(regions, ['Red', 'Green', 'Blue', 'Yellow'])
+        for region in regions:
+            for neighbor in neighbors[region]:
+                if region < neighbor:
+                    csp.add_different(region, neighbor)
+        stats = SearchStats()
+        started = time.perf_counter()
+        coloring = csp.solve(inference=inference, stats=stats)
+        assert all(coloring[a] != coloring[b] for a in neighbors for b in neighbors[a])
+        print(f"{len(regions)} regions, {inference}: {time.perf_counter() - started:.2f}s, "
+              f"{stats.generated} values tried")
@@ -0,0 +1,227 @@
+"""
+Decision trees compiled to flat NumPy arrays for batch inference.
+
+CompiledTree.from_classifier() copies a fitted single-output
+DecisionTreeClassifier into arrays indexed by node: feature, threshold,
+left and right child, the side missing (NaN) values take, and per-class
+leaf value. predict() then moves every row down one level per step with
+whole-array operations, in cache-sized blocks. Leaves point at themselves
+with an infinite threshold, so rows that arrive early simply stay put; every
+few levels they are set aside. Batches of a few rows are walked in plain
+Python instead, which is faster than any array call. Rows are cast to
+float32 and go left while X[feature] <= threshold, as in scikit-learn, so
+the predictions are those of clf.predict.
+
+Only NumPy is needed to load and run a compiled tree.
+"""
+import os
+import time
+
+import numpy as np
+
+
+class CompiledTree:
+    """Flat-array decision tree; see the module docstring."""
+
+    SMALL_BATCH = 64  # Up to this many rows, walking Python lists beats array operations
+    BLOCK = 65536  # Rows descended together, so that the temporaries stay in cache
+
+    def __init__(self, feature, threshold, left, right, value, classes, missing_left=None):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        if missing_left is None:
+            missing_left = np.zeros(len(self.feature), dtype=bool)
+        self.missing_left = np.asarray(missing_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.classes = np.asarray(classes)
+        self.leaf_class = self.classes[self.value.argmax(axis=1)]
+        self.is_leaf = self.left == np.arange(len(self.left))
+        # children[2 * node + goes_right]: one gather per level instead of two and a select
+        self.children = np.stack([self.left, self.right], axis=1).ravel()
+        self._lists = [a.tolist() for a in (self.feature, self.threshold, self.left, self.right, self.missing_left)]
+        self.depth = self._depth()
+
+    @classmethod
+    def from_classifier(cls, clf):
+        """Compiles a fitted DecisionTreeClassifier with one output."""
+        tree = clf.tree_
+        if tree.n_outputs != 1:
+            raise ValueError("Only single-output trees can be compiled")
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left < 0
+        # Leaves loop back to themselves, and every row goes left there
+        return cls(np.where(leaf, 0, tree.feature),
+                   np.where(leaf, np.inf, tree.threshold),
+                   np.where(leaf, nodes, tree.children_left),
+                   np.where(leaf, nodes, tree.children_right),
+                   tree.value[:, 0, :],
+                   clf.classes_,
+                   tree.missing_go_to_left.astype(bool))
+
+    def _depth(self):
+        """Edges on the longest root-to-leaf path."""
+        depth, level = 0, np.zeros(1, dtype=np.intp)
+        while True:
+            inner = level[~self.is_leaf[level]]
+            if not len(inner):
+                return depth
+            level = np.concatenate([self.left[inner], self.right[inner]])
+            depth += 1
+
+    def save(self, path):
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left,
+                 right=self.right, value=self.value, classes=self.classes, missing_left=self.missing_left)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls(arrays['feature'], arrays['threshold'], arrays['left'], arrays['right'],
+                       arrays['value'], arrays['classes'], arrays['missing_left'])
+
+    def apply(self, X):
+        """Leaf index of every row of X."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if len(X) <= self.SMALL_BATCH:
+            return np.array(self._walk(X.tolist()), dtype=np.intp)
+        X = np.ascontiguousarray(X)
+        leaves = np.empty(len(X), dtype=np.intp)
+        missing = bool(np.isnan(X).any())
+        for start in range(0, len(X), self.BLOCK):
+            self._descend(X[start:start + self.BLOCK], leaves[start:start + self.BLOCK], missing)
+        return leaves
+
+    def _walk(self, rows):
+        """Leaves of a few rows, one row at a time (the float32 values converted to Python floats exactly)."""
+        feature, threshold, left, right, missing_left = self._lists
+        leaves = []
+        for row in rows:
+            node = 0
+            while left[node] != node:
+                value = row[feature[node]]
+                if value <= threshold[node] or (value != value and missing_left[node]):
+                    node = left[node]
+                else:
+                    node = right[node]
+            leaves.append(node)
+        return leaves
+
+    def _descend(self, X, leaves, missing):
+        """Fills 'leaves' for the rows of X, all rows one level per step."""
+        flat = X.ravel()
+        offset = np.arange(len(X), dtype=np.intp) * X.shape[1]
+        position = np.arange(len(X))  # Index into 'leaves' of each row still descending
+        node = np.zeros(len(X), dtype=np.int32)
+        for level in range(self.depth):
+            value = flat.take(offset + self.feature.take(node))
+            if missing:
+                goes_left = (value <= self.threshold.take(node)) | (np.isnan(value) & self.missing_left.take(node))
+                goes_right = ~goes_left
+            else:
+                goes_right = value > self.threshold.take(node)
+            node = self.children.take(2 * node + goes_right)
+            if level % 4 == 3:
+                # Set aside the rows already on a leaf
+                done = self.is_leaf.take(node)
+                if done.any():
+                    leaves[position[done]] = node[done]
+                    keep = ~done
+                    node, offset, position = node[keep], offset[keep], position[keep]
+        leaves[position] = node
+
+    def predict(self, X, workers=1, chunk=250_000):
+        """
+        Class of every row of X. With workers > 1 and more than 'chunk' rows,
+        chunks are spread over a process pool.
+        """
+        if workers > 1 and len(X) > chunk:
+            return self._predict_parallel(np.asarray(X, dtype=np.float32), workers, chunk)
+        return self.leaf_class[self.apply(X)]
+
+    def predict_proba(self, X):
+        """Class probabilities, in the order of self.classes."""
+        value = self.value[self.apply(X)]
+        return value / value.sum(axis=1, keepdims=True)
+
+    def _predict_parallel(self, X, workers, chunk):
+        from multiprocessing import Pool
+
+        pieces = [X[start:start + chunk] for start in range(0, len(X), chunk)]
+        with Pool(workers, initializer=_start_worker, initargs=(self,)) as pool:
+            return np.concatenate(pool.map(_predict_chunk, pieces))
+
+
+_worker = {}
+
+
+def _start_worker(tree):
+    _worker['tree'] = tree
+
+
+def _predict_chunk(X):
+    return _worker['tree'].predict(X)
+
+
+def benchmark(clf, X, batch_sizes, workers=None, budget=0.5):
+    """
+    Median seconds per call of clf.predict and CompiledTree.predict for each
+    batch size (rows drawn from X, which must hold the largest size), after
+    checking they agree. Each size is repeated for about 'budget' seconds.
+    Returns {batch size: (sklearn seconds, compiled seconds, pool seconds or None)}.
+    """
+    compiled = CompiledTree.from_classifier(clf)
+    results = {}
+    for size in batch_sizes:
+        batch = X[:size]
+        if not np.array_equal(compiled.predict(batch), clf.predict(batch)):
+            raise AssertionError(f"Compiled tree disagrees with clf.predict at batch size {size}")
+        timings = []
+        for predict in (clf.predict, compiled.predict):
+            times = []
+            started = time.perf_counter()
+            while not times or (time.perf_counter() - started < budget and len(times) < 1000):
+                call = time.perf_counter()
+                predict(batch)
+                times.append(time.perf_counter() - call)
+            timings.append(float(np.median(times)))
+        pooled = None
+        if workers and workers > 1 and size >= 1_000_000:
+            call = time.perf_counter()
+            compiled.predict(batch, workers=workers)
+            pooled = time.perf_counter() - call
+        results[size] = (*timings, pooled)
+    return results
+
+
+if __name__ == '__main__':
+    import sys
+    from sklearn.datasets import load_iris
+    from sklearn.tree import DecisionTreeClassifier
+
+    # python CompiledTree.py [workers]
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    rng = np.random.default_rng(0)
+    iris = load_iris()
+    iris_clf = DecisionTreeClassifier(random_state=0).fit(iris.data, iris.target)
+    # Sample inside the iris ranges so that every branch gets traffic
+    low, high = iris.data.min(axis=0), iris.data.max(axis=0)
+    iris_rows = rng.uniform(low, high, size=(1_000_000, iris.data.shape[1]))
+
+    X = rng.normal(size=(100_000, 20))
+    y = (X[:, :5].sum(axis=1) > 0).astype(int) + (X[:, 5] > 1)
+    big_clf = DecisionTreeClassifier(random_state=0).fit(X, y)
+    big_rows = rng.normal(size=(1_000_000, 20))
+
+    sizes = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+    for name, clf, rows in (('iris', iris_clf, iris_rows), ('synthetic 20 features', big_clf, big_rows)):
+        tree = CompiledTree.from_classifier(clf)
+        print(f"{name}: {clf.tree_.node_count} nodes, depth {tree.depth}")
+        for size, (sk, compiled, pooled) in benchmark(clf, rows, sizes, workers).items():
+            line = (f"  batch {size:>9}: sklearn {sk * 1e3:9.3f} ms, compiled {compiled * 1e3:9.3f} ms "
+                    f"({sk / compiled:5.1f}x), {size / compiled:,.0f} rows/s")
+            if pooled is not None:
+                line += f", {workers}-process pool {pooled * 1e3:.1f} ms"
+            print(line)
@@ -0,0 +1,310 @@
+import ast
+import heapq
+import mmap
+import random
+import struct
+import time
+from array import array
+
+from Landmarks import adjacency
+from SearchStats import instrumented
+
+INF = float('inf')
+MAGIC = b'CHX1'
+
+
+def pack_adjacency(lists):
+    """Turns per-node lists of (target, cost, middle) into CSR arrays."""
+    offsets = array('q', [0])
+    targets, weights, middles = array('i'), array('d'), array('i')
+    for edges in lists:
+        for target, cost, middle in edges:
+            targets.append(target)
+            weights.append(cost)
+            middles.append(middle)
+        offsets.append(len(targets))
+    return offsets, targets, weights, middles
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy over a static weighted directed graph.
+
+    Nodes are contracted one at a time in order of edge difference; whenever
+    removing v would break a shortest u -> v -> w path, a shortcut u -> w
+    remembering v as its middle node is added. Queries then only relax edges
+    towards higher-ranked nodes, from both ends, and meet at the top.
+    """
+
+    def __init__(self, names, rank, upward, downward):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.rank = rank
+        self.upward = upward  # CSR: edges v -> w with rank[w] > rank[v]
+        self.downward = downward  # CSR: reversed edges u -> v with rank[u] > rank[v], stored at v
+
+    @classmethod
+    def build(cls, graph, witness_limit=60):
+        """
+        Preprocesses any graph Node.a_star accepts. 'witness_limit' caps the
+        nodes settled per witness search; a lower cap builds faster at the price
+        of a few unnecessary shortcuts, never of wrong answers.
+        """
+        names, _, forward, _ = adjacency(graph)
+        n = len(names)
+        out = [{} for _ in range(n)]
+        into = [{} for _ in range(n)]
+        for v, edges in enumerate(forward):
+            for w, cost in edges:
+                if v != w and cost < out[v].get(w, INF):
+                    out[v][w] = cost
+                    into[w][v] = cost
+        middle = {}  # (u, w) -> contracted node the shortcut u -> w bypasses
+
+        def witness_distances(source, avoid, limit):
+            distance = {source: 0}
+            queue = [(0, source)]
+            settled = 0
+            while queue:
+                d, node = heapq.heappop(queue)
+                if d > distance[node]:
+                    continue
+                settled += 1
+                if d > limit or settled > witness_limit:
+                    break
+                for neighbor, cost in out[node].items():
+                    if neighbor == avoid:
+                        continue
+                    new_distance = d + cost
+                    if new_distance < distance.get(neighbor, INF):
+                        distance[neighbor] = new_distance
+                        heapq.heappush(queue, (new_distance, neighbor))
+            return distance
+
+        def shortcuts(v):
+            needed = []
+            if not out[v]:
+                return needed
+            longest = max(out[v].values())
+            for u, in_cost in into[v].items():
+                distance = witness_distances(u, v, in_cost + longest)
+                for w, out_cost in out[v].items():
+                    if w != u and distance.get(w, INF) > in_cost + out_cost:
+                        needed.append((u, w, in_cost + out_cost))
+            return needed
+
+        contracted_neighbors = [0] * n
+
+        def priority(v):
+            return len(shortcuts(v)) - len(into[v]) - len(out[v]) + contracted_neighbors[v]
+
+        queue = [(priority(v), v) for v in range(n)]
+        heapq.heapify(queue)
+        rank = array('i', [0]) * n
+        upward = [[] for _ in range(n)]
+        downward = [[] for _ in range(n)]
+        order = 0
+
+        while queue:
+            _, v = heapq.heappop(queue)
+            # Lazy update: priorities go stale as neighbours are contracted
+            current = priority(v)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+
+            for w, cost in out[v].items():
+                upward[v].append((w, cost, middle.get((v, w), -1)))
+            for u, cost in into[v].items():
+                downward[v].append((u, cost, middle.get((u, v), -1)))
+
+            added = shortcuts(v)
+            for w in out[v]:
+                del into[w][v]
+                contracted_neighbors[w] += 1
+            for u in into[v]:
+                del out[u][v]
+                contracted_neighbors[u] += 1
+            for u, w, cost in added:
+                if cost < out[u].get(w, INF):
+                    out[u][w] = cost
+                    into[w][u] = cost
+                    middle[(u, w)] = v
+            out[v], into[v] = {}, {}
+
+            rank[v] = order
+            order += 1
+
+        return cls(names, rank, pack_adjacency(upward), pack_adjacency(downward))
+
+    def _search_step(self, queue, distance, parent, graph, other, best, stats):
+        d, node = heapq.heappop(queue)
+        if d > distance[node]:
+            if stats:
+                stats.duplicate()
+            return best
+        if stats:
+            stats.expand(len(queue) + 1, self.names[node])
+        if node in other and d + other[node] < best[0]:
+            best = (d + other[node], node)
+        offsets, targets, weights, _ = graph
+        for e in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[e]
+            new_distance = d + weights[e]
+            if new_distance < distance.get(neighbor, INF):
+                distance[neighbor] = new_distance
+                parent[neighbor] = node
+                heapq.heappush(queue, (new_distance, neighbor))
+                if stats:
+                    stats.generate()
+        return best
+
+    @instrumented
+    def query(self, start, goal, stats=None):
+        """
+        Bidirectional upward Dijkstra. 'stats' takes a SearchStats to fill in.
+
+        Returns:
+            Same as Node.a_star: (path of node names with shortcuts unpacked,
+            total cost), or (None, None) if goal is unreachable.
+        """
+        if start not in self.ids or goal not in self.ids:
+            return None, None
+        s, t = self.ids[start], self.ids[goal]
+        forward_distance, backward_distance = {s: 0}, {t: 0}
+        forward_parent, backward_parent = {s: -1}, {t: -1}
+        forward_queue, backward_queue = [(0, s)], [(0, t)]
+        best = (INF, -1)
+
+        while forward_queue or backward_queue:
+            forward_key = forward_queue[0][0] if forward_queue else INF
+            backward_key = backward_queue[0][0] if backward_queue else INF
+            if min(forward_key, backward_key) >= best[0]:
+                break
+            if forward_key <= backward_key:
+                best = self._search_step(forward_queue, forward_distance, forward_parent,
+                                         self.upward, backward_distance, best, stats)
+            else:
+                best = self._search_step(backward_queue, backward_distance, backward_parent,
+                                         self.downward, forward_distance, best, stats)
+
+        cost, meeting = best
+        if meeting < 0:
+            return None, None
+
+        nodes = []
+        node = meeting
+        while node >= 0:
+            nodes.append(node)
+            node = forward_parent[node]
+        nodes.reverse()
+        node = backward_parent[meeting]
+        while node >= 0:
+            nodes.append(node)
+            node = backward_parent[node]
+
+        path = [nodes[0]]
+        for a, b in zip(nodes, nodes[1:]):
+            path.extend(self._unpack(a, b))
+        cost = int(cost) if float(cost).is_integer() else cost
+        return [self.names[i] for i in path], cost
+
+    def _middle(self, a, b):
+        """Middle node of edge a -> b, or -1 for an original edge."""
+        if self.rank[a] < self.rank[b]:
+            offsets, targets, weights, middles = self.upward
+            owner, other = a, b
+        else:
+            offsets, targets, weights, middles = self.downward
+            owner, other = b, a
+        for e in range(offsets[owner], offsets[owner + 1]):
+            if targets[e] == other:
+                return middles[e]
+        raise KeyError((a, b))
+
+    def _unpack(self, a, b):
+        """Expands edge a -> b into original edges; returns the nodes after a."""
+        result = []
+        stack = [(a, b)]
+        while stack:
+            u, w = stack.pop()
+            m = self._middle(u, w)
+            if m < 0:
+                result.append(w)
+            else:
+                stack.append((m, w))
+                stack.append((u, m))
+        return result
+
+    def save(self, path):
+        """Header, then rank and both CSR graphs as raw 8-byte-aligned arrays, then node names."""
+        arrays = [self.rank, *self.upward, *self.downward]
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<4sq', MAGIC, len(self.names)))
+            for values in arrays:
+                f.write(struct.pack('<cq7x', values.typecode.encode(), len(values)))
+                data = bytes(values)
+                f.write(data)
+                f.write(b'\0' * (-len(data) % 8))
+            # repr() keeps tuple or integer node names intact through a reload
+            f.write('\n'.join(map(repr, self.names)).encode())
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps an index written by save()."""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n = struct.unpack_from('<4sq', mapped)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a contraction hierarchy index")
+        view = memoryview(mapped)
+        position = struct.calcsize('<4sq')
+        arrays = []
+        for _ in range(9):
+            typecode, length = struct.unpack_from('<cq7x', mapped, position)
+            position += struct.calcsize('<cq7x')
+            size = length * array(typecode.decode()).itemsize
+            arrays.append(view[position:position + size].cast(typecode.decode()))
+            position += size + (-size % 8)
+        names = [ast.literal_eval(name) for name in bytes(view[position:]).decode().split('\n')] if n else []
+        hierarchy = cls(names, arrays[0], tuple(arrays[1:5]), tuple(arrays[5:9]))
+        hierarchy._mmap = mapped
+        return hierarchy
+
+
+if __name__ == '__main__':
+    import sys
+    from Node import a_star, grid_graph
+
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rng = random.Random(1)
+    graph = grid_graph(side, side)
+    for neighbors in graph.values():
+        for neighbor in neighbors:
+            neighbors[neighbor] = rng.randint(1, 10)
+
+    started = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(graph)
+    build_seconds = time.perf_counter() - started
+    import os
+    import tempfile
+    index_path = os.path.join(tempfile.gettempdir(), 'grid.ch')
+    hierarchy.save(index_path)
+    hierarchy = ContractionHierarchy.load(index_path)
+    shortcuts = sum(1 for m in hierarchy.upward[3] if m >= 0) + sum(1 for m in hierarchy.downward[3] if m >= 0)
+    print(f"{side}x{side} grid: preprocessing {build_seconds:.2f}s, {shortcuts} shortcuts")
+
+    nodes = list(graph)
+    queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(50)]
+    ch_seconds = a_star_seconds = 0
+    for start, goal in queries:
+        started = time.perf_counter()
+        path, cost = hierarchy.query(start, goal)
+        ch_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        _, expected = a_star(graph, start, goal, lambda node: 0)
+        a_star_seconds += time.perf_counter() - started
+        assert cost == expected and sum(graph[a][b] for a, b in zip(path, path[1:])) == cost
+
+    print(f"Average query: A* {a_star_seconds / len(queries) * 1000:.2f} ms, "
+          f"contraction hierarchy {ch_seconds / len(queries) * 1000:.3f} ms")
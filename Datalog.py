@@ -0,0 +1,713 @@
+"""
+Forward-chaining Datalog engine for the fact/rule subset of the Prolog
+programs in this directory.
+
+Supported clauses:
+- facts: ground atoms such as planet(earth, 149.6, terrestrial).
+- rules: head :- body, where the body is a conjunction of atoms,
+  negated atoms (\\+ p(...) or not(...), including not of a conjunction),
+  and comparisons (<, >, =<, >=, =:=, =\\=, =, \\=, ==, \\==)
+- queries: ?- body. (also the 'INPUT:?- ...' lines these files end with)
+
+Output calls (write, nl, ...) always succeed and are dropped from bodies.
+Clauses outside the subset (input, assertz, arithmetic with 'is', lists,
+compound terms, non-ground facts, unsafe rules) are skipped and listed in
+Program.skipped.
+
+That includes every rule of "Simple Forward Chaining in Prolog.txt": its
+infer/1 reads the initial fact and asserts known/1 facts one at a time.
+Only its rule/2 facts load. The Datalog equivalent is one recursive rule
+plus the initial fact as a seed:
+
+    python Datalog.py "Simple Forward Chaining in Prolog.txt" \\
+        -e "known(a). known(Y) :- known(X), rule(X, Y)." -q "known(X)"
+
+which derives known(b), known(c) and known(d).
+
+Programs are evaluated bottom-up, one stratum of negation at a time, with
+semi-naive iteration: after a first full round, each round only joins the
+facts derived in the previous round (the delta) against the rest, and stops
+when nothing new appears. Body atoms are joined through hash indexes on
+their bound argument positions, kept up to date as facts are added.
+"""
+import argparse
+import re
+import sys
+import time
+from collections import defaultdict
+from operator import itemgetter
+
+
+class DatalogError(Exception):
+    """A clause or query outside the supported subset."""
+
+
+class Var:
+    """A logic variable; every '_' is a distinct anonymous variable."""
+
+    def __init__(self, name):
+        self.name = name
+        self.anonymous = name == '_'
+
+    def __repr__(self):
+        return self.name
+
+
+COMPARISONS = {
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '=<': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+    '=:=': lambda a, b: a == b,
+    '=\\=': lambda a, b: a != b,
+    '==': lambda a, b: a == b,
+    '\\==': lambda a, b: a != b,
+    '=': lambda a, b: a == b,
+    '\\=': lambda a, b: a != b,
+}
+OUTPUT = {'write', 'writeln', 'print', 'nl'}
+UNSUPPORTED = {'read', 'assert', 'asserta', 'assertz', 'retract', 'format', 'is',
+               'findall', 'bagof', 'setof', 'call', 'fail', 'true', '!', 'halt'}
+
+TOKEN = re.compile(r"""
+    (?P<space>\s+|%[^\n]*|/\*.*?\*/)
+  | (?P<end>\.(?=\s|%|$))
+  | (?P<number>\d+\.\d+(?:[eE][-+]?\d+)?|\d+)
+  | (?P<var>[A-Z_]\w*)
+  | (?P<atom>[a-z]\w*)
+  | (?P<quoted>'(?:[^'\\]|''|\\.)*')
+  | (?P<op>:-|\?-|\\\+|=:=|=\\=|\\==|\\=|==|=<|>=|[<>=]|[(),;!-])
+""", re.VERBOSE | re.DOTALL)
+
+
+def tokenize(text):
+    """(kind, value) tokens; comments and whitespace dropped, clause ends as ('end', '.')."""
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None:
+            tokens.append(('error', text[position]))
+            position += 1
+            continue
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'space':
+            continue
+        if kind == 'number':
+            value = float(value) if '.' in value or 'e' in value.lower() else int(value)
+        elif kind == 'quoted':
+            value = value[1:-1].replace("''", "'").replace("\\'", "'")
+            kind = 'atom'
+        tokens.append((kind, value))
+    return tokens
+
+
+def source_text(tokens):
+    """Clause tokens written back as readable Prolog."""
+    text = ''
+    for kind, value in tokens:
+        word = format_term(value) if kind == 'atom' else str(value)
+        if text and not text.endswith('(') and word not in (')', ',', '('):
+            text += ' '
+        text += word
+        if word == ',':
+            text = text[:-1] + ', '
+    return text.replace('  ', ' ')
+
+
+def split_clauses(tokens):
+    clause = []
+    for token in tokens:
+        if token[0] == 'end':
+            yield clause
+            clause = []
+        else:
+            clause.append(token)
+    if clause:
+        yield clause
+
+
+class _Parser:
+    """Recursive-descent parser for one clause's tokens."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+        self.variables = {}
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if token[0] is None or (value is not None and token[1] != value):
+            raise DatalogError(f"Expected {value or 'more input'}, found {token[1]!r}")
+        self.position += 1
+        return token
+
+    def done(self):
+        return self.position == len(self.tokens)
+
+    def term(self):
+        kind, value = self.take()
+        if kind == 'var':
+            if value == '_':
+                return Var('_')
+            return self.variables.setdefault(value, Var(value))
+        if kind == 'number':
+            return value
+        if kind == 'op' and value == '-' and self.peek()[0] == 'number':
+            return -self.take()[1]
+        if kind == 'atom':
+            if self.peek() == ('op', '('):
+                raise DatalogError(f"Compound term {value}(...) as an argument")
+            return value
+        raise DatalogError(f"Unexpected {value!r}")
+
+    def atom(self):
+        kind, name = self.take()
+        if kind != 'atom':
+            raise DatalogError(f"Expected a predicate, found {name!r}")
+        if name in UNSUPPORTED:
+            raise DatalogError(f"Built-in {name} is not supported")
+        args = []
+        if self.peek() == ('op', '('):
+            self.take('(')
+            args.append(self.term())
+            while self.peek() == ('op', ','):
+                self.take(',')
+                args.append(self.term())
+            self.take(')')
+        return name, tuple(args)
+
+    def literal(self):
+        """
+        One body literal: ('pos', pred, args), ('neg', body), ('cmp', op, left, right),
+        or ('output',) for a write/nl call.
+        """
+        token = self.peek()
+        if token[0] == 'atom' and token[1] in UNSUPPORTED:
+            raise DatalogError(f"Built-in {token[1]} is not supported")
+        if token[0] == 'atom' and token[1] in OUTPUT:
+            self.atom()
+            return ('output',)
+        if token == ('op', '\\+'):
+            self.take()
+            if self.peek() == ('op', '('):
+                self.take('(')
+                body = self.body()
+                self.take(')')
+                return ('neg', body)
+            return ('neg', [('pos', *self.atom())])
+        if token == ('atom', 'not') and self.tokens[self.position + 1:self.position + 2] == [('op', '(')]:
+            self.take()
+            self.take('(')
+            if self.peek() == ('op', '('):
+                self.take('(')
+                body = self.body()
+                self.take(')')
+            else:
+                body = self.body()
+            self.take(')')
+            return ('neg', body)
+        if token[0] == 'atom' and (
+                self.position + 1 >= len(self.tokens) or self.tokens[self.position + 1] in (('op', '('), ('op', ','), ('op', ')'))):
+            return ('pos', *self.atom())
+        left = self.term()
+        kind, op = self.take()
+        if op == 'is':
+            raise DatalogError("Arithmetic with 'is' is not supported")
+        if op not in COMPARISONS:
+            raise DatalogError(f"Unsupported operator {op!r}")
+        return ('cmp', op, left, self.term())
+
+    def body(self):
+        literals = [self.literal()]
+        while self.peek() == ('op', ','):
+            self.take(',')
+            literals.append(self.literal())
+        if self.peek() in (('op', ';'), ('op', '!')):
+            raise DatalogError("Disjunction and cut are not supported")
+        literals = [literal for literal in literals if literal[0] != 'output']
+        if not literals:
+            raise DatalogError("Body has only output calls")
+        return literals
+
+
+def _variables(args):
+    return [a for a in args if isinstance(a, Var) and not a.anonymous]
+
+
+def _dependencies(body, negated=False):
+    """(predicate, negated) for every atom of a body, including those inside negations."""
+    for literal in body:
+        if literal[0] == 'pos':
+            yield literal[1], negated
+        elif literal[0] == 'neg':
+            yield literal[1], True
+        elif literal[0] == 'negall':
+            yield from _dependencies(literal[1], True)
+
+
+def _picker(positions):
+    """Function taking the items at 'positions' of a tuple, always as a tuple."""
+    if not positions:
+        return lambda row: ()
+    if len(positions) == 1:
+        position = positions[0]
+        return lambda row: (row[position],)
+    return itemgetter(*positions)
+
+
+def _key_maker(terms, slots):
+    """Function building an index key from a binding tuple: variables from their slots, constants as given."""
+    if all(isinstance(t, Var) for t in terms):
+        return _picker([slots[t] for t in terms])
+    parts = [(slots[t], None) if isinstance(t, Var) else (None, t) for t in terms]
+    return lambda binding: tuple(binding[slot] if slot is not None else value for slot, value in parts)
+
+
+class Program:
+    """A set of facts and rules, evaluated to their least fixpoint by solve()."""
+
+    def __init__(self):
+        self.facts = defaultdict(set)  # predicate -> set of argument tuples
+        self.rules = []  # (head predicate, head args, body literals)
+        self.queries = []  # (text, body literals)
+        self.skipped = []  # (clause text, reason)
+        self.indexes = defaultdict(dict)  # predicate -> {positions: {key: [fact, ...]}}
+        self._plans = {}  # (rule id, delta literal) -> join plan
+        self.solved = False
+
+    # --- Loading
+
+    def load(self, path):
+        with open(path, encoding='utf-8') as file:
+            self.consult(file.read())
+        return self
+
+    def consult(self, text):
+        """Adds the clauses of a Prolog source text."""
+        text = re.sub(r'^\s*INPUT\s*:', '', text, flags=re.MULTILINE)
+        for tokens in split_clauses(tokenize(text)):
+            source = source_text(tokens)
+            try:
+                self._clause(tokens)
+            except (DatalogError, IndexError) as error:
+                self.skipped.append((source, str(error) or 'syntax error'))
+        self.solved = False
+        return self
+
+    def _clause(self, tokens):
+        if any(kind == 'error' for kind, _ in tokens):
+            raise DatalogError("Unrecognized characters")
+        parser = _Parser(tokens)
+        if parser.peek() == ('op', '?-'):
+            parser.take()
+            body = parser.body()
+            if not parser.done():
+                raise DatalogError("Trailing tokens")
+            self.queries.append((source_text(tokens[1:]), body))
+            return
+        pred, args = parser.atom()
+        if parser.done():
+            if any(isinstance(a, Var) for a in args):
+                raise DatalogError("Facts must be ground")
+            self.add_fact(pred, args)
+            return
+        parser.take(':-')
+        body = parser.body()
+        if not parser.done():
+            raise DatalogError("Trailing tokens")
+        self.add_rule(pred, args, body)
+
+    def add_fact(self, pred, args):
+        self.facts[pred].add(tuple(args))
+        self.solved = False
+
+    def add_rule(self, pred, args, body):
+        """Adds head :- body."""
+        body = self._negations(body)
+        head_vars = _variables(args)
+        if any(a.anonymous for a in args if isinstance(a, Var)):
+            raise DatalogError("Anonymous variable in a rule head")
+        self._plan(body, set(), head_vars)  # Raises DatalogError if the rule is unsafe
+        self.rules.append((pred, tuple(args), body))
+        self.solved = False
+
+    def _negations(self, body, bound=()):
+        """
+        Rewrites negated literals for evaluation: \\+ p(...) becomes ('neg', pred,
+        args), and a negated conjunction ('negall', inner body, shared variables),
+        which drops the bindings whose shared variables satisfy the inner body.
+        The shared variables are those the conjunction has in common with the
+        rest of the body (or with 'bound', the enclosing variables).
+        """
+        result = []
+        for literal in body:
+            if literal[0] != 'neg':
+                result.append(literal)
+                continue
+            inner = literal[1]
+            if len(inner) == 1 and inner[0][0] == 'pos':
+                result.append(('neg', inner[0][1], inner[0][2]))
+                continue
+            outside = set(bound)
+            outside.update(v for other in body if other is not literal for v in self._literal_vars(other))
+            shared = tuple(v for v in dict.fromkeys(v for lit in inner for v in self._literal_vars(lit)) if v in outside)
+            result.append(('negall', self._negations(inner, shared), shared))
+        return result
+
+    @staticmethod
+    def _literal_vars(literal):
+        if literal[0] == 'cmp':
+            return _variables(literal[2:])
+        if literal[0] == 'neg' and isinstance(literal[1], list):
+            return [v for inner in literal[1] for v in Program._literal_vars(inner)]
+        if literal[0] == 'negall':
+            return list(literal[2])
+        return _variables(literal[2])
+
+    # --- Join planning
+
+    def _plan(self, body, bound, outputs, delta=None):
+        """
+        Orders a rule body into steps given the variables already bound: the
+        'delta' literal (if any) first, then tests as soon as their variables
+        are bound, else the atom with the most bound arguments. Returns
+        (steps, slots) where slots maps each variable to its place in a binding tuple.
+        """
+        slots = {var: i for i, var in enumerate(bound)}
+        pending = list(range(len(body)))
+        steps = []
+
+        def is_bound(term):
+            return not isinstance(term, Var) or term in slots
+
+        def add_atom(index, source):
+            _, pred, args = body[index]
+            key, new, checks = [], [], []
+            first = {}
+            for position, term in enumerate(args):
+                if isinstance(term, Var) and term.anonymous:
+                    continue
+                if is_bound(term):
+                    key.append((position, term))
+                elif term in first:
+                    checks.append((position, first[term]))
+                else:
+                    first[term] = position
+                    new.append(position)
+            for position in new:
+                slots[args[position]] = len(slots)
+            steps.append(('atom', pred, source, tuple(p for p, _ in key), [t for _, t in key],
+                          tuple(new), tuple(checks)))
+
+        if delta is not None:
+            add_atom(delta, 'delta')
+            pending.remove(delta)
+        while pending:
+            chosen = None
+            for index in pending:
+                literal = body[index]
+                if literal[0] == 'cmp':
+                    _, op, left, right = literal
+                    if is_bound(left) and is_bound(right):
+                        chosen = index
+                    elif op == '=' and (is_bound(left) or is_bound(right)):
+                        chosen = index
+                elif literal[0] == 'neg':
+                    if all(is_bound(t) or t.anonymous for t in literal[2] if isinstance(t, Var)):
+                        chosen = index
+                elif literal[0] == 'negall':
+                    if all(v in slots for v in literal[2]):
+                        chosen = index
+                if chosen is not None:
+                    break
+            if chosen is None:
+                atoms = [i for i in pending if body[i][0] == 'pos']
+                if not atoms:
+                    raise DatalogError("Unsafe rule: a negated or compared variable is never bound")
+                chosen = max(atoms, key=lambda i: (sum(is_bound(t) for t in body[i][2]), -i))
+                add_atom(chosen, 'full')
+            else:
+                literal = body[chosen]
+                if literal[0] == 'cmp':
+                    _, op, left, right = literal
+                    if op == '=' and not (is_bound(left) and is_bound(right)):
+                        source, target = (left, right) if is_bound(left) else (right, left)
+                        slots[target] = len(slots)
+                        steps.append(('bind', source))
+                    else:
+                        steps.append(('cmp', op, left, right))
+                elif literal[0] == 'negall':
+                    _, inner, shared = literal
+                    steps.append(('negall', shared, *self._plan(inner, shared, [])))
+                else:
+                    _, pred, args = literal
+                    positions = tuple(p for p, t in enumerate(args) if not (isinstance(t, Var) and t.anonymous))
+                    steps.append(('neg', pred, positions, [args[p] for p in positions]))
+            pending.remove(chosen)
+        missing = [v for v in outputs if v not in slots]
+        if missing:
+            raise DatalogError(f"Unsafe rule: {', '.join(map(str, missing))} not bound by the body")
+        return steps, slots
+
+    # --- Indexes
+
+    def _index(self, pred, positions, facts=None):
+        """Hash index {key: [fact, ...]} of a relation on 'positions' (built once and kept up to date)."""
+        if facts is not None:
+            index = defaultdict(list)
+            key = _picker(positions)
+            for fact in facts:
+                index[key(fact)].append(fact)
+            return index
+        indexes = self.indexes[pred]
+        index = indexes.get(positions)
+        if index is None:
+            index = indexes[positions] = self._index(pred, positions, self.facts[pred])
+        return index
+
+    def _insert(self, pred, new_facts):
+        self.facts[pred] |= new_facts
+        for positions, index in self.indexes[pred].items():
+            pick = _picker(positions)
+            for fact in new_facts:
+                key = pick(fact)
+                if key in index:
+                    index[key].append(fact)
+                else:
+                    index[key] = [fact]
+
+    # --- Evaluation
+
+    def _run(self, steps, slots, bindings, delta=None, delta_indexes=None):
+        """Pushes a list of binding tuples through the planned steps; returns the surviving bindings."""
+        for step in steps:
+            kind = step[0]
+            if kind == 'atom':
+                _, pred, source, positions, key_terms, new, checks = step
+                if source == 'delta':
+                    cache_key = (pred, positions)
+                    if cache_key not in delta_indexes:
+                        delta_indexes[cache_key] = self._index(pred, positions, delta[pred])
+                    index = delta_indexes[cache_key]
+                else:
+                    index = self._index(pred, positions)
+                key = _key_maker(key_terms, slots)
+                pick = _picker(new)
+                get = index.get
+                out = []
+                for binding in bindings:
+                    matches = get(key(binding))
+                    if not matches:
+                        continue
+                    if checks:
+                        matches = [f for f in matches if all(f[a] == f[b] for a, b in checks)]
+                    out.extend([binding + pick(fact) for fact in matches])
+                bindings = out
+            elif kind == 'neg':
+                _, pred, positions, terms = step
+                index = self._index(pred, positions)
+                key = _key_maker(terms, slots)
+                bindings = [b for b in bindings if key(b) not in index]
+            elif kind == 'negall':
+                _, shared, inner_steps, inner_slots = step
+                key = _key_maker(shared, slots)
+                # The inner plan starts from the shared variables, so each result begins with its key
+                found = {b[:len(shared)] for b in self._run(inner_steps, inner_slots, list({key(b) for b in bindings}))}
+                bindings = [b for b in bindings if key(b) not in found]
+            elif kind == 'cmp':
+                _, op, left, right = step
+                test = COMPARISONS[op]
+                left_slot = slots[left] if isinstance(left, Var) else None
+                right_slot = slots[right] if isinstance(right, Var) else None
+                try:
+                    bindings = [b for b in bindings
+                                if test(b[left_slot] if left_slot is not None else left,
+                                        b[right_slot] if right_slot is not None else right)]
+                except TypeError:
+                    raise DatalogError(f"{op} compares a non-number") from None
+            else:  # bind
+                source = step[1]
+                if isinstance(source, Var):
+                    slot = slots[source]
+                    bindings = [b + (b[slot],) for b in bindings]
+                else:
+                    bindings = [b + (source,) for b in bindings]
+            if not bindings:
+                break
+        return bindings
+
+    def _fire(self, rule, delta=None, delta_position=None, delta_indexes=None):
+        """Head tuples a rule derives, joining literal 'delta_position' against the delta only."""
+        pred, args, body = rule
+        plan_key = (id(rule), delta_position)
+        if plan_key not in self._plans:
+            self._plans[plan_key] = self._plan(body, [], _variables(args), delta_position)
+        steps, slots = self._plans[plan_key]
+        bindings = self._run(steps, slots, [()], delta, delta_indexes)
+        head = _key_maker(args, slots)
+        return {head(b) for b in bindings}
+
+    def strata(self):
+        """Rules grouped by stratum, so that negated predicates are complete before they are used."""
+        level = defaultdict(int)
+        heads = {rule[0] for rule in self.rules}
+        for _ in range(len(heads) + 1):
+            changed = False
+            for pred, _, body in self.rules:
+                for used, negated in _dependencies(body):
+                    need = level[used] + negated
+                    if need > level[pred]:
+                        level[pred] = need
+                        changed = True
+            if not changed:
+                break
+        else:
+            raise DatalogError("Negation through recursion: the program is not stratified")
+        groups = defaultdict(list)
+        for rule in self.rules:
+            groups[level[rule[0]]].append(rule)
+        return [groups[k] for k in sorted(groups)]
+
+    def solve(self, naive=False):
+        """
+        Derives every fact. With naive=True, each round re-joins all facts
+        (for comparison). Returns {'iterations', 'derived', 'seconds', 'facts_per_second', 'strata'}.
+        """
+        started = time.perf_counter()
+        strata = self.strata()
+        iterations = derived = 0
+        for rules in strata:
+            heads = {rule[0] for rule in rules}
+            delta = None
+            while True:
+                iterations += 1
+                new = defaultdict(set)
+                if delta is None or naive:
+                    for rule in rules:
+                        new[rule[0]] |= self._fire(rule)
+                else:
+                    delta_indexes = {}
+                    for rule in rules:
+                        for position, literal in enumerate(rule[2]):
+                            if literal[0] == 'pos' and literal[1] in heads and delta.get(literal[1]):
+                                new[rule[0]] |= self._fire(rule, delta, position, delta_indexes)
+                delta = {}
+                for pred, facts in new.items():
+                    facts -= self.facts[pred]
+                    if facts:
+                        delta[pred] = facts
+                        self._insert(pred, facts)
+                        derived += len(facts)
+                if not delta:
+                    break
+        self.solved = True
+        seconds = time.perf_counter() - started
+        return {'iterations': iterations, 'derived': derived, 'seconds': seconds,
+                'facts_per_second': derived / seconds if seconds else 0.0, 'strata': len(strata)}
+
+    def query(self, goal):
+        """
+        Answers a query (text such as "assign_teacher(john, T)", or parsed body
+        literals) as a list of {variable name: value} dicts, solving first if needed.
+        """
+        if isinstance(goal, str):
+            tokens = tokenize(goal.strip().rstrip('.').removeprefix('?-'))
+            parser = _Parser(tokens)
+            goal = parser.body()
+            if not parser.done():
+                raise DatalogError("Trailing tokens in query")
+        goal = self._negations(goal)
+        if not self.solved:
+            self.solve()
+        names = list(dict.fromkeys(v for literal in goal for v in self._literal_vars(literal)))
+        steps, slots = self._plan(goal, [], names)
+        answers = []
+        seen = set()
+        for binding in self._run(steps, slots, [()]):
+            values = tuple(binding[slots[v]] for v in names)
+            if values not in seen:
+                seen.add(values)
+                answers.append({v.name: value for v, value in zip(names, values)})
+        return answers
+
+
+def format_term(value):
+    """Writes a value back as Prolog source."""
+    if isinstance(value, str) and not re.fullmatch(r'[a-z]\w*', value):
+        return "'" + value.replace("'", "''") + "'"
+    return str(value)
+
+
+def format_fact(pred, args):
+    return f"{pred}({', '.join(map(format_term, args))})" if args else pred
+
+
+def chain_program(length):
+    """Transitive closure of a path of 'length' edges: length * (length + 1) / 2 reach facts."""
+    program = Program()
+    for i in range(length):
+        program.add_fact('edge', (i, i + 1))
+    program.consult("reach(X, Y) :- edge(X, Y).\nreach(X, Z) :- reach(X, Y), edge(Y, Z).")
+    return program
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate Prolog fact/rule files bottom-up as Datalog.")
+    parser.add_argument('files', nargs='*', help="Prolog source files")
+    parser.add_argument('-e', '--clauses', action='append', default=[], help="extra clauses as text")
+    parser.add_argument('-q', '--query', action='append', default=[], help="query to answer after solving")
+    parser.add_argument('--naive', action='store_true', help="re-join everything each round (for comparison)")
+    parser.add_argument('--print', action='store_true', dest='print_facts', help="print every derived fact")
+    parser.add_argument('--bench', type=int, metavar='LENGTH',
+                        help="time the transitive closure of a LENGTH-edge chain instead")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        program = chain_program(args.bench)
+        stats = program.solve(naive=args.naive)
+        print(f"{'naive' if args.naive else 'semi-naive'} closure of {args.bench} edges: "
+              f"{stats['derived']} facts derived in {stats['iterations']} iterations, "
+              f"{stats['seconds']:.2f}s ({stats['facts_per_second']:,.0f} facts/s)")
+        return
+
+    program = Program()
+    for path in args.files:
+        program.load(path)
+    for text in args.clauses:
+        program.consult(text)
+    before = {pred: set(facts) for pred, facts in program.facts.items()}
+    for source, reason in program.skipped:
+        print(f"skipped: {source} ({reason})", file=sys.stderr)
+    try:
+        stats = program.solve(naive=args.naive)
+    except DatalogError as error:
+        parser.exit(1, f"error: {error}\n")
+    if args.print_facts:
+        for pred in sorted(program.facts):
+            if pred.startswith('_'):
+                continue
+            for fact in sorted(program.facts[pred] - before.get(pred, set()), key=repr):
+                print(format_fact(pred, fact) + '.')
+    for text, body in program.queries + [(q, q) for q in args.query]:
+        print(f"?- {text}.")
+        try:
+            answers = program.query(body)
+        except DatalogError as error:
+            print(f"   error: {error}")
+            continue
+        for answer in answers:
+            print('   ' + (', '.join(f"{k} = {format_term(v)}" for k, v in answer.items()) or 'true'))
+        if not answers:
+            print('   false')
+    print(f"{stats['derived']} facts derived in {stats['iterations']} iterations over {stats['strata']} strata, "
+          f"{stats['seconds']:.3f}s ({stats['facts_per_second']:,.0f} facts/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,262 @@
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.datasets import load_iris
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
+"""
+Decision tree on the iris data set.
 
-iris = load_iris()
+    python "Decision Tree classifier.py"                      train and report test accuracy
+    python "Decision Tree classifier.py" train [--model PATH]  train and save the model
+    python "Decision Tree classifier.py" predict [--model PATH] [--format csv|jsonl] < rows
 
-X_train, X_test, y_train, y_test = train_test_split(iris.data, iris.target, test_size=0.3, random_state=42)
+train saves the fitted DecisionTreeClassifier with pickle, the tree
+compiled to flat arrays (CompiledTree) in a .npz next to it, and a JSON file
+of metadata (feature and class names, accuracy, versions, checksums).
+Unpickling the classifier would import most of scikit-learn, so predict
+only loads the .npz and walks the tree with NumPy. It streams rows from
+stdin in batches, writes one prediction per row to stdout, and reports the
+cold-start time and rows per second on stderr. Malformed rows are reported
+with their line number on stderr (and as an error record in jsonl output);
+the stream goes on.
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
 
-clf = DecisionTreeClassifier()
+STARTED = time.perf_counter()
 
-clf.fit(X_train, y_train)
 
-y_pred = clf.predict(X_test)
+def load_data(csv_path=None, target=None):
+    """(X, y, feature names, class names) of iris, or of a CSV file with a header and a 'target' column."""
+    if csv_path is None:
+        from sklearn.datasets import load_iris
 
-accuracy = accuracy_score(y_test, y_pred)
+        iris = load_iris()
+        return iris.data, iris.target, list(iris.feature_names), [str(name) for name in iris.target_names]
 
-print("Accuracy:", accuracy)
+    import csv
 
-print("Result: Hence, the Python program to implement Decision Tree is successfully executed.")
+    with open(csv_path, newline='') as file:
+        rows = list(csv.reader(file))
+    header, rows = rows[0], rows[1:]
+    column = header.index(target)
+    class_names = sorted({row[column] for row in rows})
+    code = {name: i for i, name in enumerate(class_names)}
+    features = [name for i, name in enumerate(header) if i != column]
+    X = [[float(value) for i, value in enumerate(row) if i != column] for row in rows]
+    y = [code[row[column]] for row in rows]
+    return X, y, features, class_names
+
+
+def train(csv_path=None, target=None):
+    """Fits a tree on 70% of the data; returns (classifier, test accuracy, data description)."""
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.tree import DecisionTreeClassifier
+
+    X, y, features, class_names = load_data(csv_path, target)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+    clf = DecisionTreeClassifier()
+    clf.fit(X_train, y_train)
+    accuracy = accuracy_score(y_test, clf.predict(X_test))
+    return clf, accuracy, {'feature_names': features, 'class_names': class_names,
+                           'train_rows': len(X_train), 'test_rows': len(X_test)}
+
+
+def metadata_path(model_path):
+    return os.path.splitext(model_path)[0] + '.json'
+
+
+def arrays_path(model_path):
+    return os.path.splitext(model_path)[0] + '.npz'
+
+
+def file_digest(path):
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def save_model(clf, accuracy, description, model_path):
+    """Writes the pickle, the node arrays and the metadata; returns the metadata."""
+    import platform
+
+    import sklearn
+
+    from CompiledTree import CompiledTree
+
+    with open(model_path, 'wb') as file:
+        pickle.dump(clf, file, protocol=pickle.HIGHEST_PROTOCOL)
+    CompiledTree.from_classifier(clf).save(arrays_path(model_path))
+    metadata = dict(description,
+                    model=model_path,
+                    sha256=file_digest(model_path),
+                    arrays_sha256=file_digest(arrays_path(model_path)),
+                    test_accuracy=accuracy,
+                    depth=int(clf.get_depth()),
+                    leaves=int(clf.get_n_leaves()),
+                    params=clf.get_params(),
+                    sklearn_version=sklearn.__version__,
+                    python_version=platform.python_version(),
+                    trained_at=time.strftime('%Y-%m-%dT%H:%M:%S%z'))
+    with open(metadata_path(model_path), 'w') as file:
+        json.dump(metadata, file, indent=2)
+    return metadata
+
+
+def load_classifier(model_path):
+    """The pickled DecisionTreeClassifier, if it matches the checksum recorded at training time; only load models you trust."""
+    with open(metadata_path(model_path)) as file:
+        metadata = json.load(file)
+    if file_digest(model_path) != metadata['sha256']:
+        raise ValueError(f"{model_path} does not match the checksum in {metadata_path(model_path)}")
+    with open(model_path, 'rb') as file:
+        return pickle.load(file)
+
+
+def load_model(model_path):
+    """(CompiledTree, metadata), without importing scikit-learn."""
+    from CompiledTree import CompiledTree
+
+    with open(metadata_path(model_path)) as file:
+        metadata = json.load(file)
+    if file_digest(arrays_path(model_path)) != metadata['arrays_sha256']:
+        raise ValueError(f"{arrays_path(model_path)} does not match the checksum in {metadata_path(model_path)}")
+    return CompiledTree.load(arrays_path(model_path)), metadata
+
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_row(line, input_format, feature_names, order):
+    """(id, feature values) of one line; raises ValueError or KeyError if it is malformed."""
+    if input_format == 'csv':
+        values = line.split(',')
+        if order is not None:
+            if len(values) <= max(order):
+                raise ValueError(f"expected at least {max(order) + 1} fields, got {len(values)}")
+            values = [values[i] for i in order]
+        elif len(values) != len(feature_names):
+            raise ValueError(f"expected {len(feature_names)} fields, got {len(values)}")
+        return None, [float(value) for value in values]
+    record = json.loads(line)
+    if isinstance(record, dict):
+        return record.get('id'), [float(record[name]) for name in feature_names]
+    if not isinstance(record, list) or len(record) != len(feature_names):
+        raise ValueError(f"expected an object or a list of {len(feature_names)} numbers")
+    return None, [float(value) for value in record]
+
+
+def read_batches(lines, input_format, feature_names, batch_size):
+    """
+    Yields (ids, rows, errors) batches of at most batch_size lines, where
+    errors maps the position in the batch of each malformed line to
+    'line N: reason' (its row is None).
+
+    CSV lines are comma-separated numbers in feature order. A first line with
+    a non-numeric field is a header instead: the features are then taken by
+    name, in any order, and other columns (target, id, ...) are ignored. JSON
+    lines are either lists of numbers or objects keyed by feature name, with
+    an optional 'id' echoed into the output.
+    """
+    order = None
+    first = True
+    ids, rows, errors = [], [], {}
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if first and input_format == 'csv':
+            first = False
+            header = [value.strip() for value in line.split(',')]
+            if not all(map(_is_number, header)):
+                missing = [name for name in feature_names if name not in header]
+                if missing:
+                    raise ValueError(f"line {number}: header has no column for {', '.join(missing)}")
+                order = [header.index(name) for name in feature_names]
+                continue
+        try:
+            row_id, row = parse_row(line, input_format, feature_names, order)
+        except (ValueError, KeyError) as e:
+            errors[len(rows)] = f"line {number}: {type(e).__name__}: {e}"
+            row_id, row = None, None
+        ids.append(row_id)
+        rows.append(row)
+        if len(rows) == batch_size:
+            yield ids, rows, errors
+            ids, rows, errors = [], [], {}
+    if rows:
+        yield ids, rows, errors
+
+
+def predict_stream(model_path, source, output, input_format='csv', batch_size=4096, log=sys.stderr):
+    """
+    Predicts every row of 'source'; malformed rows give an empty CSV line or a
+    jsonl error record, and their line number on 'log'.
+    Returns (cold-start seconds, rows, malformed rows, prediction seconds).
+    """
+    tree, metadata = load_model(model_path)
+    cold_start = time.perf_counter() - STARTED
+    names = metadata['class_names']
+    count = failed = 0
+    started = time.perf_counter()
+    for ids, rows, errors in read_batches(source, input_format, metadata['feature_names'], batch_size):
+        valid = [row for row in rows if row is not None]
+        labels = iter([names[c] for c in tree.predict(valid).tolist()] if valid else [])
+        lines = []
+        for i, row_id in enumerate(ids):
+            if i in errors:
+                print(errors[i], file=log)
+                lines.append('' if input_format == 'csv' else json.dumps({'error': errors[i]}))
+            elif input_format == 'csv':
+                lines.append(next(labels))
+            else:
+                label = next(labels)
+                lines.append(json.dumps({'id': row_id, 'prediction': label} if row_id is not None else
+                                        {'prediction': label}))
+        output.write('\n'.join(lines) + '\n')
+        count += len(rows)
+        failed += len(errors)
+    return cold_start, count, failed, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train a decision tree, or predict with a saved one.")
+    commands = parser.add_subparsers(dest='command')
+    train_parser = commands.add_parser('train', help="fit on iris (or --csv) and save the model")
+    train_parser.add_argument('--model', default='decision_tree.pkl', help="pickle to write; metadata goes to .json")
+    train_parser.add_argument('--csv', help="training data with a header row, instead of iris")
+    train_parser.add_argument('--target', default='target', help="class column of --csv")
+    predict_parser = commands.add_parser('predict', help="stream rows from stdin, one prediction per line")
+    predict_parser.add_argument('--model', default='decision_tree.pkl', help="pickle given to train; reads its .npz and .json")
+    predict_parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    predict_parser.add_argument('--batch', type=int, default=4096, help="rows per predict() call")
+    args = parser.parse_args(argv)
+
+    if args.command == 'train':
+        clf, accuracy, description = train(args.csv, args.target)
+        metadata = save_model(clf, accuracy, description, args.model)
+        print(f"Saved {args.model} and {metadata_path(args.model)}: depth {metadata['depth']}, "
+              f"{metadata['leaves']} leaves, test accuracy {accuracy:.3f}")
+    elif args.command == 'predict':
+        try:
+            cold_start, count, failed, seconds = predict_stream(args.model, sys.stdin, sys.stdout,
+                                                                args.format, args.batch)
+        except ValueError as e:
+            parser.exit(1, f"error: {e}\n")
+        rate = count / seconds if seconds else 0.0
+        print(f"cold start {cold_start * 1000:.0f} ms, {count} rows in {seconds:.3f}s ({rate:,.0f} rows/s)"
+              + (f", {failed} malformed" if failed else ""), file=sys.stderr)
+        return 1 if failed else 0
+    else:
+        clf, accuracy, _ = train()
+        print("Accuracy:", accuracy)
+        print("Result: Hence, the Python program to implement Decision Tree is successfully executed.")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
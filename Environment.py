@@ -1,22 +1,220 @@
+import math
+import mmap
+import os
 import random
+import struct
+import time
+from array import array
+
+
+class DirtIndex:
+    """
+    Set of dirty cells for nearest-dirty queries without scanning the grid.
+
+    Cells are bucketed into BUCKET x BUCKET squares, each stored as one int
+    bitmask, and every row of buckets keeps a count of its dirty cells so that
+    clean stretches of the world are skipped. nearest() first checks the cells
+    within NEAR steps one by one, then searches rings of buckets outward until
+    no unsearched bucket can hold a closer cell.
+    """
+
+    BUCKET = 16
+    NEAR = 4
+
+    def __init__(self, width, height, cells=()):
+        self.width = width
+        self.height = height
+        self.columns = -(-width // self.BUCKET)
+        self.rows = -(-height // self.BUCKET)
+        self.masks = [0] * (self.columns * self.rows)
+        self.row_counts = [0] * self.rows
+        self.count = 0
+        for x, y in cells:
+            self.add(x, y)
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Index of the True cells of a list-of-rows grid."""
+        index = cls(len(grid[0]) if grid else 0, len(grid))
+        for y, row in enumerate(grid):
+            for x, dirty in enumerate(row):
+                if dirty:
+                    index.add(x, y)
+        return index
+
+    def copy(self):
+        index = DirtIndex(self.width, self.height)
+        index.masks = self.masks[:]
+        index.row_counts = self.row_counts[:]
+        index.count = self.count
+        return index
+
+    def _slot(self, x, y):
+        size = self.BUCKET
+        return (y // size) * self.columns + x // size, 1 << ((y % size) * size + x % size)
+
+    def __contains__(self, cell):
+        bucket, bit = self._slot(*cell)
+        return bool(self.masks[bucket] & bit)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x, y):
+        bucket, bit = self._slot(x, y)
+        if not self.masks[bucket] & bit:
+            self.masks[bucket] |= bit
+            self.row_counts[y // self.BUCKET] += 1
+            self.count += 1
+
+    def discard(self, x, y):
+        bucket, bit = self._slot(x, y)
+        if self.masks[bucket] & bit:
+            self.masks[bucket] ^= bit
+            self.row_counts[y // self.BUCKET] -= 1
+            self.count -= 1
+
+    def nearest(self, x, y):
+        """
+        Dirty cell closest to (x, y) in Manhattan distance, ties going to the
+        smallest y and then x; None if there is none.
+        """
+        if not self:
+            return None
+        masks, size = self.masks, self.BUCKET
+
+        # Cell by cell over diamonds of growing radius: cheap when dirt is dense
+        for distance in range(self.NEAR + 1):
+            for cell_y in range(max(0, y - distance), min(self.height - 1, y + distance) + 1):
+                offset = distance - abs(cell_y - y)
+                for cell_x in ((x - offset, x + offset) if offset else (x,)):
+                    if 0 <= cell_x < self.width:
+                        bucket, bit = self._slot(cell_x, cell_y)
+                        if masks[bucket] & bit:
+                            return cell_x, cell_y
+
+        best = None  # (distance, y, x)
+        center_x, center_y = x // size, y // size
+        ring = 0
+        while True:
+            # Every cell in ring r of buckets is at least (r - 1) * size + 1 steps away
+            if best is not None and best[0] <= (ring - 1) * size:
+                break
+            if (center_x - ring < 0 and center_x + ring >= self.columns
+                    and center_y - ring < 0 and center_y + ring >= self.rows):
+                break
+            for row in range(max(0, center_y - ring), min(self.rows - 1, center_y + ring) + 1):
+                if not self.row_counts[row]:
+                    continue
+                if abs(row - center_y) == ring:
+                    columns = range(max(0, center_x - ring), min(self.columns - 1, center_x + ring) + 1)
+                else:
+                    columns = [c for c in (center_x - ring, center_x + ring) if 0 <= c < self.columns]
+                top = row * size
+                for column in columns:
+                    mask = masks[row * self.columns + column]
+                    if not mask:
+                        continue
+                    left = column * size
+                    bound = max(0, left - x, x - left - size + 1) + max(0, top - y, y - top - size + 1)
+                    if best is not None and bound > best[0]:
+                        continue
+                    while mask:
+                        low = mask & -mask
+                        mask ^= low
+                        cell_y, cell_x = divmod(low.bit_length() - 1, size)
+                        cell = (abs(left + cell_x - x) + abs(top + cell_y - y), top + cell_y, left + cell_x)
+                        if best is None or cell < best:
+                            best = cell
+            ring += 1
+        return None if best is None else (best[2], best[1])
+
+
+def nearest_neighbour_tour(start, index):
+    """Visits every cell of 'index' (a DirtIndex, emptied as it goes), always moving to the closest one left."""
+    tour = []
+    x, y = start
+    while len(index):
+        x, y = index.nearest(x, y)
+        index.discard(x, y)
+        tour.append((x, y))
+    return tour
+
+
+def two_opt(start, tour, window=50, max_passes=4):
+    """
+    Improves an open tour from 'start' in place by reversing segments while
+    that shortens it (Manhattan distance). Only segments of up to 'window'
+    cells are tried, so a pass costs O(len(tour) * window).
+    """
+    points = [start] + tour
+    last = len(points) - 1
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, last):
+            ax, ay = points[i - 1]
+            bx, by = points[i]
+            ab = abs(ax - bx) + abs(ay - by)
+            for j in range(i + 1, min(last, i + window) + 1):
+                cx, cy = points[j]
+                delta = abs(ax - cx) + abs(ay - cy) - ab
+                if j < last:
+                    dx, dy = points[j + 1]
+                    delta += abs(bx - dx) + abs(by - dy) - abs(cx - dx) - abs(cy - dy)
+                if delta < 0:
+                    points[i:j + 1] = points[j:i - 1:-1]
+                    bx, by = points[i]
+                    ab = abs(ax - bx) + abs(ay - by)
+                    improved = True
+        if not improved:
+            break
+    tour[:] = points[1:]
+    return tour
+
+
+def tour_length(start, tour):
+    length, (x, y) = 0, start
+    for next_x, next_y in tour:
+        length += abs(next_x - x) + abs(next_y - y)
+        x, y = next_x, next_y
+    return length
+
 
 class Environment:
     """Represents the environment for the vacuum cleaner."""
 
-    def __init__(self, width, height):
+    def __init__(self, width, height, dirt=0.5, verbose=True):
         """
         Initializes the environment.
 
         Args:
             width (int): The width of the environment (number of columns).
             height (int): The height of the environment (number of rows).
+            dirt (float): Probability that a cell starts dirty.
+            verbose (bool): Print every action.
         """
         self.width = width
         self.height = height
-        self.grid = [[random.choice([True, False]) for _ in range(width)] for _ in range(height)]  # True = dirty, False = clean
+        if dirt == 0.5:
+            # The original draw, so seeded worlds built with the default stay the same
+            self.grid = [[random.choice([True, False]) for _ in range(width)] for _ in range(height)]  # True = dirty, False = clean
+        else:
+            self.grid = [[random.random() < dirt for _ in range(width)] for _ in range(height)]
         self.agent_x = random.randint(0, width - 1)
         self.agent_y = random.randint(0, height - 1)
         self.performance = 0  # Agent's performance score
+        self.verbose = verbose
+        self._dirt = None  # DirtIndex, built on the first nearest-dirty query
+
+    def dirt_index(self):
+        """The DirtIndex of the grid, kept up to date by clean() once built. Edit the grid through clean() only."""
+        if self._dirt is None:
+            self._dirt = DirtIndex.from_grid(self.grid)
+        return self._dirt
+
+    def nearest_dirty(self, x, y):
+        """Closest dirty cell to (x, y) in Manhattan distance, or None if everything is clean."""
+        return self.dirt_index().nearest(x, y)
 
     def display(self):
         """Displays the current state of the environment."""
@@ -41,32 +239,43 @@ class Environment:
     def clean(self, x, y):
         """Cleans a specific location."""
         if self.is_dirty(x, y):
-            self.grid[y][x] = False
+            self._remove_dirt(x, y)
             self.performance += 10  # Reward for cleaning
-            print(f"Cleaning cell ({x}, {y})")
+            if self.verbose:
+                print(f"Cleaning cell ({x}, {y})")
         else:
             self.performance -= 1  # Penalty for cleaning an already clean cell
-            print(f"Cell ({x}, {y}) already clean")
+            if self.verbose:
+                print(f"Cell ({x}, {y}) already clean")
+
+    def _remove_dirt(self, x, y):
+        self.grid[y][x] = False
+        if self._dirt is not None:
+            self._dirt.discard(x, y)
 
     def move_up(self):
         """Moves the agent up, if possible."""
         if self.agent_y > 0:
             self.agent_y -= 1
             self.performance -= 1  # Penalty for moving
-            print("Moving Up")
+            if self.verbose:
+                print("Moving Up")
         else:
             self.performance -= 5 # Penalty for bumping into wall
-            print("Cannot move up - Bumping into wall!")
+            if self.verbose:
+                print("Cannot move up - Bumping into wall!")
 
     def move_down(self):
         """Moves the agent down, if possible."""
         if self.agent_y < self.height - 1:
             self.agent_y += 1
             self.performance -= 1 # Penalty for moving
-            print("Moving Down")
+            if self.verbose:
+                print("Moving Down")
         else:
             self.performance -= 5 # Penalty for bumping into wall
-            print("Cannot move down - Bumping into wall!")
+            if self.verbose:
+                print("Cannot move down - Bumping into wall!")
 
 
     def move_left(self):
@@ -74,20 +283,314 @@ class Environment:
         if self.agent_x > 0:
             self.agent_x -= 1
             self.performance -= 1 # Penalty for moving
-            print("Moving Left")
+            if self.verbose:
+                print("Moving Left")
         else:
             self.performance -= 5 # Penalty for bumping into wall
-            print("Cannot move left - Bumping into wall!")
+            if self.verbose:
+                print("Cannot move left - Bumping into wall!")
 
     def move_right(self):
         """Moves the agent right, if possible."""
         if self.agent_x < self.width - 1:
             self.agent_x += 1
             self.performance -= 1 # Penalty for moving
-            print("Moving Right")
+            if self.verbose:
+                print("Moving Right")
         else:
             self.performance -= 5 # Penalty for bumping into wall
-            print("Cannot move right - Bumping into wall!")
+            if self.verbose:
+                print("Cannot move right - Bumping into wall!")
+
+
+class LargeEnvironment(Environment):
+    """
+    Environment for worlds too big for a list-of-lists grid: one bit per cell
+    in an anonymous memory map, or in a memory-mapped file with 'path'. Either
+    way the pages of chunks never touched take no memory.
+
+    The grid is stored in CHUNK x CHUNK squares (the buckets of DirtIndex, in
+    the same bit order), each generated from its own seeded RNG the first time
+    it is touched, so only the visited part of the world costs time. is_dirty,
+    clean, the moves and every Agent behave as with Environment; display()
+    shows a viewport around the agent.
+
+    Buffer layout: 32 bytes of dirt bits per chunk, in row-major chunk order,
+    then one byte per chunk set once it has been generated. A file also ends
+    with a TRAILER of width, height, seed and dirt, outside the mapped buffer:
+    reopening it with the same values continues the world stored in it, and
+    with different ones raises ValueError.
+    """
+
+    CHUNK = DirtIndex.BUCKET
+    CHUNK_BYTES = CHUNK * CHUNK // 8
+    MAGIC = b'VACW'
+    TRAILER = struct.Struct('<4s4xqqqd')  # magic, width, height, seed, dirt
+
+    def __init__(self, width, height, dirt=0.5, seed=0, path=None, verbose=True):
+        """
+        Args:
+            width (int): The width of the environment (number of columns).
+            height (int): The height of the environment (number of rows).
+            dirt (float): Probability that a cell starts dirty.
+            seed (int): Seed of the dirt and of the agent's starting cell.
+            path (str): Optional file to memory-map the grid from.
+            verbose (bool): Print every action.
+        """
+        self.width = width
+        self.height = height
+        self.dirt = dirt
+        self.seed = seed
+        self.verbose = verbose
+        self.columns = -(-width // self.CHUNK)
+        self.rows = -(-height // self.CHUNK)
+        chunks = self.columns * self.rows
+        self.flags_offset = chunks * self.CHUNK_BYTES
+        size = self.flags_offset + chunks
+
+        self.file = None
+        if path is None:
+            self.buffer = mmap.mmap(-1, size)  # Zero pages appear on first write, unlike bytearray(size)
+        else:
+            trailer = self.TRAILER.pack(self.MAGIC, width, height, seed, dirt)
+            reuse = self._stored_world(path, size) == trailer
+            self.file = open(path, 'r+b' if reuse else 'w+b')
+            if not reuse:
+                self.file.truncate(size)  # Sparse on most file systems: untouched chunks take no disk
+                self.file.seek(size)
+                self.file.write(trailer)
+                self.file.flush()
+            self.buffer = mmap.mmap(self.file.fileno(), size)
+
+        # Per row of chunks: dirty cells in generated chunks, and chunks not generated yet
+        self.row_dirt = array('q', [0]) * self.rows
+        self.row_pending = array('q', [self.columns]) * self.rows
+        if self.file is not None and reuse:
+            self._count_rows()
+
+        rng = random.Random(seed)
+        self.agent_x = rng.randrange(width)
+        self.agent_y = rng.randrange(height)
+        self.performance = 0
+        self._dirt = None
+
+    def _stored_world(self, path, size):
+        """
+        The trailer of an existing world file, None if 'path' is not one.
+        Raises ValueError if it holds a world of another size, seed or dirt.
+        """
+        if not os.path.exists(path) or os.path.getsize(path) < self.TRAILER.size:
+            return None
+        with open(path, 'rb') as file:
+            file.seek(-self.TRAILER.size, os.SEEK_END)
+            trailer = file.read()
+        magic, width, height, seed, dirt = self.TRAILER.unpack(trailer)
+        if magic != self.MAGIC:
+            return None
+        if (width, height, seed, dirt) != (self.width, self.height, self.seed, self.dirt):
+            raise ValueError(f"{path} holds a {width}x{height} world with seed {seed} and dirt {dirt}, "
+                             f"not {self.width}x{self.height} with seed {self.seed} and dirt {self.dirt}")
+        if os.path.getsize(path) != size + self.TRAILER.size:
+            raise ValueError(f"{path} is truncated")
+        return trailer
+
+    def close(self):
+        if self.file is not None:
+            self.buffer.close()
+            self.file.close()
+            self.file = None
+
+    def _count_rows(self):
+        row_bytes = self.columns * self.CHUNK_BYTES
+        for row in range(self.rows):
+            flags = self.buffer[self.flags_offset + row * self.columns:self.flags_offset + (row + 1) * self.columns]
+            self.row_pending[row] = self.columns - flags.count(1)
+            self.row_dirt[row] = int.from_bytes(self.buffer[row * row_bytes:(row + 1) * row_bytes], 'little').bit_count()
+
+    def _chunk_bits(self, chunk):
+        """Dirt of a new chunk, from an RNG seeded by the world seed and the chunk number."""
+        rng = random.Random(self.seed << 64 | chunk)
+        cells = self.CHUNK * self.CHUNK
+        if self.dirt <= 0:
+            bits = 0
+        elif self.dirt >= 1:
+            bits = (1 << cells) - 1
+        elif self.dirt == 0.5:
+            bits = rng.getrandbits(cells)
+        else:
+            # Jump from one dirty cell to the next with geometric gaps
+            bits = 0
+            log_clean = math.log(1 - self.dirt)
+            i = int(math.log(1 - rng.random()) / log_clean)
+            while i < cells:
+                bits |= 1 << i
+                i += 1 + int(math.log(1 - rng.random()) / log_clean)
+
+        # Drop the cells of edge chunks that lie outside the world
+        row, column = divmod(chunk, self.columns)
+        inside_x = min(self.CHUNK, self.width - column * self.CHUNK)
+        inside_y = min(self.CHUNK, self.height - row * self.CHUNK)
+        if inside_x < self.CHUNK or inside_y < self.CHUNK:
+            row_mask = (1 << inside_x) - 1
+            bits &= sum(row_mask << (r * self.CHUNK) for r in range(inside_y))
+        return bits
+
+    def chunk_mask(self, chunk):
+        """The chunk's dirt bits as an int (bit (y % CHUNK) * CHUNK + x % CHUNK), generating it if needed."""
+        start = chunk * self.CHUNK_BYTES
+        if not self.buffer[self.flags_offset + chunk]:
+            bits = self._chunk_bits(chunk)
+            self.buffer[start:start + self.CHUNK_BYTES] = bits.to_bytes(self.CHUNK_BYTES, 'little')
+            self.buffer[self.flags_offset + chunk] = 1
+            row = chunk // self.columns
+            self.row_pending[row] -= 1
+            self.row_dirt[row] += bits.bit_count()
+            return bits
+        return int.from_bytes(self.buffer[start:start + self.CHUNK_BYTES], 'little')
+
+    def _locate(self, x, y):
+        """(chunk, byte offset, bit within the byte) of a cell."""
+        size = self.CHUNK
+        chunk = (y // size) * self.columns + x // size
+        bit = (y % size) * size + x % size
+        return chunk, chunk * self.CHUNK_BYTES + (bit >> 3), 1 << (bit & 7)
+
+    def is_dirty(self, x, y):
+        """Checks if a specific location is dirty."""
+        chunk, offset, bit = self._locate(x, y)
+        if not self.buffer[self.flags_offset + chunk]:
+            self.chunk_mask(chunk)
+        return bool(self.buffer[offset] & bit)
+
+    def _remove_dirt(self, x, y):
+        chunk, offset, bit = self._locate(x, y)
+        self.buffer[offset] &= ~bit & 0xFF
+        self.row_dirt[y // self.CHUNK] -= 1
+
+    def dirt_index(self):
+        """A DirtIndex view that reads the chunks straight from the buffer."""
+        if self._dirt is None:
+            self._dirt = ChunkIndex(self)
+        return self._dirt
+
+    def display(self, radius=10):
+        """Displays the cells within 'radius' of the agent."""
+        left, right = max(0, self.agent_x - radius), min(self.width - 1, self.agent_x + radius)
+        top, bottom = max(0, self.agent_y - radius), min(self.height - 1, self.agent_y + radius)
+        for y in range(top, bottom + 1):
+            row = ""
+            for x in range(left, right + 1):
+                if self.agent_x == x and self.agent_y == y:
+                    row += "A "  # Agent
+                elif self.is_dirty(x, y):
+                    row += "* "  # Dirty
+                else:
+                    row += "_ "  # Clean
+            print(row)
+        print(f"Agent Location: ({self.agent_x}, {self.agent_y}), showing x {left}-{right}, y {top}-{bottom}")
+        print(f"Performance: {self.performance}")
+        print("-" * ((right - left + 1) * 2))  # Separator
+
+    def _generated(self):
+        """Numbers of the chunks generated so far, skipping rows of chunks with none."""
+        chunks = []
+        for row in range(self.rows):
+            if self.row_pending[row] == self.columns:
+                continue
+            start = self.flags_offset + row * self.columns
+            end = start + self.columns
+            position = self.buffer.find(b'\1', start, end)
+            while position >= 0:
+                chunks.append(position - self.flags_offset)
+                position = self.buffer.find(b'\1', position + 1, end)
+        return chunks
+
+    def snapshot(self):
+        """The whole world state, to hand back to restore(): a copy of the generated chunks only."""
+        chunks = self._generated()
+        size = self.CHUNK_BYTES
+        data = b''.join(self.buffer[chunk * size:(chunk + 1) * size] for chunk in chunks)
+        return (self.agent_x, self.agent_y, self.performance, array('q', chunks), data,
+                array('q', self.row_dirt), array('q', self.row_pending))
+
+    def restore(self, snapshot):
+        """Returns the world to a snapshot() taken from a world of the same size."""
+        self.agent_x, self.agent_y, self.performance, chunks, data, row_dirt, row_pending = snapshot
+        # Chunks generated since the snapshot go back to ungenerated: chunk_mask rewrites their bits
+        for chunk in self._generated():
+            self.buffer[self.flags_offset + chunk] = 0
+        size = self.CHUNK_BYTES
+        for i, chunk in enumerate(chunks):
+            self.buffer[chunk * size:(chunk + 1) * size] = data[i * size:(i + 1) * size]
+            self.buffer[self.flags_offset + chunk] = 1
+        self.row_dirt[:] = row_dirt
+        self.row_pending[:] = row_pending
+
+
+class _ChunkMasks:
+    """Sequence of a LargeEnvironment's chunk masks, for DirtIndex.nearest."""
+
+    def __init__(self, environment):
+        self.chunk_mask = environment.chunk_mask
+
+    def __getitem__(self, chunk):
+        return self.chunk_mask(chunk)
+
+
+class _RowHints:
+    """Per row of chunks: non-zero while the row may still hold dirt."""
+
+    def __init__(self, environment):
+        self.row_dirt = environment.row_dirt
+        self.row_pending = environment.row_pending
+
+    def __getitem__(self, row):
+        return self.row_dirt[row] or self.row_pending[row]
+
+
+class ChunkIndex(DirtIndex):
+    """
+    DirtIndex over a LargeEnvironment's buffer. Chunks are generated as
+    nearest() reaches them; len() and copy() need the whole world and
+    generate every chunk.
+    """
+
+    def __init__(self, environment):
+        super().__init__(0, 0)
+        self.environment = environment
+        self.width, self.height = environment.width, environment.height
+        self.columns, self.rows = environment.columns, environment.rows
+        self.masks = _ChunkMasks(environment)
+        self.row_counts = _RowHints(environment)
+
+    def _generate_all(self):
+        for chunk in range(self.columns * self.rows):
+            self.masks[chunk]
+
+    def __bool__(self):
+        # True while dirt may be left; nearest() finds out for ungenerated chunks
+        return any(self.environment.row_dirt) or any(self.environment.row_pending)
+
+    def __len__(self):
+        self._generate_all()
+        return sum(self.environment.row_dirt)
+
+    def __contains__(self, cell):
+        return self.environment.is_dirty(*cell)
+
+    def add(self, x, y):
+        raise TypeError("Dirt is only removed from a LargeEnvironment")
+
+    def discard(self, x, y):
+        raise TypeError("Use LargeEnvironment.clean")
+
+    def copy(self):
+        self._generate_all()
+        index = DirtIndex(self.width, self.height)
+        index.masks = [self.masks[chunk] for chunk in range(self.columns * self.rows)]
+        index.row_counts = list(self.environment.row_dirt)
+        index.count = sum(index.row_counts)
+        return index
 
 
 class Agent:
@@ -96,6 +599,9 @@ class Agent:
     def __init__(self, environment):
         """Initializes the agent with a reference to the environment."""
         self.environment = environment
+        self.target = None  # Dirty cell deliberate_agent is heading for
+        self.tour = None  # Cleaning tour replayed by planned_agent
+        self.tour_position = 0
 
     def simple_reflex_agent(self):
         """A simple reflex agent that cleans if the current location is dirty."""
@@ -115,25 +621,10 @@ class Agent:
             else:
                 self.environment.move_right()
 
-    def deliberate_agent(self):
-        """A deliberate agent which scans the environment and then cleans."""
-        #This is a very basic implementation and can be improved
-        dirty_cells = []
-
-        #Scan the environment
-        for y in range(self.environment.height):
-            for x in range(self.environment.width):
-                if self.environment.is_dirty(x, y):
-                    dirty_cells.append((x,y))
-
-        if not dirty_cells:
-            print("No dirty cells left. Halting.")
-            return
-
-        #Move to the nearest dirty cell (very basic)
-        nearest_dirty = dirty_cells[0]
-        dx = nearest_dirty[0] - self.environment.agent_x
-        dy = nearest_dirty[1] - self.environment.agent_y
+    def _step_towards(self, cell):
+        """One move towards 'cell', horizontal first, or cleans it once there."""
+        dx = cell[0] - self.environment.agent_x
+        dy = cell[1] - self.environment.agent_y
 
         if dx > 0:
             self.environment.move_right()
@@ -146,6 +637,79 @@ class Agent:
         else: #At the dirty cell
             self.environment.clean(self.environment.agent_x, self.environment.agent_y)
 
+    def _halt(self):
+        if self.environment.verbose:
+            print("No dirty cells left. Halting.")
+
+    def deliberate_agent(self):
+        """
+        A deliberate agent which heads for the nearest dirty cell and cleans it.
+        The environment's dirt index answers the query, so a step does not scan
+        the grid; the target stays the nearest one all the way there, since every
+        move brings it one step closer.
+        """
+        env = self.environment
+        if self.target is None or not env.is_dirty(*self.target):
+            self.target = env.nearest_dirty(env.agent_x, env.agent_y)
+            if self.target is None:
+                self._halt()
+                return
+        self._step_towards(self.target)
+
+    def planned_agent(self, window=50):
+        """
+        A deliberate agent that plans once: a nearest-neighbour tour of all dirty
+        cells, shortened by 2-opt over segments of up to 'window' cells, which
+        later calls replay one step at a time.
+        """
+        env = self.environment
+        if self.tour is None:
+            start = (env.agent_x, env.agent_y)
+            self.tour = two_opt(start, nearest_neighbour_tour(start, env.dirt_index().copy()), window)
+            self.tour_position = 0
+        while self.tour_position < len(self.tour) and not env.is_dirty(*self.tour[self.tour_position]):
+            self.tour_position += 1
+        if self.tour_position == len(self.tour):
+            self._halt()
+            return
+        self._step_towards(self.tour[self.tour_position])
+
+    def scanning_agent(self):
+        """The original deliberate agent: rescans the grid every step and heads for the first dirty cell found."""
+        dirty_cells = []
+
+        #Scan the environment
+        for y in range(self.environment.height):
+            for x in range(self.environment.width):
+                if self.environment.is_dirty(x, y):
+                    dirty_cells.append((x,y))
+
+        if not dirty_cells:
+            self._halt()
+            return
+
+        self._step_towards(dirty_cells[0])
+
+
+def compare_agents(width, height, dirt, seed=0, names=('scanning_agent', 'deliberate_agent', 'planned_agent')):
+    """
+    Runs each named Agent method on the same world until it is clean;
+    returns {name: (steps, performance, seconds)}.
+    """
+    results = {}
+    for name in names:
+        random.seed(seed)
+        env = Environment(width, height, dirt, verbose=False)
+        agent = Agent(env)
+        act = getattr(agent, name)
+        index = env.dirt_index()
+        started = time.perf_counter()
+        steps = 0
+        while len(index):
+            act()
+            steps += 1
+        results[name] = (steps, env.performance, time.perf_counter() - started)
+    return results
 
 
 # Steps to solve the Vacuum Cleaner Problem
@@ -180,22 +744,58 @@ class Agent:
 
 # Example Usage
 
-width = 5
-height = 4
-env = Environment(width, height)
-agent = Agent(env)
-
-# Run the simulation for a certain number of steps using simple_reflex_agent
-print("Running Simple Reflex Agent:")
-for i in range(10):
-    env.display()
-    agent.simple_reflex_agent()
-
-#Reset environment and agent
-env = Environment(width,height)
-agent = Agent(env)
-
-print("\nRunning Deliberate Agent:")
-for i in range(10):
-    env.display()
-    agent.deliberate_agent()
+if __name__ == '__main__':
+    import sys
+
+    width = 5
+    height = 4
+    env = Environment(width, height)
+    agent = Agent(env)
+
+    # Run the simulation for a certain number of steps using simple_reflex_agent
+    print("Running Simple Reflex Agent:")
+    for i in range(10):
+        env.display()
+        agent.simple_reflex_agent()
+
+    #Reset environment and agent
+    env = Environment(width,height)
+    agent = Agent(env)
+
+    print("\nRunning Deliberate Agent:")
+    for i in range(10):
+        env.display()
+        agent.deliberate_agent()
+
+    # python Environment.py [width height dirt]: steps and time of each agent to clean one world
+    if len(sys.argv) > 3:
+        sizes = [(int(sys.argv[1]), int(sys.argv[2]), float(sys.argv[3]))]
+    else:
+        sizes = [(50, 50, 0.1), (100, 100, 0.02), (2000, 2000, 0.001)]
+    for width, height, dirt in sizes:
+        print(f"\n{width}x{height}, dirt {dirt}:")
+        # Rescanning millions of cells per step is out of reach
+        names = ('deliberate_agent', 'planned_agent') if width * height > 100_000 else ('scanning_agent', 'deliberate_agent', 'planned_agent')
+        for name, (steps, performance, seconds) in compare_agents(width, height, dirt, names=names).items():
+            print(f"  {name}: {steps} steps, performance {performance}, {seconds:.2f}s")
+
+    # A 100,000 x 100,000 world, generated only where the agent goes
+    started = time.perf_counter()
+    world = LargeEnvironment(100_000, 100_000, dirt=0.01, seed=1, verbose=False)
+    print(f"\n100000x100000 LargeEnvironment: {len(world.buffer) / 1e9:.2f} GB buffer, "
+          f"built in {time.perf_counter() - started:.2f}s")
+    agent = Agent(world)
+    started = time.perf_counter()
+    for _ in range(20_000):
+        agent.deliberate_agent()
+    seconds = time.perf_counter() - started
+    generated = world.columns * world.rows - sum(world.row_pending)
+    print(f"deliberate_agent: 20000 steps in {seconds:.2f}s, performance {world.performance}, "
+          f"{generated} chunks generated")
+    started = time.perf_counter()
+    saved = world.snapshot()
+    snapshot_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    world.restore(saved)
+    print(f"snapshot {snapshot_seconds:.2f}s, restore {time.perf_counter() - started:.2f}s")
+    world.display(5)
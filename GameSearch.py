@@ -0,0 +1,425 @@
+"""
+Adversarial search engine: negamax alpha-beta with principal-variation
+search, iterative deepening under a time budget, a Zobrist-keyed
+transposition table and killer/history move ordering.
+
+A game supplies:
+- key: Zobrist hash of the position, updated by make/unmake
+- moves(): legal moves for the side to move
+- make(move) / unmake(move)
+- terminal_score(): None while the game goes on, otherwise the score for the
+  side to move (-WIN if it has lost, 0 for a draw)
+- evaluate(): heuristic score for the side to move at the depth limit
+- plies_left() (optional): upper bound on the moves left, to stop deepening early
+"""
+import random
+import time
+
+from SearchStats import instrumented
+
+WIN = 1_000_000
+MATE_BOUND = WIN - 1000  # Scores beyond this are wins or losses a known number of plies away
+INF = float('inf')
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget runs out."""
+
+
+class TranspositionTable:
+    """
+    Fixed-size table indexed by the low bits of the Zobrist key. Every bucket
+    has two slots: a depth-preferred one, replaced only by an equal or deeper
+    result or once it is left over from an earlier search, and one that is
+    always replaced.
+
+    Entries are (key, depth, score, flag, move, generation).
+    """
+
+    def __init__(self, bits=18):
+        self.mask = (1 << bits) - 1
+        self.deep = [None] * (1 << bits)
+        self.recent = [None] * (1 << bits)
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key):
+        i = key & self.mask
+        entry = self.deep[i]
+        if entry is not None and entry[0] == key:
+            return entry
+        entry = self.recent[i]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        i = key & self.mask
+        entry = (key, depth, score, flag, move, self.generation)
+        old = self.deep[i]
+        if old is None or old[0] == key or depth >= old[1] or old[5] != self.generation:
+            self.deep[i] = entry
+        else:
+            self.recent[i] = entry
+
+
+def score_to_table(score, ply):
+    """Win/loss scores are stored relative to the stored position, not the root."""
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class Searcher:
+    """Searches one game object in place; make/unmake are always balanced, even on timeout."""
+
+    def __init__(self, game, table=None, max_ply=256):
+        self.game = game
+        self.table = table or TranspositionTable()
+        self.killers = [[None, None] for _ in range(max_ply)]
+        self.history = {}
+        self.nodes = 0
+        self.deadline = None
+        self.stats = None
+
+    def order(self, moves, ply, tt_move):
+        """Transposition-table move first, then the two killers of this ply, then by history score."""
+        killers = self.killers[ply]
+        history = self.history
+        return sorted(moves, key=lambda move: (move != tt_move, move not in killers, -history.get(move, 0)))
+
+    def negamax(self, depth, alpha, beta, ply):
+        game = self.game
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+
+        score = game.terminal_score()
+        if score is not None:
+            return score_from_table(score, ply)  # A loss further from the root scores higher
+        if depth <= 0:
+            return game.evaluate()
+
+        key = game.key
+        entry = self.table.probe(key)
+        tt_move = None
+        if entry is not None:
+            tt_move = entry[4]
+            if entry[1] >= depth:
+                value = score_from_table(entry[2], ply)
+                if entry[3] == EXACT or (entry[3] == LOWER and value >= beta) or (entry[3] == UPPER and value <= alpha):
+                    return value
+
+        if self.stats:
+            self.stats.expand(ply, key)
+        moves = self.order(game.moves(), ply, tt_move)
+        if not moves:
+            return game.evaluate()
+
+        original_alpha = alpha
+        best, best_move = -INF, None
+        for index, move in enumerate(moves):
+            game.make(move)
+            if self.stats:
+                self.stats.generate()
+            try:
+                if index == 0:
+                    score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+                else:
+                    # Principal-variation search: prove the move is no better with a null window
+                    score = -self.negamax(depth - 1, -alpha - 1, -alpha, ply + 1)
+                    if alpha < score < beta:
+                        score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                game.unmake(move)
+
+            if score > best:
+                best, best_move = score, move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                killers = self.killers[ply]
+                if move != killers[0]:
+                    killers[0], killers[1] = move, killers[0]
+                self.history[move] = self.history.get(move, 0) + depth * depth
+                break
+
+        flag = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+        self.table.store(key, depth, score_to_table(best, ply), flag, best_move)
+        return best
+
+    def principal_variation(self, depth):
+        """Best line found, read back from the transposition table."""
+        game = self.game
+        line = []
+        for _ in range(depth):
+            entry = self.table.probe(game.key)
+            if entry is None or entry[4] is None or entry[4] not in game.moves():
+                break
+            line.append(entry[4])
+            game.make(entry[4])
+        for move in reversed(line):
+            game.unmake(move)
+        return line
+
+    @instrumented
+    def search(self, max_depth=64, time_limit=None, stats=None):
+        """
+        Iterative deepening from depth 1 until max_depth, a forced win or loss,
+        the end of the game, or time_limit seconds. Depth 1 always completes.
+        'stats' takes a SearchStats to fill in.
+
+        Returns a dict with the best move, its score for the side to move, the
+        depth reached, the principal variation, nodes, seconds, nodes per second,
+        the effective branching factor, and per-iteration
+        (depth, score, nodes, seconds, nodes / previous iteration's nodes) tuples.
+        """
+        self.stats = stats
+        self.table.new_search()
+        self.nodes = 0
+        self.deadline = None
+        started = time.perf_counter()
+        limit = max_depth
+        if hasattr(self.game, 'plies_left'):
+            limit = min(limit, self.game.plies_left())
+
+        result = {'move': None, 'score': self.game.evaluate(), 'depth': 0, 'pv': [], 'iterations': []}
+        previous_nodes = None
+        for depth in range(1, max(limit, 1) + 1):
+            before = self.nodes
+            try:
+                score = self.negamax(depth, -INF, INF, 0)
+            except SearchTimeout:
+                break
+            nodes = self.nodes - before
+            pv = self.principal_variation(depth)
+            result.update(move=pv[0] if pv else None, score=score, depth=depth, pv=pv)
+            result['iterations'].append((depth, score, nodes, time.perf_counter() - started,
+                                         nodes / previous_nodes if previous_nodes else None))
+            previous_nodes = nodes
+            if abs(score) >= MATE_BOUND:
+                break
+            if time_limit is not None:
+                self.deadline = started + time_limit
+
+        seconds = time.perf_counter() - started
+        result['nodes'] = self.nodes
+        result['seconds'] = seconds
+        result['nps'] = self.nodes / seconds if seconds else 0.0
+        # N = b + b^2 + ... + b^d is close to b^d for the b that matters here
+        result['ebf'] = self.nodes ** (1 / result['depth']) if result['depth'] else 0.0
+        return result
+
+
+def zobrist_keys(count, seed):
+    """Reproducible 64-bit random keys, identical in every process."""
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(count)]
+
+
+class TicTacToe:
+    LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
+    KEYS = zobrist_keys(19, seed=9)  # 9 squares x 2 players, then side to move
+
+    def __init__(self):
+        self.board = [0] * 9  # 1 for the first player, -1 for the second
+        self.side = 1
+        self.key = 0
+
+    def moves(self):
+        return [square for square in (4, 0, 2, 6, 8, 1, 3, 5, 7) if not self.board[square]]
+
+    def make(self, square):
+        self.board[square] = self.side
+        self.key ^= self.KEYS[square * 2 + (self.side < 0)] ^ self.KEYS[18]
+        self.side = -self.side
+
+    def unmake(self, square):
+        self.side = -self.side
+        self.board[square] = 0
+        self.key ^= self.KEYS[square * 2 + (self.side < 0)] ^ self.KEYS[18]
+
+    def terminal_score(self):
+        board = self.board
+        for a, b, c in self.LINES:
+            if board[a] == board[b] == board[c] == -self.side:
+                return -WIN
+        return None if 0 in board else 0
+
+    def evaluate(self):
+        """Lines still open for the side to move minus those open for the opponent."""
+        board = self.board
+        score = 0
+        for line in self.LINES:
+            cells = {board[i] for i in line}
+            if -self.side not in cells:
+                score += 1
+            if self.side not in cells:
+                score -= 1
+        return score
+
+    def plies_left(self):
+        return self.board.count(0)
+
+
+class ConnectFour:
+    """
+    7x6 board as two bitboards, one per player: column c uses bits 7c..7c+5,
+    and bit 7c+6 stays empty so that alignments cannot wrap between columns.
+    """
+    WIDTH, HEIGHT = 7, 6
+    ORDER = (3, 2, 4, 1, 5, 0, 6)
+    KEYS = zobrist_keys(2 * 49 + 1, seed=4)
+    WINDOWS = [sum(1 << (7 * (c + i * dc) + r + i * dr) for i in range(4))
+               for dc, dr in ((1, 0), (0, 1), (1, 1), (1, -1))
+               for c in range(7) for r in range(6)
+               if 0 <= c + 3 * dc < 7 and 0 <= r + 3 * dr < 6]
+    WEIGHTS = (0, 1, 4, 32, 0)
+
+    def __init__(self, moves=()):
+        self.boards = [0, 0]
+        self.heights = [7 * c for c in range(7)]  # Bit index of the next free cell per column
+        self.side = 0
+        self.count = 0
+        self.key = 0
+        for column in moves:
+            self.make(column)
+
+    def moves(self):
+        return [c for c in self.ORDER if self.heights[c] < 7 * c + 6]
+
+    def make(self, column):
+        cell = self.heights[column]
+        self.heights[column] += 1
+        self.boards[self.side] |= 1 << cell
+        self.key ^= self.KEYS[2 * cell + self.side] ^ self.KEYS[-1]
+        self.side ^= 1
+        self.count += 1
+
+    def unmake(self, column):
+        self.side ^= 1
+        self.count -= 1
+        self.heights[column] -= 1
+        cell = self.heights[column]
+        self.boards[self.side] ^= 1 << cell
+        self.key ^= self.KEYS[2 * cell + self.side] ^ self.KEYS[-1]
+
+    @staticmethod
+    def connected(board):
+        for shift in (1, 7, 6, 8):
+            pairs = board & (board >> shift)
+            if pairs & (pairs >> 2 * shift):
+                return True
+        return False
+
+    def terminal_score(self):
+        if self.connected(self.boards[self.side ^ 1]):
+            return -WIN
+        return 0 if self.count == 42 else None
+
+    def evaluate(self):
+        """Sum over four-in-a-row windows held by one player only, weighted by how full they are."""
+        mine, theirs = self.boards[self.side], self.boards[self.side ^ 1]
+        weights = self.WEIGHTS
+        score = 0
+        for window in self.WINDOWS:
+            a, b = mine & window, theirs & window
+            if a and not b:
+                score += weights[a.bit_count()]
+            elif b and not a:
+                score -= weights[b.bit_count()]
+        return score
+
+    def plies_left(self):
+        return 42 - self.count
+
+
+class TreeGame:
+    """
+    A uniform game tree given by its leaf values, as in 'alpha & beta pruning.py':
+    the first player maximizes the leaf value, the second minimizes it.
+    """
+
+    def __init__(self, values, branching=2):
+        self.values = values
+        self.branching = branching
+        self.depth = 0
+        while branching ** self.depth < len(values):
+            self.depth += 1
+        self.keys = zobrist_keys(self.depth * branching, seed=7)
+        self.node = 0
+        self.ply = 0
+        self.key = 0
+
+    def moves(self):
+        return list(range(self.branching)) if self.ply < self.depth else []
+
+    def make(self, move):
+        self.key ^= self.keys[self.ply * self.branching + move]
+        self.node = self.node * self.branching + move
+        self.ply += 1
+
+    def unmake(self, move):
+        self.ply -= 1
+        self.node //= self.branching
+        self.key ^= self.keys[self.ply * self.branching + move]
+
+    def terminal_score(self):
+        if self.ply < self.depth:
+            return None
+        value = self.values[self.node]
+        return value if self.ply % 2 == 0 else -value
+
+    def evaluate(self):
+        return 0
+
+    def plies_left(self):
+        return self.depth - self.ply
+
+
+def print_report(name, result):
+    print(f"{name}: best move {result['move']}, score {result['score']}, depth {result['depth']}, "
+          f"pv {result['pv']}")
+    for depth, score, nodes, seconds, ratio in result['iterations']:
+        ratio = f"{ratio:.2f}" if ratio else "-"
+        print(f"  depth {depth:2}: score {score:>8}, {nodes:>8} nodes, {seconds:6.2f}s, x{ratio}")
+    print(f"  {result['nodes']} nodes in {result['seconds']:.2f}s = {result['nps']:.0f} nodes/s, "
+          f"effective branching factor {result['ebf']:.2f}")
+
+
+if __name__ == '__main__':
+    import sys
+    import importlib.machinery
+    import importlib.util
+    import math
+    import os
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alpha & beta pruning.py')
+    loader = importlib.machinery.SourceFileLoader('alpha_beta', path)
+    alpha_beta = importlib.util.module_from_spec(importlib.util.spec_from_loader('alpha_beta', loader))
+    loader.exec_module(alpha_beta)
+
+    values = [3, 5, 6, 9, 1, 2, 0, -1]
+    expected = alpha_beta.alpha_beta_pruning(0, 0, True, values, -math.inf, math.inf)
+    result = Searcher(TreeGame(values)).search()
+    print(f"Tree game: {result['score']} (alpha & beta pruning.py: {expected})")
+    assert result['score'] == expected
+
+    print_report("Tic-tac-toe", Searcher(TicTacToe()).search())
+
+    # python GameSearch.py [seconds]: Connect Four opening under a time budget
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print_report("Connect Four", Searcher(ConnectFour()).search(time_limit=seconds))
@@ -1,5 +1,11 @@
+import ast
+import mmap
+import struct
+from array import array
 from collections import deque
 
+from SearchStats import SearchStats, instrumented
+
 class Graph:
     def __init__(self):
         self.graph = {}
@@ -10,47 +16,319 @@ class Graph:
         """
         self.graph[node] = neighbors
 
-    def breadth_first_search(self, start, goal):
+    def neighbors(self, node):
+        """Returns the (neighbor_node, cost) pairs of 'node'."""
+        return self.graph.get(node, [])
+
+    def to_csr(self):
+        """Packs this graph into a CSRGraph."""
+        return CSRGraph.from_edges((node, neighbor, cost)
+                                   for node, neighbors in self.graph.items()
+                                   for neighbor, cost in neighbors)
+
+    @instrumented
+    def breadth_first_search(self, start, goal, verbose=False, stats=None):
         """
-        Performs a Breadth-First Search to find the shortest path from 'start' to 'goal'.  Prints the explored tree.
+        Performs a Breadth-First Search to find the shortest path from 'start' to 'goal'.
+        With verbose=True, prints the explored tree. 'stats' takes a SearchStats to fill in.
 
         Returns:
         - path: A list representing the shortest path from start to goal (or None if no path exists).
         - cost: The total cost of the path (or None if no path exists).
         """
 
-        queue = deque([(start, [start], 0)])  # (node, path, cost)
-        visited = {start}
+        queue = deque([start])
+        parents = {start: (None, 0)}  # node -> (parent, cost so far); replaces per-node path copies
         level = 0  # Keep track of the level for printing the tree structure
 
-        print("Explored Tree:")
-        print(f"Level {level}: {start}") # Print initial node
+        if verbose:
+            print("Explored Tree:")
+            print(f"Level {level}: {start}") # Print initial node
 
         while queue:
-            node, path, cost = queue.popleft()
+            node = queue.popleft()
 
             if node == goal:
-                print(f"\nGoal {goal} found!")
-                return path, cost
+                if verbose:
+                    print(f"\nGoal {goal} found!")
+                return reconstruct_path(parents, goal)
 
-            neighbors = self.graph.get(node, [])
-            if neighbors:
+            neighbors = self.neighbors(node)
+            cost = parents[node][1]
+            if stats:
+                stats.expand(len(queue) + 1, node)
+            if verbose and neighbors:
                 level += 1
                 print(f"Level {level}: ", end="")
 
             neighbor_strings = []
             for neighbor, edge_cost in neighbors:
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    new_path = path + [neighbor]
-                    new_cost = cost + edge_cost
-                    queue.append((neighbor, new_path, new_cost))
+                if neighbor not in parents:
+                    parents[neighbor] = (node, cost + edge_cost)
+                    queue.append(neighbor)
                     neighbor_strings.append(f"{neighbor}(cost:{edge_cost})")
-            print(", ".join(neighbor_strings))  # Print neighbors at this level
+                    if stats:
+                        stats.generate()
+                elif stats:
+                    stats.duplicate()
+            if verbose:
+                print(", ".join(neighbor_strings))  # Print neighbors at this level
 
-        print(f"\nNo path found from {start} to {goal}")
+        if verbose:
+            print(f"\nNo path found from {start} to {goal}")
         return None, None  # No path found
 
+def reconstruct_path(parents, goal):
+    """Follows (parent, cost) links back from goal; returns (path, cost)."""
+    path = []
+    node = goal
+    while node is not None:
+        path.append(node)
+        node = parents[node][0]
+    return path[::-1], parents[goal][1]
+
+class _Names:
+    """
+    Node names stored as an offsets array over a UTF-8 blob, decoded one at a
+    time on access; 'parse' (e.g. ast.literal_eval) is applied to each, cached.
+    """
+
+    def __init__(self, offsets, blob, parse=None):
+        self.offsets = offsets
+        self.blob = blob
+        self.parse = parse
+        self._parsed = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        if self.parse is not None and i in self._parsed:
+            return self._parsed[i]
+        name = str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+        if self.parse is not None:
+            name = self._parsed[i] = self.parse(name)
+        return name
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+class CSRGraph:
+    """
+    Read-only graph in compressed-sparse-row form. Node names are interned to
+    ids 0..n-1; the out-edges of id i are targets[offsets[i]:offsets[i + 1]]
+    with matching weights. Storage is a few flat 'array' buffers (about 12-16
+    bytes per edge), and save()/load() memory-map them without parsing.
+
+    Also behaves like the dict-of-dicts graphs expected by Node.a_star and
+    'a star algorithm.py': graph[node] and graph.get(node, {}) return
+    {neighbor: cost}, and iterating yields node names.
+    """
+
+    MAGIC = b'CSR3'
+    HEADER = '<4sqqcc10x'  # 32 bytes, so the arrays after it stay 8-byte aligned
+
+    def __init__(self, names, offsets, targets, weights):
+        self.names = names  # id -> node name
+        self.offsets = offsets  # n + 1 edge offsets ('q')
+        self.targets = targets  # m target ids ('i')
+        self.weights = weights  # m edge costs ('q' if all integral, else 'd')
+        self._ids = None
+
+    @property
+    def ids(self):
+        """name -> id, built on first use so that load() stays O(1) in the edge count."""
+        if self._ids is None:
+            self._ids = {name: i for i, name in enumerate(self.names)}
+        return self._ids
+
+    @classmethod
+    def from_edges(cls, edges, undirected=False):
+        """Builds the CSR arrays from an iterable of (source, target, cost) with a counting sort."""
+        ids = {}
+        names = []
+        sources, targets, weights = array('i'), array('i'), []
+        for source, target, cost in edges:
+            for name in (source, target):
+                if name not in ids:
+                    ids[name] = len(names)
+                    names.append(name)
+            sources.append(ids[source])
+            targets.append(ids[target])
+            weights.append(cost)
+            if undirected:
+                sources.append(ids[target])
+                targets.append(ids[source])
+                weights.append(cost)
+
+        n, m = len(names), len(sources)
+        offsets = array('q', [0]) * (n + 1)
+        for source in sources:
+            offsets[source + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        integral = all(float(cost).is_integer() for cost in weights)
+        sorted_targets = array('i', [0]) * m
+        sorted_weights = array('q' if integral else 'd', [0]) * m
+        position = offsets[:-1]
+        for source, target, cost in zip(sources, targets, weights):
+            slot = position[source]
+            sorted_targets[slot] = target
+            sorted_weights[slot] = int(cost) if integral else cost
+            position[source] = slot + 1
+
+        graph = cls(names, offsets, sorted_targets, sorted_weights)
+        graph._ids = ids
+        return graph
+
+    @classmethod
+    def from_edge_list(cls, path, undirected=False):
+        """
+        Reads 'source target [cost]' lines (cost defaults to 1); blank lines and
+        lines starting with '#' are ignored.
+        """
+        def edges():
+            with open(path) as f:
+                for line in f:
+                    fields = line.split()
+                    if not fields or fields[0].startswith('#'):
+                        continue
+                    cost = float(fields[2]) if len(fields) > 2 else 1
+                    yield fields[0], fields[1], cost
+        return cls.from_edges(edges(), undirected)
+
+    def save(self, path):
+        """
+        Binary layout: header, offsets, targets, weights (8-byte aligned), then
+        the names: an 'q' array if they are all 64-bit ints, else name offsets
+        and a UTF-8 blob of the names (of their repr() unless all are strings).
+        """
+        n, m = len(self.names), len(self.targets)
+        if all(type(name) is int and -2**63 <= name < 2**63 for name in self.names):
+            kind, encoded = 'q', None
+        else:
+            kind = 's' if all(type(name) is str for name in self.names) else 'r'
+            # repr() keeps tuple or other literal node names intact through a reload
+            encoded = [(name if kind == 's' else repr(name)).encode() for name in self.names]
+        with open(path, 'wb') as f:
+            f.write(struct.pack(self.HEADER, self.MAGIC, n, m, self.weights.typecode.encode(), kind.encode()))
+            f.write(bytes(self.offsets))
+            f.write(bytes(self.targets))
+            f.write(b'\0' * (-(m * 4) % 8))
+            f.write(bytes(self.weights))
+            if encoded is None:
+                f.write(bytes(array('q', self.names)))
+            else:
+                name_offsets = array('q', [0])
+                for name in encoded:
+                    name_offsets.append(name_offsets[-1] + len(name))
+                f.write(bytes(name_offsets))
+                f.write(b''.join(encoded))
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps a file written by save(); the arrays and names are zero-copy views."""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, m, typecode, kind = struct.unpack_from(cls.HEADER, mapped)
+        if magic != cls.MAGIC:
+            raise ValueError(f"{path} is not a CSR graph file")
+        view = memoryview(mapped)
+        position = struct.calcsize(cls.HEADER)
+        offsets = view[position:position + 8 * (n + 1)].cast('q')
+        position += 8 * (n + 1)
+        targets = view[position:position + 4 * m].cast('i')
+        position += 4 * m + (-(m * 4) % 8)
+        weights = view[position:position + 8 * m].cast(typecode.decode())
+        position += 8 * m
+        if kind == b'q':
+            names = view[position:position + 8 * n].cast('q')
+        else:
+            name_offsets = view[position:position + 8 * (n + 1)].cast('q')
+            blob = view[position + 8 * (n + 1):]
+            names = _Names(name_offsets, blob, ast.literal_eval if kind == b'r' else None)
+        graph = cls(names, offsets, targets, weights)
+        graph._mmap = mapped
+        return graph
+
+    def neighbors(self, node):
+        """Returns the (neighbor_node, cost) pairs of 'node', like Graph.neighbors."""
+        i = self.ids.get(node)
+        if i is None:
+            return []
+        names, targets, weights = self.names, self.targets, self.weights
+        return [(names[targets[e]], weights[e]) for e in range(self.offsets[i], self.offsets[i + 1])]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, node):
+        return node in self.ids
+
+    def __getitem__(self, node):
+        if node not in self.ids:
+            raise KeyError(node)
+        return dict(self.neighbors(node))
+
+    def get(self, node, default=None):
+        return dict(self.neighbors(node)) if node in self.ids else default
+
+    @instrumented
+    def breadth_first_search(self, start, goal, stats=None):
+        """
+        Same result as Graph.breadth_first_search (without the tree printout),
+        using integer parent/edge arrays instead of per-node path lists.
+
+        Returns:
+        - path: A list representing the shortest path from start to goal (or None if no path exists).
+        - cost: The total cost of the path (or None if no path exists).
+        """
+        ids = self.ids
+        if start not in ids or goal not in ids:
+            return None, None
+        source, target = ids[start], ids[goal]
+        offsets, targets = self.offsets, self.targets
+
+        parent = array('q', [-1]) * len(self.names)
+        via = array('q', [-1]) * len(self.names)  # Edge used to reach each node
+        parent[source] = source
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                break
+            if stats:
+                stats.expand(len(queue) + 1, self.names[node])
+            for e in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[e]
+                if parent[neighbor] == -1:
+                    parent[neighbor] = node
+                    via[neighbor] = e
+                    queue.append(neighbor)
+                    if stats:
+                        stats.generate()
+                elif stats:
+                    stats.duplicate()
+        else:
+            return None, None
+
+        path, cost = [], 0
+        node = target
+        while node != source:
+            path.append(self.names[node])
+            cost += self.weights[via[node]]
+            node = parent[node]
+        path.append(start)
+        return path[::-1], cost
+
 # Example Usage:
 if __name__ == '__main__':
     graph = Graph()
@@ -64,10 +342,12 @@ if __name__ == '__main__':
     start_node = 'A'
     goal_node = 'F'
 
-    path, cost = graph.breadth_first_search(start_node, goal_node)
+    stats = SearchStats()
+    path, cost = graph.breadth_first_search(start_node, goal_node, verbose=True, stats=stats)
 
     if path:
         print(f"Path from {start_node} to {goal_node}: {path}")
         print(f"Total cost: {cost}")
     else:
         print(f"No path found from {start_node} to {goal_node}")
+    print(stats)
@@ -0,0 +1,234 @@
+import heapq
+import random
+import time
+from array import array
+
+INF = float('inf')
+
+
+def adjacency(graph):
+    """
+    Returns (names, forward, backward) adjacency lists over integer ids for any
+    graph the searches in this repo accept: a dict of {neighbor: cost} dicts, a
+    Graph, or a CSRGraph.
+    """
+    if hasattr(graph, 'neighbors'):
+        nodes = list(graph.graph) if hasattr(graph, 'graph') else list(graph)
+        neighbors = graph.neighbors
+    else:
+        nodes = list(graph)
+        neighbors = lambda node: graph.get(node, {}).items()
+
+    ids = {}
+    names = []
+    edges = []
+    for node in nodes:
+        if node not in ids:
+            ids[node] = len(names)
+            names.append(node)
+    for node in nodes:
+        for neighbor, cost in neighbors(node):
+            if neighbor not in ids:
+                ids[neighbor] = len(names)
+                names.append(neighbor)
+            edges.append((ids[node], ids[neighbor], cost))
+
+    forward = [[] for _ in names]
+    backward = [[] for _ in names]
+    for source, target, cost in edges:
+        forward[source].append((target, cost))
+        backward[target].append((source, cost))
+    return names, ids, forward, backward
+
+
+def dijkstra(adjacent, source):
+    """Single-source shortest distances; returns (distance array, settle order, parent list)."""
+    distance = array('d', [INF]) * len(adjacent)
+    parent = [-1] * len(adjacent)
+    distance[source] = 0
+    order = []
+    queue = [(0, source)]
+    while queue:
+        d, node = heapq.heappop(queue)
+        if d > distance[node]:
+            continue
+        order.append(node)
+        for neighbor, cost in adjacent[node]:
+            new_distance = d + cost
+            if new_distance < distance[neighbor]:
+                distance[neighbor] = new_distance
+                parent[neighbor] = node
+                heapq.heappush(queue, (new_distance, neighbor))
+    return distance, order, parent
+
+
+class Landmarks:
+    """
+    ALT preprocessing: k landmarks with distance tables to and from each one.
+    For any goal t, max over landmarks L of d(v, L) - d(t, L) and
+    d(L, t) - d(L, v) is a lower bound on d(v, t) by the triangle inequality.
+    """
+
+    def __init__(self, graph, k=8, method='avoid', seed=0):
+        started = time.perf_counter()
+        self.names, self.ids, forward, backward = adjacency(graph)
+        self.landmarks = []
+        self.from_landmark = []  # d(L, v) per landmark, one 'd' array of length n each
+        self.to_landmark = []  # d(v, L)
+        rng = random.Random(seed)
+
+        select = {'farthest': self._farthest, 'avoid': self._avoid}[method]
+        for _ in range(min(k, len(self.names))):
+            landmark = select(forward, rng)
+            if landmark is None:
+                break
+            self.landmarks.append(landmark)
+            self.from_landmark.append(dijkstra(forward, landmark)[0])
+            self.to_landmark.append(dijkstra(backward, landmark)[0])
+
+        self.preprocessing_seconds = time.perf_counter() - started
+
+    @property
+    def bytes_per_landmark(self):
+        return 2 * len(self.names) * array('d').itemsize
+
+    def lower_bound(self, v, t):
+        """ALT lower bound on d(v, t) for node ids."""
+        best = 0
+        for to, frm in zip(self.to_landmark, self.from_landmark):
+            if to[v] < INF:
+                bound = to[v] - to[t]
+                if bound > best:
+                    best = bound
+            elif to[t] < INF:
+                return INF  # t reaches the landmark but v does not, so v cannot reach t
+            if frm[t] < INF:
+                bound = frm[t] - frm[v]
+                if bound > best:
+                    best = bound
+        return best
+
+    def _farthest(self, forward, rng):
+        """Next landmark: the reachable node farthest from the ones chosen so far."""
+        if not self.landmarks:
+            start = rng.randrange(len(self.names))
+            distance = dijkstra(forward, start)[0]
+        else:
+            distance = array('d', [INF]) * len(self.names)
+            for table in self.from_landmark:
+                for v in range(len(distance)):
+                    if table[v] < distance[v]:
+                        distance[v] = table[v]
+        candidates = [v for v in range(len(distance))
+                      if distance[v] < INF and v not in self.landmarks]
+        if not candidates:
+            return None
+        return max(candidates, key=distance.__getitem__)
+
+    def _avoid(self, forward, rng):
+        """
+        Goldberg-Werneck 'avoid': grow a shortest-path tree from a random root,
+        weight each node by how badly the current landmarks bound its distance,
+        and pick a leaf under the heaviest subtree that holds no landmark yet.
+        """
+        if not self.landmarks:
+            return self._farthest(forward, rng)
+        root = rng.randrange(len(self.names))
+        distance, order, parent = dijkstra(forward, root)
+
+        size = [0.0] * len(self.names)
+        blocked = [False] * len(self.names)
+        for landmark in self.landmarks:
+            blocked[landmark] = True
+        children = [[] for _ in self.names]
+        for node in reversed(order):  # Children settle after their parents
+            if not blocked[node]:
+                size[node] += distance[node] - self.lower_bound(root, node)
+            p = parent[node]
+            if p >= 0:
+                children[p].append(node)
+                if blocked[node]:
+                    blocked[p] = True
+                else:
+                    size[p] += size[node]
+        for node in order:
+            if blocked[node]:
+                size[node] = 0.0
+
+        best = max(order, key=size.__getitem__)
+        if size[best] <= 0:
+            return self._farthest(forward, rng)
+        while True:
+            open_children = [child for child in children[best] if size[child] > 0]
+            if not open_children:
+                return best
+            best = max(open_children, key=size.__getitem__)
+
+    def heuristic(self, goal):
+        """Admissible heuristic towards 'goal', usable as Node.a_star's heuristic_func or 'a star algorithm.py''s h."""
+        return LandmarkHeuristic(self, goal)
+
+
+class LandmarkHeuristic:
+    """Callable and subscriptable: h(node) and h[node] both return the ALT bound to the goal."""
+
+    def __init__(self, landmarks, goal):
+        self.landmarks = landmarks
+        self.ids = landmarks.ids
+        self.goal = landmarks.ids[goal]
+        self.cache = {}
+
+    def __call__(self, node):
+        value = self.cache.get(node)
+        if value is None:
+            i = self.ids.get(node)
+            value = 0 if i is None else self.landmarks.lower_bound(i, self.goal)
+            self.cache[node] = value
+        return value
+
+    __getitem__ = __call__
+
+
+def compare_queries(graph, landmarks, queries):
+    """Expanded nodes per query for Node.a_star with h = 0 versus the ALT heuristic."""
+    from Node import a_star
+
+    class CountingGraph:
+        def __init__(self):
+            self.expanded = 0
+
+        def get(self, node, default=None):
+            self.expanded += 1
+            return graph.get(node, default)
+
+    results = []
+    for start, goal in queries:
+        plain = CountingGraph()
+        _, plain_cost = a_star(plain, start, goal, lambda node: 0)
+        alt = CountingGraph()
+        _, alt_cost = a_star(alt, start, goal, landmarks.heuristic(goal))
+        if plain_cost != alt_cost:
+            raise AssertionError(f"ALT changed the cost of {start}->{goal}: {plain_cost} vs {alt_cost}")
+        results.append((plain.expanded, alt.expanded))
+    return results
+
+
+if __name__ == '__main__':
+    from Node import grid_graph
+
+    rng = random.Random(1)
+    graph = grid_graph(150, 150)
+    for neighbors in graph.values():
+        for neighbor in neighbors:
+            neighbors[neighbor] = rng.randint(1, 10)
+    nodes = list(graph)
+    queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(20)]
+
+    for method in ('farthest', 'avoid'):
+        landmarks = Landmarks(graph, k=8, method=method)
+        results = compare_queries(graph, landmarks, queries)
+        plain = sum(p for p, _ in results) / len(results)
+        alt = sum(a for _, a in results) / len(results)
+        print(f"{method}: {len(landmarks.landmarks)} landmarks in {landmarks.preprocessing_seconds:.2f}s, "
+              f"{landmarks.bytes_per_landmark} bytes per landmark")
+        print(f"  expanded per query: Dijkstra {plain:.0f}, ALT {alt:.0f} ({plain / alt:.1f}x fewer)")
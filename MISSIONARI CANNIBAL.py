@@ -1,5 +1,9 @@
+from array import array
 from collections import deque
 
+from BidirectionalSearch import bidirectional_bfs, breadth_first_search
+from SearchStats import instrumented
+
 initial_state = (3, 3, 1)
 goal_state = (0, 0, 0)
 moves = [(1, 0), (2, 0), (0, 1), (0, 2), (1, 1)]  
@@ -27,8 +31,9 @@ def get_next_states(state):
 
     return next_states
 
-def solve():
-    """Solve the Missionaries and Cannibals problem using BFS."""
+@instrumented
+def solve(stats=None):
+    """Solve the Missionaries and Cannibals problem using BFS. 'stats' takes a SearchStats to fill in."""
     queue = deque([(initial_state, [])])  
     visited = set()
 
@@ -36,17 +41,139 @@ def solve():
         state, path = queue.popleft()
 
         if state in visited:
+            if stats:
+                stats.duplicate()
             continue
         visited.add(state)
         if state == goal_state:
             return path + [state]
+        if stats:
+            stats.expand(len(queue) + 1, state)
         for next_state in get_next_states(state):
             queue.append((next_state, path + [state]))
+            if stats:
+                stats.generate()
 
     return None  
-solution = solve()
-if solution:
-    for step in solution:
-        print(f"Missionaries: {step[0]}, Cannibals: {step[1]}, Boat: {'Left' if step[2] == 1 else 'Right'}")
-else:
-    print("No solution found.")
+
+def solve_bidirectional():
+    """Solve with a bidirectional BFS; boat trips are reversible, so successors double as predecessors."""
+    return bidirectional_bfs(initial_state, goal_state, get_next_states)
+
+def boat_loads(capacity, safe_boat=True):
+    """
+    Move table: every (missionaries, cannibals) boat load of 1..capacity people,
+    ordered by missionaries. With safe_boat, cannibals may not outnumber the
+    missionaries in the boat either.
+    """
+    return [(m, c) for m in range(capacity + 1) for c in range(capacity + 1 - m)
+            if m + c and (not safe_boat or m == 0 or m >= c)]
+
+@instrumented
+def solve_general(missionaries, cannibals, capacity, safe_boat=True, stats=None):
+    """
+    BFS for any number of missionaries and cannibals and any boat capacity.
+
+    A state (m, c, b) on the starting bank is the dense integer
+    (m * (cannibals + 1) + c) * 2 + b. Bank safety is precomputed per (m, c)
+    in a bytearray, the visited set is a bytearray over all states, and the
+    parent of a state is kept as the index (into the move table) of the load
+    that reached it, since undoing that load gives the parent. The queue holds
+    only reached states, in an array('i').
+
+    Returns (path of (m, c, b) tuples or None, memory report), where the report
+    gives the states reached, the bytes used, and the bytes per encodable state
+    and per reached state.
+    """
+    width = cannibals + 1
+    size = (missionaries + 1) * width * 2
+    loads = boat_loads(capacity, safe_boat)
+    # (missionaries, cannibals, offset between the two encoded states, index); + 1 flips the boat bit
+    table = [(m, c, (m * width + c) * 2 + 1, i) for i, (m, c) in enumerate(loads)]
+    safe = bytearray((missionaries + 1) * width)
+    for m in range(missionaries + 1):
+        # Safe cannibal counts on this bank with m missionaries form one interval
+        low = 0 if m == missionaries else max(0, cannibals - missionaries + m)
+        high = cannibals if m == 0 else min(cannibals, m)
+        if low <= high:
+            safe[m * width + low:m * width + high + 1] = b'\1' * (high - low + 1)
+    visited = bytearray(size)
+    via = array('B' if len(loads) < 256 else 'H', [0]) * size
+    start, goal = size - 1, 0
+    queue = array('i', [start])
+    visited[start] = 1
+    head = 0
+    found = False
+
+    while head < len(queue):
+        state = queue[head]
+        head += 1
+        if state == goal:
+            found = True
+            break
+        if stats:
+            stats.expand(len(queue) - head + 1, state)
+        m, c = divmod(state >> 1, width)
+        if state & 1:
+            # Boat on the starting bank: loads leave it
+            here_m, here_c, sign = m, c, -1
+        else:
+            here_m, here_c, sign = missionaries - m, cannibals - c, 1
+        for dm, dc, delta, index in table:
+            if dm > here_m:
+                break
+            if dc > here_c:
+                continue
+            following = state + sign * delta
+            if not safe[following >> 1]:
+                continue
+            if stats:
+                stats.generate()
+            if visited[following]:
+                if stats:
+                    stats.duplicate()
+                continue
+            visited[following] = 1
+            via[following] = index
+            queue.append(following)
+
+    used = len(safe) + len(visited) + via.itemsize * len(via) + queue.itemsize * len(queue)
+    report = {'states': len(queue), 'bytes': used,
+              'bytes_per_state': used / size, 'bytes_per_reached_state': used / len(queue)}
+    if not found:
+        return None, report
+    path = [goal]
+    state = goal
+    while state != start:
+        delta = table[via[state]][2]
+        state += delta if state & 1 == 0 else -delta
+        path.append(state)
+    return [(*divmod(s >> 1, width), s & 1) for s in reversed(path)], report
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    solution = solve()
+    if solution:
+        for step in solution:
+            print(f"Missionaries: {step[0]}, Cannibals: {step[1]}, Boat: {'Left' if step[2] == 1 else 'Right'}")
+    else:
+        print("No solution found.")
+
+    _, forward_stats = breadth_first_search(initial_state, goal_state, get_next_states)
+    bidirectional_solution, stats = solve_bidirectional()
+    print(f"Bidirectional BFS solution: {len(bidirectional_solution) - 1} crossings")
+    print(f"Nodes expanded: forward BFS {forward_stats['expanded']}, bidirectional BFS {stats['expanded']}")
+
+    # python "MISSIONARI CANNIBAL.py" [missionaries cannibals capacity]
+    instances = [tuple(map(int, sys.argv[1:4]))] if len(sys.argv) > 3 else [(3, 3, 2), (5, 5, 3), (3000, 3000, 4), (3000, 2000, 5)]
+    for missionaries, cannibals, capacity in instances:
+        started = time.perf_counter()
+        path, report = solve_general(missionaries, cannibals, capacity)
+        elapsed = time.perf_counter() - started
+        crossings = len(path) - 1 if path else 'no solution'
+        print(f"M={missionaries} C={cannibals} k={capacity}: {crossings} crossings, {elapsed:.2f}s, "
+              f"{report['states']} states reached, {report['bytes'] / 1e6:.1f} MB, "
+              f"{report['bytes_per_state']:.1f} bytes/state ({report['bytes_per_reached_state']:.1f} per reached state)")
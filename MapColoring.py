@@ -1,9 +1,15 @@
+import random
+
+from CSP import CSP
+from SearchStats import SearchStats, instrumented
+
 class MapColoring:
-    def __init__(self, states, neighbors, colors):
+    def __init__(self, states, neighbors, colors, verbose=False):
         self.states = states  # List of states or regions
         self.neighbors = neighbors  # Dictionary mapping states to their neighboring states
         self.colors = colors  # List of available colors
         self.state_colors = {}  # Dictionary to store assigned colors
+        self.verbose = verbose  # Print every attempt, assignment and backtrack
 
     def is_valid(self, state, color):
         """Check if the current color assignment is valid."""
@@ -12,41 +18,74 @@ class MapColoring:
                 return False
         return True
 
-    def solve(self, index=0):
-        """Solve the map coloring problem using backtracking."""
-        if index == len(self.states):
-            return True  # All states have been colored successfully
-        
-        state = self.states[index]
-        for color in self.colors:
-            print(f"Trying to color {state} with {color}")
-            if self.is_valid(state, color):
-                self.state_colors[state] = color  # Assign color
-                print(f"{state} is colored with {color}")
-                if self.solve(index + 1):  # Recur for next state
-                    return True
-                print(f"Backtracking on {state}, removing color {color}")
-                del self.state_colors[state]  # Backtrack
-        
-        return False  # No valid color assignment found
-
-    def get_coloring(self):
+    @instrumented
+    def solve(self, index=0, stats=None):
+        """
+        Colors the map with the CSP engine (MRV, forward checking, backjumping).
+        States before 'index' keep the colors already in state_colors.
+        'stats' takes a SearchStats to fill in.
+        """
+        csp = CSP(self.states, self.colors, verbose=self.verbose)
+        for state in self.states:
+            for neighbor in self.neighbors.get(state, []):
+                if neighbor in csp.index and neighbor != state:
+                    csp.add_different(state, neighbor)
+        fixed = {state: self.state_colors[state] for state in self.states[:index] if state in self.state_colors}
+        solution = csp.solve(assigned=fixed, stats=stats)
+        if solution is None:
+            return False
+        self.state_colors.update(solution)
+        return True
+
+    def get_coloring(self, stats=None):
         """Returns the assigned colors after solving."""
-        if self.solve():
+        if self.solve(stats=stats):
             return self.state_colors
         else:
             return "No valid coloring possible"
 
+def planar_map(width, height, seed):
+    """
+    Regions on a width x height grid, adjacent to their 4 neighbours plus one
+    random diagonal in every 2x2 block: a random planar triangulation.
+    """
+    rng = random.Random(seed)
+    names = [f"R{x}_{y}" for y in range(height) for x in range(width)]
+    neighbors = {name: set() for name in names}
+
+    def link(a, b):
+        neighbors[a].add(b)
+        neighbors[b].add(a)
+
+    for y in range(height):
+        for x in range(width):
+            here = f"R{x}_{y}"
+            if x + 1 < width:
+                link(here, f"R{x + 1}_{y}")
+            if y + 1 < height:
+                link(here, f"R{x}_{y + 1}")
+            if x + 1 < width and y + 1 < height:
+                if rng.random() < 0.5:
+                    link(here, f"R{x + 1}_{y + 1}")
+                else:
+                    link(f"R{x + 1}_{y}", f"R{x}_{y + 1}")
+    order = names[:]
+    rng.shuffle(order)
+    return order, {name: sorted(adjacent) for name, adjacent in neighbors.items()}
+
 # Example usage
-states = ["A", "B", "C", "D"]
-neighbors = {
-    "A": ["B", "C"],
-    "B": ["A", "C", "D"],
-    "C": ["A", "B", "D"],
-    "D": ["B", "C"]
-}
-colors = ["Red", "Green", "Blue"]
-
-map_coloring = MapColoring(states, neighbors, colors)
-solution = map_coloring.get_coloring()
-print("Final Coloring:", solution)
+if __name__ == '__main__':
+    states = ["A", "B", "C", "D"]
+    neighbors = {
+        "A": ["B", "C"],
+        "B": ["A", "C", "D"],
+        "C": ["A", "B", "D"],
+        "D": ["B", "C"]
+    }
+    colors = ["Red", "Green", "Blue"]
+
+    map_coloring = MapColoring(states, neighbors, colors, verbose=True)
+    stats = SearchStats()
+    solution = map_coloring.get_coloring(stats=stats)
+    print("Final Coloring:", solution)
+    print(stats)
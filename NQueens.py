@@ -0,0 +1,306 @@
+"""
+Bitboard N-Queens engine.
+
+Rows are filled top to bottom; the occupied columns and both diagonal
+directions are kept as integer masks, so the free squares of a row are
+simply ~(cols | left | right) and every placement is a few bit operations
+instead of 8queen's column and diagonal scans.
+
+Boards far beyond backtracking range are solved with min_conflicts, a
+local search over a one-queen-per-row permutation with diagonal counters.
+
+Solutions are lists (arrays for min_conflicts) with the queen's column for every row.
+"""
+import random
+import sys
+import time
+from array import array
+from multiprocessing import Pool
+
+from SearchStats import instrumented
+
+GREEDY_TRIES = 64  # Random columns tried per row before min_conflicts accepts an attacked square
+SIDEWAYS = 0.2  # Chance of taking a swap that leaves the attack count unchanged, to escape plateaus
+
+
+def _columns(bits, n):
+    """Converts the list of single-bit placements into column numbers."""
+    return [bit.bit_length() - 1 for bit in bits]
+
+
+@instrumented
+def first_solution(n, stats=None):
+    """First solution in lexicographic column order, or None if there is none. 'stats' takes a SearchStats to fill in."""
+    for solution in solutions(n, stats=stats):
+        return solution
+    return None
+
+
+def solutions(n, stats=None):
+    """Yields every solution, in lexicographic order (iterative, so no recursion limit)."""
+    if n <= 0:
+        return
+    full = (1 << n) - 1
+    placed = []
+    # Each stack entry: the candidate squares still to try in that row plus the row's masks
+    stack = [(full, 0, 0, 0)]
+    while stack:
+        available, cols, left, right = stack.pop()
+        if not available:
+            if placed:
+                placed.pop()
+            continue
+        bit = available & -available
+        stack.append((available ^ bit, cols, left, right))
+        placed.append(bit)
+        if stats:
+            stats.expand(len(placed))
+            stats.generate()
+        if len(placed) == n:
+            yield _columns(placed, n)
+            placed.pop()
+            continue
+        cols, left, right = cols | bit, ((left | bit) << 1) & full, (right | bit) >> 1
+        stack.append((full & ~(cols | left | right), cols, left, right))
+
+
+def _count(full, cols, left, right):
+    """Number of ways to complete the rows below, given the masks of the occupied squares."""
+    if cols == full:
+        return 1
+    total = 0
+    available = full & ~(cols | left | right)
+    while available:
+        bit = available & -available
+        available ^= bit
+        total += _count(full, cols | bit, ((left | bit) << 1) & full, (right | bit) >> 1)
+    return total
+
+
+def branches(n, symmetry=True):
+    """
+    Independent sub-problems as (weight, first-row bit, second-row bit).
+
+    With 'symmetry', only first-row queens in the left half are searched and
+    counted twice: mirroring a board left-right maps those solutions one-to-one
+    onto the right half. A queen in the middle column of an odd board is its
+    own mirror and is counted once.
+    """
+    full = (1 << n) - 1
+    columns = range((n + 1) // 2) if symmetry else range(n)
+    result = []
+    for first in columns:
+        weight = 2 if symmetry and not (n % 2 and first == n // 2) else 1
+        bit = 1 << first
+        available = full & ~(bit | (bit << 1) | (bit >> 1))
+        if n == 1:
+            result.append((weight, bit, 0))
+        while available:
+            second = available & -available
+            available ^= second
+            result.append((weight, bit, second))
+    return result
+
+
+def _count_branch(task):
+    n, weight, first, second = task
+    full = (1 << n) - 1
+    if not second:
+        return weight * _count(full, first, (first << 1) & full, first >> 1)
+    cols = first | second
+    left = ((((first << 1) & full) | second) << 1) & full
+    right = ((first >> 1) | second) >> 1
+    return weight * _count(full, cols, left, right)
+
+
+@instrumented
+def count_solutions(n, workers=1, symmetry=True, stats=None):
+    """
+    Counts all solutions. The first two rows are split into independent
+    branches; with workers > 1 they are spread over a process pool.
+
+    'stats' only records wall time here: per-node counters would double the cost of the counting loop.
+    """
+    if n <= 0:
+        return 0
+    tasks = [(n, weight, first, second) for weight, first, second in branches(n, symmetry)]
+    if workers == 1:
+        return sum(map(_count_branch, tasks))
+    with Pool(workers) as pool:
+        return sum(pool.imap_unordered(_count_branch, tasks))
+
+
+def _greedy_placement(n, rng):
+    """
+    Builds the permutation row by row, taking for each row a random unused
+    column that no earlier queen attacks (a few tries, then any column).
+    Returns (queens, down, up, conflicted rows).
+    """
+    queens = array('i', range(n))
+    down = array('i', [0]) * (2 * n - 1)  # Queens on each row + col diagonal
+    up = array('i', [0]) * (2 * n - 1)  # Queens on each row - col + n - 1 diagonal
+    offset = n - 1
+    random = rng.random
+    conflicted = []
+    for row in range(n):
+        remaining = n - row
+        for _ in range(GREEDY_TRIES):
+            j = row + int(random() * remaining)
+            col = queens[j]
+            if not down[row + col] and not up[row - col + offset]:
+                break
+        else:
+            conflicted.append(row)
+        queens[j] = queens[row]
+        queens[row] = col
+        down[row + col] += 1
+        up[row - col + offset] += 1
+    return queens, down, up, conflicted
+
+
+def _repair(n, queens, down, up, conflicted, rng, max_steps, stats):
+    """
+    Min-conflicts repair: swap the columns of an attacked queen and a random
+    other queen whenever that lowers the number of attacks on the two. Swaps
+    keep the permutation, so columns never clash and only diagonals are counted.
+    Returns False when max_steps swaps were tried without reaching zero conflicts.
+    """
+    offset = n - 1
+    random = rng.random
+    steps = 0
+    while conflicted:
+        # A random attacked queen rather than the latest one, so that plateaus are not revisited in a fixed order
+        k = int(random() * len(conflicted))
+        conflicted[k], conflicted[-1] = conflicted[-1], conflicted[k]
+        i = conflicted.pop()
+        a = queens[i]
+        if down[i + a] == 1 and up[i - a + offset] == 1:
+            continue  # Fixed by an earlier swap
+        if stats:
+            stats.expand(len(conflicted) + 1, i)
+        while True:
+            steps += 1
+            if steps > max_steps:
+                return False
+            j = int(random() * n)
+            if j == i:
+                continue
+            b = queens[j]
+            if stats:
+                stats.generate()
+            down[i + a] -= 1
+            up[i - a + offset] -= 1
+            down[j + b] -= 1
+            up[j - b + offset] -= 1
+            # Attacks on queens i and j from the others, plus on each other, before and after the swap
+            before = (down[i + a] + up[i - a + offset] + down[j + b] + up[j - b + offset]
+                      + (i + a == j + b) + (i - a == j - b))
+            after = (down[i + b] + up[i - b + offset] + down[j + a] + up[j - a + offset]
+                     + (i + b == j + a) + (i - b == j - a))
+            if after < before or (after == before and random() < SIDEWAYS):
+                queens[i], queens[j] = b, a
+                down[i + b] += 1
+                up[i - b + offset] += 1
+                down[j + a] += 1
+                up[j - a + offset] += 1
+                if down[j + a] > 1 or up[j - a + offset] > 1:
+                    conflicted.append(j)
+                if down[i + b] > 1 or up[i - b + offset] > 1:
+                    conflicted.append(i)
+                break
+            down[i + a] += 1
+            up[i - a + offset] += 1
+            down[j + b] += 1
+            up[j - b + offset] += 1
+    return True
+
+
+@instrumented
+def min_conflicts(n, seed=0, max_steps=None, max_restarts=1000, stats=None):
+    """
+    Local search for one solution of a large board, in O(n) memory.
+
+    A greedy random placement leaves only a handful of attacked queens for
+    large n; those are repaired with min-conflicts swaps. If the repair
+    stalls after max_steps swaps (default 20n + 200), the search restarts
+    from a new greedy placement, up to max_restarts times.
+
+    Returns an array('i') of columns per row, or None (always for n = 2, 3).
+    'stats' takes a SearchStats to fill in.
+    """
+    if n in (2, 3) or n <= 0:
+        return None
+    rng = random.Random(seed)
+    max_steps = max_steps or 20 * n + 200
+    for _ in range(max_restarts + 1):
+        queens, down, up, conflicted = _greedy_placement(n, rng)
+        if _repair(n, queens, down, up, conflicted, rng, max_steps, stats):
+            return queens
+    return None
+
+
+def write_solution(solution, file, chunk=1 << 16):
+    """Streams a solution as one column number per line, 'chunk' rows per write."""
+    for start in range(0, len(solution), chunk):
+        file.write('\n'.join(map(str, solution[start:start + chunk])))
+        file.write('\n')
+
+
+def print_solution(solution):
+    """Prints the board in 8queen's 0/1 format."""
+    n = len(solution)
+    for col in solution:
+        print(' '.join('1' if j == col else '0' for j in range(n)))
+
+
+def is_valid(solution):
+    """Checks a column-per-row placement: one queen per column and diagonal."""
+    n = len(solution)
+    return (len(set(solution)) == n
+            and len({row + col for row, col in enumerate(solution)}) == n
+            and len({row - col for row, col in enumerate(solution)}) == n)
+
+
+def benchmark(sizes, workers=1):
+    """First-solution time against 8queen's backtracking, then full counts."""
+    import importlib.machinery
+    import importlib.util
+    import os
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '8queen')
+    loader = importlib.machinery.SourceFileLoader('eight_queen', path)
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader('eight_queen', loader))
+    loader.exec_module(module)
+
+    print(f"{'N':>3} {'8queen first':>14} {'bitmask first':>14} {'count':>12} {'count time':>11}")
+    for n in sizes:
+        board = [[0] * n for _ in range(n)]
+        started = time.perf_counter()
+        module.solve_n_queens_util(board, 0)
+        old = time.perf_counter() - started
+        started = time.perf_counter()
+        solution = first_solution(n)
+        new = time.perf_counter() - started
+        assert solution == [row.index(1) for row in board]
+        started = time.perf_counter()
+        total = count_solutions(n, workers=workers)
+        counting = time.perf_counter() - started
+        print(f"{n:>3} {old * 1000:>12.2f}ms {new * 1000:>12.2f}ms {total:>12} {counting:>10.2f}s")
+
+
+if __name__ == "__main__":
+    # python NQueens.py [workers] [sizes...]
+    # python NQueens.py min-conflicts N [output file]
+    if sys.argv[1:2] == ['min-conflicts']:
+        n = int(sys.argv[2])
+        started = time.perf_counter()
+        solution = min_conflicts(n)
+        print(f"{n} queens placed in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+        if len(sys.argv) > 3:
+            with open(sys.argv[3], 'w') as f:
+                write_solution(solution, f)
+        else:
+            write_solution(solution, sys.stdout)
+        sys.exit()
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    sizes = [int(arg) for arg in sys.argv[2:]] or [8, 10, 12, 14]
+    benchmark(sizes, workers)
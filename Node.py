@@ -1,4 +1,4 @@
-import heapq
+from SearchStats import instrumented
 
 class Node:
     def __init__(self, state, parent=None, cost=0, heuristic=0):
@@ -11,7 +11,84 @@ class Node:
         # Used for priority queue (heap) ordering.  Nodes with lower f-scores are prioritized.
         return (self.cost + self.heuristic) < (other.cost + other.heuristic)
 
-def a_star(graph, start, goal, heuristic_func):
+class IndexedHeap:
+    """
+    Binary min-heap addressable by key: membership, priority lookup and
+    decrease-key are O(1), O(1) and O(log n) through a key -> slot index.
+    """
+
+    def __init__(self):
+        self.keys = []  # Heap-ordered keys
+        self.priorities = []  # Priorities parallel to self.keys
+        self.slots = {}  # key -> position in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def priority(self, key):
+        return self.priorities[self.slots[key]]
+
+    def push(self, key, priority):
+        """Inserts key, or lowers its priority if it is already queued with a higher one."""
+        slot = self.slots.get(key)
+        if slot is None:
+            self.keys.append(key)
+            self.priorities.append(priority)
+            slot = len(self.keys) - 1
+            self.slots[key] = slot
+            self._sift_up(slot)
+        elif priority < self.priorities[slot]:
+            self.priorities[slot] = priority
+            self._sift_up(slot)
+
+    def pop(self):
+        """Removes and returns the (key, priority) pair with the lowest priority."""
+        keys, priorities = self.keys, self.priorities
+        key, priority = keys[0], priorities[0]
+        del self.slots[key]
+        last_key, last_priority = keys.pop(), priorities.pop()
+        if keys:
+            keys[0], priorities[0] = last_key, last_priority
+            self.slots[last_key] = 0
+            self._sift_down(0)
+        return key, priority
+
+    def _sift_up(self, slot):
+        keys, priorities, slots = self.keys, self.priorities, self.slots
+        key, priority = keys[slot], priorities[slot]
+        while slot > 0:
+            parent = (slot - 1) >> 1
+            if priorities[parent] <= priority:
+                break
+            keys[slot], priorities[slot] = keys[parent], priorities[parent]
+            slots[keys[slot]] = slot
+            slot = parent
+        keys[slot], priorities[slot] = key, priority
+        slots[key] = slot
+
+    def _sift_down(self, slot):
+        keys, priorities, slots = self.keys, self.priorities, self.slots
+        size = len(keys)
+        key, priority = keys[slot], priorities[slot]
+        while True:
+            child = 2 * slot + 1
+            if child >= size:
+                break
+            if child + 1 < size and priorities[child + 1] < priorities[child]:
+                child += 1
+            if priorities[child] >= priority:
+                break
+            keys[slot], priorities[slot] = keys[child], priorities[child]
+            slots[keys[slot]] = slot
+            slot = child
+        keys[slot], priorities[slot] = key, priority
+        slots[key] = slot
+
+@instrumented
+def a_star(graph, start, goal, heuristic_func, stats=None):
     """
     A* search algorithm to find the shortest path from a start node to a goal node.
 
@@ -36,6 +113,7 @@ def a_star(graph, start, goal, heuristic_func):
                         an estimated cost (heuristic) to reach the goal from that node.
                         The heuristic function must be admissible (never overestimates
                         the actual cost).
+        stats: Optional SearchStats that receives node counts and timing.
 
     Returns:
         A tuple containing:
@@ -43,45 +121,88 @@ def a_star(graph, start, goal, heuristic_func):
         - The total cost of the path, or None if no path exists.
     """
 
-    open_set = []  # Priority queue (heap) of nodes to explore
+    open_set = IndexedHeap()  # Priority queue keyed by state, ordered by f-score
     closed_set = set()  # Set of visited nodes
-    start_node = Node(start, cost=0, heuristic=heuristic_func(start))
-    heapq.heappush(open_set, start_node)  # Add the start node to the open set
+    g_score = {start: 0}  # Cheapest known cost to each state in the open set
+    parents = {start: None}
+    open_set.push(start, heuristic_func(start))
 
     while open_set:
-        current_node = heapq.heappop(open_set)  # Get the node with the lowest f-score
+        current, _ = open_set.pop()  # Get the node with the lowest f-score
+        current_cost = g_score[current]
 
-        if current_node.state == goal:
+        if current == goal:
             # Reconstruct the path
             path = []
-            node = current_node
-            while node:
-                path.append(node.state)
-                node = node.parent
-            return path[::-1], current_node.cost  # Reverse the path to get the correct order
+            node = current
+            while node is not None:
+                path.append(node)
+                node = parents[node]
+            return path[::-1], current_cost  # Reverse the path to get the correct order
 
-        closed_set.add(current_node.state)  # Mark the current node as visited
+        closed_set.add(current)  # Mark the current node as visited
+        if stats:
+            stats.expand(len(open_set) + 1, current)
 
-        for neighbor, cost in graph.get(current_node.state, {}).items():
+        for neighbor, cost in graph.get(current, {}).items():
             if neighbor in closed_set:
+                if stats:
+                    stats.duplicate()
                 continue  # Skip already visited neighbors
 
-            tentative_cost = current_node.cost + cost
-            neighbor_node = Node(neighbor, parent=current_node, cost=tentative_cost, heuristic=heuristic_func(neighbor))
+            tentative_cost = current_cost + cost
 
-            # Check if the neighbor is already in the open set with a lower cost
-            in_open_set = False
-            for node in open_set:
-                if node.state == neighbor and node.cost <= tentative_cost:
-                    in_open_set = True
-                    break
-            if in_open_set:
+            # A queued entry with a lower or equal cost wins; otherwise decrease its key
+            if neighbor in open_set and g_score[neighbor] <= tentative_cost:
+                if stats:
+                    stats.duplicate()
                 continue
 
-            heapq.heappush(open_set, neighbor_node)  # Add the neighbor to the open set
+            g_score[neighbor] = tentative_cost
+            parents[neighbor] = current
+            open_set.push(neighbor, tentative_cost + heuristic_func(neighbor))
+            if stats:
+                stats.generate()
 
     return None, None  # No path found
 
+def grid_graph(width, height):
+    """4-connected width x height grid with unit costs; nodes are (x, y) tuples."""
+    graph = {}
+    for y in range(height):
+        for x in range(width):
+            neighbors = {}
+            if x > 0:
+                neighbors[(x - 1, y)] = 1
+            if x < width - 1:
+                neighbors[(x + 1, y)] = 1
+            if y > 0:
+                neighbors[(x, y - 1)] = 1
+            if y < height - 1:
+                neighbors[(x, y + 1)] = 1
+            graph[(x, y)] = neighbors
+    return graph
+
+def benchmark_grid(side, search=None):
+    """Runs A* corner to corner on a side x side grid; returns (nodes expanded, seconds)."""
+    import time
+    search = search or a_star
+    graph = grid_graph(side, side)
+    expanded = 0
+
+    class CountingGraph(dict):
+        def get(self, key, default=None):
+            nonlocal expanded
+            expanded += 1
+            return dict.get(self, key, default)
+
+    goal = (side - 1, side - 1)
+    # Halved Manhattan distance keeps a large open set, which is what stresses the queue
+    heuristic = lambda node: (abs(node[0] - goal[0]) + abs(node[1] - goal[1])) // 2
+    started = time.perf_counter()
+    search(CountingGraph(graph), (0, 0), goal, heuristic)
+    return expanded, time.perf_counter() - started
+
 
 # Example Usage:
 if __name__ == '__main__':
@@ -119,3 +240,9 @@ if __name__ == '__main__':
         print("Cost:", cost)
     else:
         print("No path found.")
+
+    # Scaling on grid graphs: pass a side length, e.g. `python Node.py 1000` for 10^6 vertices
+    import sys
+    for side in map(int, sys.argv[1:]):
+        expanded, seconds = benchmark_grid(side)
+        print(f"{side}x{side} grid: {expanded} nodes expanded in {seconds:.2f}s ({expanded / seconds:,.0f} nodes/sec)")
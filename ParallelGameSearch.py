@@ -0,0 +1,229 @@
+"""
+Multi-core alpha-beta for the games in GameSearch.
+
+Principal-variation splitting (Young Brothers Wait at the nodes of the
+principal variation): at every PV node the first ("eldest") move is searched
+first, recursively, to get a bound; only then are its younger siblings
+searched in parallel by a process pool. All processes share one lockless
+transposition table in shared memory.
+
+Every sibling is searched with a window that keeps any score above the
+eldest brother's exact, so the returned value is the same minimax value the
+sequential Searcher finds at the same depth.
+
+Games must be picklable, and their moves small ints (0-254) so that they
+fit in a shared table entry.
+"""
+import os
+import time
+from multiprocessing import Pool, RawArray
+
+from GameSearch import EXACT, INF, MATE_BOUND, Searcher, score_from_table, score_to_table
+
+VALID = 1 << 63
+
+
+class SharedTranspositionTable:
+    """
+    Drop-in TranspositionTable over a RawArray of 64-bit words that every
+    pool process maps. Each slot is two words, (key ^ data, data), written
+    without locks: a slot torn by two processes writing at once no longer
+    XORs back to its key, so probe() simply treats it as a miss.
+
+    data packs score (32 bits, offset), depth (8), flag (2), move + 1 (8, 0 for
+    none), generation (8) and a valid bit. Buckets hold a depth-preferred and
+    an always-replace slot, as in TranspositionTable.
+    """
+
+    def __init__(self, bits=18, buffer=None):
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.buffer = buffer if buffer is not None else RawArray('Q', 4 << bits)
+        self.words = memoryview(self.buffer).cast('B').cast('Q')
+        self.generation = 0
+
+    def __getstate__(self):
+        # The RawArray itself is inherited by pool processes; the view is rebuilt
+        return {'bits': self.bits, 'buffer': self.buffer, 'generation': self.generation}
+
+    def __setstate__(self, state):
+        self.__init__(state['bits'], state['buffer'])
+        self.generation = state['generation']
+
+    def new_search(self):
+        self.generation += 1
+
+    def _read(self, i, key):
+        data = self.words[i + 1]
+        if not data & VALID or self.words[i] ^ data != key:
+            return None
+        move = (data >> 42) & 0xFF
+        return (key, (data >> 32) & 0xFF, (data & 0xFFFFFFFF) - (1 << 31), (data >> 40) & 3,
+                move - 1 if move else None, (data >> 50) & 0xFF)
+
+    def probe(self, key):
+        i = (key & self.mask) * 4
+        return self._read(i, key) or self._read(i + 2, key)
+
+    def store(self, key, depth, score, flag, move):
+        i = (key & self.mask) * 4
+        generation = self.generation & 0xFF
+        data = (VALID | generation << 50 | (0 if move is None else move + 1) << 42 | flag << 40
+                | min(depth, 255) << 32 | (score + (1 << 31)))
+        words = self.words
+        old = words[i + 1]
+        old_key = words[i] ^ old
+        if (not old & VALID or old_key == key or depth >= (old >> 32) & 0xFF
+                or (old >> 50) & 0xFF != generation):
+            slot = i
+        else:
+            slot = i + 2
+        words[slot] = key ^ data
+        words[slot + 1] = data
+
+
+_worker = {}
+
+
+def _start_worker(game, table):
+    _worker['searcher'] = Searcher(game, table)
+
+
+def _search_sibling(task):
+    """Scores one younger sibling: null window against alpha first, full re-search only if it beats alpha."""
+    path, move, depth, alpha, generation = task
+    searcher = _worker['searcher']
+    game = searcher.game
+    searcher.table.generation = generation
+    searcher.nodes = 0
+    for step in path:
+        game.make(step)
+    game.make(move)
+    ply = len(path) + 1
+    try:
+        score = -searcher.negamax(depth - 1, -alpha - 1, -alpha, ply)
+        if score > alpha:
+            score = -searcher.negamax(depth - 1, -INF, -alpha, ply)
+    finally:
+        game.unmake(move)
+        for step in reversed(path):
+            game.unmake(step)
+    return move, score, searcher.nodes
+
+
+class ParallelSearcher:
+    """
+    Same interface and result as Searcher.search, for fixed-depth iterative
+    deepening. Nodes with less than 'split_depth' plies to go are searched
+    sequentially, since shipping them to another process costs more than it saves.
+    """
+
+    def __init__(self, game, workers=None, bits=18, split_depth=4):
+        self.game = game
+        self.workers = workers or os.cpu_count()
+        self.table = SharedTranspositionTable(bits)
+        self.searcher = Searcher(game, self.table)
+        self.split_depth = split_depth
+        self.pool = None
+        self.nodes = 0
+
+    def _split(self, path, depth):
+        game = self.game
+        ply = len(path)
+        if depth < self.split_depth:
+            before = self.searcher.nodes
+            score = self.searcher.negamax(depth, -INF, INF, ply)
+            self.nodes += self.searcher.nodes - before
+            return score
+        self.nodes += 1
+        score = game.terminal_score()
+        if score is not None:
+            return score_from_table(score, ply)
+
+        entry = self.table.probe(game.key)
+        moves = self.searcher.order(game.moves(), ply, entry[4] if entry else None)
+        if not moves:
+            return game.evaluate()
+
+        eldest = moves[0]
+        game.make(eldest)
+        path.append(eldest)
+        try:
+            best = -self._split(path, depth - 1)
+        finally:
+            path.pop()
+            game.unmake(eldest)
+        best_move = eldest
+
+        tasks = [(list(path), move, depth, best, self.table.generation) for move in moves[1:]]
+        for move, score, nodes in self.pool.imap_unordered(_search_sibling, tasks):
+            self.nodes += nodes
+            if score > best or (score == best and moves.index(move) < moves.index(best_move)):
+                best, best_move = score, move
+
+        self.table.store(game.key, depth, score_to_table(best, ply), EXACT, best_move)
+        return best
+
+    def search(self, max_depth=64):
+        """Iterative deepening to max_depth (or a forced win or loss); returns Searcher.search's dict."""
+        self.table.new_search()
+        self.nodes = 0
+        started = time.perf_counter()
+        limit = max_depth
+        if hasattr(self.game, 'plies_left'):
+            limit = min(limit, self.game.plies_left())
+
+        result = {'move': None, 'score': self.game.evaluate(), 'depth': 0, 'pv': [], 'iterations': []}
+        previous_nodes = None
+        with Pool(self.workers, initializer=_start_worker, initargs=(self.game, self.table)) as pool:
+            self.pool = pool
+            for depth in range(1, max(limit, 1) + 1):
+                before = self.nodes
+                score = self._split([], depth)
+                nodes = self.nodes - before
+                pv = self.searcher.principal_variation(depth)
+                result.update(move=pv[0] if pv else None, score=score, depth=depth, pv=pv)
+                result['iterations'].append((depth, score, nodes, time.perf_counter() - started,
+                                             nodes / previous_nodes if previous_nodes else None))
+                previous_nodes = nodes
+                if abs(score) >= MATE_BOUND:
+                    break
+        self.pool = None
+
+        seconds = time.perf_counter() - started
+        result['nodes'] = self.nodes
+        result['seconds'] = seconds
+        result['nps'] = self.nodes / seconds if seconds else 0.0
+        result['ebf'] = self.nodes ** (1 / result['depth']) if result['depth'] else 0.0
+        return result
+
+
+def benchmark(positions, depth, worker_counts):
+    """Sequential Searcher versus ParallelSearcher on fixed-depth searches; returns the speedups."""
+    from GameSearch import ConnectFour
+
+    speedups = {}
+    for opening in positions:
+        sequential = Searcher(ConnectFour(opening)).search(max_depth=depth)
+        print(f"Position {opening}, depth {depth}: sequential score {sequential['score']}, "
+              f"{sequential['nodes']} nodes, {sequential['seconds']:.2f}s")
+        for workers in worker_counts:
+            parallel = ParallelSearcher(ConnectFour(opening), workers=workers).search(max_depth=depth)
+            assert parallel['score'] == sequential['score'], (opening, workers)
+            speedup = sequential['seconds'] / parallel['seconds']
+            speedups.setdefault(workers, []).append(speedup)
+            print(f"  {workers} workers: score {parallel['score']}, {parallel['nodes']} nodes, "
+                  f"{parallel['seconds']:.2f}s, speedup {speedup:.2f}x")
+    return speedups
+
+
+if __name__ == '__main__':
+    import sys
+
+    # python ParallelGameSearch.py [depth] [worker counts...]
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 9
+    counts = [int(arg) for arg in sys.argv[2:]] or sorted({1, 2, 4, os.cpu_count()})
+    print(f"{os.cpu_count()} CPU(s) available")
+    speedups = benchmark([[3, 3, 2], [3, 2, 3, 4], [2, 4, 3, 3, 3]], depth, counts)
+    for workers, values in sorted(speedups.items()):
+        print(f"{workers} workers: mean speedup {sum(values) / len(values):.2f}x")
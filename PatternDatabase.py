@@ -0,0 +1,252 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import deque
+
+MAGIC = b'PDB1'
+UNSEEN = 255
+
+# Default disjoint partitions (consecutive tiles in row-major order) per board size.
+# A k-tile group is built by a pure-Python BFS over every placement of its tiles and
+# the blank (one byte each), so 5x5 uses 4-tile groups (about 25 s and 7.6 MB of
+# working table each); a 6-tile group there would need a 3.2 GB table.
+DEFAULT_PARTITIONS = {3: (4, 4), 4: (6, 6, 3), 5: (4, 4, 4, 4, 4, 4)}
+
+
+def default_goal(size):
+    """Goal layout used by Puzzle.heuristic: 1..n-1 in row-major order, blank last."""
+    return tuple(range(1, size * size)) + (0,)
+
+
+def flatten(state):
+    """Accepts a flat sequence or a list/tuple of rows and returns a flat tuple."""
+    if state and isinstance(state[0], (list, tuple)):
+        return tuple(value for row in state for value in row)
+    return tuple(state)
+
+
+def partition_tiles(size, partition, goal=None):
+    """
+    Splits the tiles into disjoint groups, e.g. partition (6, 6, 3) on a 4x4 board.
+    Tiles are taken in the order they appear in the goal layout.
+    """
+    tiles = [value for value in (goal or default_goal(size)) if value != 0]
+    if sum(partition) != len(tiles):
+        raise ValueError(f"Partition {partition} does not cover the {len(tiles)} tiles of a {size}x{size} board")
+    groups, start = [], 0
+    for count in partition:
+        groups.append(tuple(tiles[start:start + count]))
+        start += count
+    return groups
+
+
+def table_length(cells, k):
+    """Number of ways to place k distinct tiles on cells squares: cells! / (cells - k)!."""
+    length = 1
+    for i in range(k):
+        length *= cells - i
+    return length
+
+
+def rank_positions(positions, cells):
+    """Perfect hash of a k-permutation of board cells into range(table_length(cells, k))."""
+    rank = 0
+    used = 0
+    for i, position in enumerate(positions):
+        smaller = bin(used & ((1 << position) - 1)).count('1')
+        rank = rank * (cells - i) + position - smaller
+        used |= 1 << position
+    return rank
+
+
+def unrank_positions(rank, k, cells):
+    """Inverse of rank_positions."""
+    digits = [0] * k
+    for i in range(k - 1, -1, -1):
+        base = cells - i
+        rank, digits[i] = divmod(rank, base)
+    positions = []
+    free = list(range(cells))
+    for digit in digits:
+        positions.append(free.pop(digit))
+    return positions
+
+
+def neighbor_table(size):
+    """Cells adjacent to every cell of a size x size board."""
+    table = []
+    for position in range(size * size):
+        row, col = divmod(position, size)
+        adjacent = []
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            r, c = row + dr, col + dc
+            if 0 <= r < size and 0 <= c < size:
+                adjacent.append(r * size + c)
+        table.append(adjacent)
+    return table
+
+
+class PatternDatabase:
+    """
+    Distance table for one group of tiles. Only moves of tiles in the group are
+    counted, so the tables of a disjoint partition can be added together.
+    """
+
+    def __init__(self, size, tiles, goal, table):
+        self.size = size
+        self.cells = size * size
+        self.tiles = tuple(tiles)
+        self.goal = tuple(goal)
+        self.table = table  # bytearray, or memoryview over an mmap after load()
+        self._mmap = None
+
+    @classmethod
+    def build(cls, size, tiles, goal=None):
+        """Retrograde 0-1 BFS from the goal over (tile positions, blank position)."""
+        goal = tuple(goal or default_goal(size))
+        cells = size * size
+        k = len(tiles)
+        adjacent = neighbor_table(size)
+        length = table_length(cells, k)
+
+        # dist[rank * cells + blank] = pattern-tile moves needed from that abstract state
+        dist = bytearray([UNSEEN]) * (length * cells)
+        start_rank = rank_positions([goal.index(tile) for tile in tiles], cells)
+        start = start_rank * cells + goal.index(0)
+        dist[start] = 0
+        queue = deque([start])
+
+        while queue:
+            index = queue.popleft()
+            rank, blank = divmod(index, cells)
+            d = dist[index]
+            positions = unrank_positions(rank, k, cells)
+            for target in adjacent[blank]:
+                if target in positions:
+                    # A pattern tile slides into the blank: costs one move
+                    moved = positions[:]
+                    moved[positions.index(target)] = blank
+                    new_index = rank_positions(moved, cells) * cells + target
+                    if dist[new_index] == UNSEEN:
+                        dist[new_index] = d + 1
+                        queue.append(new_index)
+                else:
+                    # A tile outside the pattern moves: free in the abstraction
+                    new_index = rank * cells + target
+                    if dist[new_index] == UNSEEN or dist[new_index] > d:
+                        dist[new_index] = d
+                        queue.appendleft(new_index)
+
+        table = bytearray(length)
+        for rank in range(length):
+            row = dist[rank * cells:(rank + 1) * cells]
+            table[rank] = min(row)
+        return cls(size, tiles, goal, table)
+
+    def lookup(self, where):
+        """Heuristic value given where[tile] = board position for every tile."""
+        return self.table[rank_positions([where[tile] for tile in self.tiles], self.cells)]
+
+    def save(self, path):
+        """Writes header, goal layout and tile list, then the raw byte table."""
+        header = struct.pack('<4sBB', MAGIC, self.size, len(self.tiles)) + bytes(self.goal) + bytes(self.tiles)
+        header += b'\0' * (-len(header) % 8)
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.write(self.table)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps a table written by save(); pages are read lazily by the OS."""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size, k = struct.unpack_from('<4sBB', mapped)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a pattern database file")
+        offset = 6
+        cells = size * size
+        goal = tuple(mapped[offset:offset + cells])
+        offset += cells
+        tiles = tuple(mapped[offset:offset + k])
+        offset += k
+        offset += -offset % 8
+        database = cls(size, tiles, goal, memoryview(mapped)[offset:offset + table_length(cells, k)])
+        database._mmap = mapped
+        return database
+
+
+class PatternDatabaseHeuristic:
+    """Additive heuristic over a disjoint set of pattern databases; call it with a board."""
+
+    def __init__(self, databases):
+        self.databases = list(databases)
+        self.cells = self.databases[0].cells
+        goals = {database.goal for database in self.databases}
+        if len(goals) != 1:
+            raise ValueError("All pattern databases must be built for the same goal layout")
+        self.goal = goals.pop()
+
+    def __call__(self, state):
+        where = [0] * self.cells
+        for position, value in enumerate(flatten(state)):
+            where[value] = position
+        return sum(database.lookup(where) for database in self.databases)
+
+    @classmethod
+    def load(cls, paths):
+        return cls(PatternDatabase.load(path) for path in paths)
+
+
+def build_databases(size, partition=None, goal=None, directory='.'):
+    """Builds, saves and reloads one table per group; returns the heuristic and a report."""
+    if partition is None:
+        if size not in DEFAULT_PARTITIONS:
+            raise ValueError(f"No default partition for a {size}x{size} board; pass one explicitly")
+        partition = DEFAULT_PARTITIONS[size]
+    goal = tuple(goal or default_goal(size))
+    os.makedirs(directory, exist_ok=True)
+    report = []
+    paths = []
+    for tiles in partition_tiles(size, partition, goal):
+        started = time.perf_counter()
+        database = PatternDatabase.build(size, tiles, goal)
+        build_time = time.perf_counter() - started
+        path = os.path.join(directory, f"pdb{size}x{size}_" + "-".join(map(str, tiles)) + ".bin")
+        database.save(path)
+        paths.append(path)
+        report.append({
+            'tiles': tiles,
+            'build_seconds': round(build_time, 3),
+            'table_bytes': len(database.table),
+            'max_value': max(database.table),
+        })
+    return PatternDatabaseHeuristic.load(paths), report
+
+
+def measure_lookup(heuristic, samples=20000):
+    """Average cost of one heuristic call, in microseconds, over random boards."""
+    import random
+    rng = random.Random(0)
+    boards = []
+    for _ in range(100):
+        board = list(heuristic.goal)
+        rng.shuffle(board)
+        boards.append(tuple(board))
+    started = time.perf_counter()
+    for i in range(samples):
+        heuristic(boards[i % 100])
+    return (time.perf_counter() - started) / samples * 1e6
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    partition = tuple(int(arg) for arg in sys.argv[2:]) or None
+
+    heuristic, report = build_databases(size, partition, directory='pdb')
+    for entry in report:
+        print(f"Tiles {entry['tiles']}: built in {entry['build_seconds']}s, "
+              f"{entry['table_bytes']} bytes, max {entry['max_value']}")
+    print(f"Total table size: {sum(entry['table_bytes'] for entry in report)} bytes")
+    print(f"Lookup cost: {measure_lookup(heuristic):.2f} us per board")
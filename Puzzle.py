@@ -1,13 +1,37 @@
 import heapq
+import time
+
+from SearchStats import instrumented
+
+class SearchLimitExceeded(Exception):
+    """Raised when a search runs past its node or time budget."""
+
+class SearchBudget:
+    """Node and wall-time limits, charged once per expanded (A*) or generated (IDA*) node."""
+
+    def __init__(self, max_nodes=None, time_limit=None):
+        self.max_nodes = max_nodes
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self.nodes = 0
+
+    def charge(self):
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchLimitExceeded(f"node limit of {self.max_nodes} reached")
+        # Checking the clock is comparatively slow, so only do it every 1024 nodes
+        if self.deadline is not None and not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise SearchLimitExceeded(f"time limit reached after {self.nodes} nodes")
 
 class Puzzle:
-    def __init__(self, state, parent=None, move=None, cost=0):
+    def __init__(self, state, parent=None, move=None, cost=0, heuristic_func=None):
         self.state = state
         self.parent = parent
         self.move = move
         self.cost = cost
         self.size = len(state)
         self.blank_position = self.find_blank()
+        self.heuristic_func = heuristic_func  # Optional pluggable heuristic, e.g. a pattern database
+        self.h = heuristic_func(state) if heuristic_func else None
 
     def __lt__(self, other):
         return (self.cost + self.heuristic()) < (other.cost + other.heuristic())
@@ -35,11 +59,14 @@ class Puzzle:
                 new_state = [list(row) for row in self.state]
                 new_state[row][col], new_state[new_row][new_col] = new_state[new_row][new_col], new_state[row][col]
                 new_state = tuple(tuple(row) for row in new_state)
-                neighbors.append(Puzzle(new_state, parent=self, move=move, cost=self.cost + 1))
+                neighbors.append(Puzzle(new_state, parent=self, move=move, cost=self.cost + 1,
+                                        heuristic_func=self.heuristic_func))
 
         return neighbors
 
     def heuristic(self):
+        if self.h is not None:
+            return self.h
         distance = 0
         for r in range(self.size):
             for c in range(self.size):
@@ -53,8 +80,75 @@ class Puzzle:
     def is_goal(self, goal_state):
         return self.state == goal_state
 
-def solve_8_puzzle(initial_state, goal_state):
-    initial_node = Puzzle(initial_state)
+def pack_state(state):
+    """Packs a square board into a single integer, 4 bits per tile in row-major order."""
+    packed = 0
+    shift = 0
+    for row in state:
+        for value in row:
+            packed |= value << shift
+            shift += 4
+    return packed
+
+def unpack_state(packed, size):
+    """Inverse of pack_state: rebuilds the tuple-of-tuples board."""
+    return tuple(
+        tuple((packed >> (4 * (r * size + c))) & 0xF for c in range(size))
+        for r in range(size)
+    )
+
+class PackedPuzzle:
+    """Lightweight search node for a packed board; f = g + h is computed once."""
+    __slots__ = ('state', 'blank', 'h', 'f', 'parent', 'move', 'cost')
+
+    def __init__(self, state, blank, h, parent=None, move=None, cost=0):
+        self.state = state
+        self.blank = blank  # Flat index of the blank tile
+        self.h = h
+        self.f = cost + h
+        self.parent = parent
+        self.move = move
+        self.cost = cost
+
+    def __lt__(self, other):
+        return self.f < other.f
+
+def manhattan_table(size):
+    """distances[value][position] for the same goal layout used by Puzzle.heuristic."""
+    distances = [[0] * (size * size) for _ in range(size * size)]
+    for value in range(1, size * size):
+        target_row, target_col = (value - 1) // size, (value - 1) % size
+        for position in range(size * size):
+            r, c = divmod(position, size)
+            distances[value][position] = abs(r - target_row) + abs(c - target_col)
+    return distances
+
+def blank_moves(size):
+    """For every blank position, the (move, new_blank_position) pairs in Puzzle.get_neighbors order."""
+    table = []
+    for position in range(size * size):
+        row, col = divmod(position, size)
+        moves = []
+        for move, (dr, dc) in (('up', (-1, 0)), ('down', (1, 0)), ('left', (0, -1)), ('right', (0, 1))):
+            new_row, new_col = row + dr, col + dc
+            if 0 <= new_row < size and 0 <= new_col < size:
+                moves.append((move, new_row * size + new_col))
+        table.append(moves)
+    return table
+
+@instrumented
+def solve_8_puzzle(initial_state, goal_state, packed=False, heuristic=None, budget=None, stats=None):
+    """
+    A* search from initial_state to goal_state. 'heuristic' optionally replaces the
+    built-in Manhattan distance with a callable taking a board (e.g. a
+    PatternDatabaseHeuristic built for the same goal layout). An optional
+    SearchBudget raises SearchLimitExceeded when it runs out, and an optional
+    SearchStats collects node counts.
+    """
+    if packed:
+        return solve_packed(initial_state, goal_state, heuristic, budget, stats=stats)
+
+    initial_node = Puzzle(initial_state, heuristic_func=heuristic)
     frontier = [initial_node]
     heapq.heapify(frontier)
     explored = set()
@@ -66,10 +160,76 @@ def solve_8_puzzle(initial_state, goal_state):
             return reconstruct_path(current_node)
 
         explored.add(current_node)
+        if budget:
+            budget.charge()
+        if stats:
+            stats.expand(len(frontier) + 1, current_node.state)
 
         for neighbor in current_node.get_neighbors():
             if neighbor not in explored:
                 heapq.heappush(frontier, neighbor)
+                if stats:
+                    stats.generate()
+            elif stats:
+                stats.duplicate()
+
+    return None
+
+@instrumented
+def solve_packed(initial_state, goal_state, heuristic=None, budget=None, stats=None):
+    """
+    Same search as solve_8_puzzle, but each board is a packed integer and the
+    Manhattan distance is updated from the parent by the delta of the moved tile.
+    Expands nodes in the same order and returns the same path. A custom
+    'heuristic' is evaluated on the flat board of every new node instead.
+    """
+    size = len(initial_state)
+    if size > 4:
+        raise ValueError("Packed mode supports boards up to 4x4 (4 bits per tile)")
+
+    distances = manhattan_table(size)
+    moves = blank_moves(size)
+    start = pack_state(initial_state)
+    goal = pack_state(goal_state)
+    blank = [value for row in initial_state for value in row].index(0)
+    cells = size * size
+    if heuristic:
+        h = heuristic(tuple(value for row in initial_state for value in row))
+    else:
+        h = sum(distances[(start >> (4 * i)) & 0xF][i] for i in range(cells))
+
+    frontier = [PackedPuzzle(start, blank, h)]
+    explored = set()
+
+    while frontier:
+        current_node = heapq.heappop(frontier)
+        state = current_node.state
+
+        if state == goal:
+            return reconstruct_packed_path(current_node, size)
+
+        explored.add(state)
+        if budget:
+            budget.charge()
+        if stats:
+            stats.expand(len(frontier) + 1, state)
+
+        blank, h, cost = current_node.blank, current_node.h, current_node.cost + 1
+        blank_shift = 4 * blank
+        for move, target in moves[blank]:
+            shift = 4 * target
+            tile = (state >> shift) & 0xF
+            new_state = (state & ~(0xF << shift)) | (tile << blank_shift)
+            if new_state not in explored:
+                if heuristic:
+                    new_h = heuristic(tuple((new_state >> (4 * i)) & 0xF for i in range(cells)))
+                else:
+                    new_h = h - distances[tile][target] + distances[tile][blank]
+                heapq.heappush(frontier, PackedPuzzle(new_state, target, new_h, current_node, move, cost))
+                if stats:
+                    stats.generate()
+            elif stats:
+                stats.duplicate()
 
     return None
 
@@ -81,6 +241,135 @@ def reconstruct_path(node):
     path.reverse()
     return path
 
+def reconstruct_packed_path(node, size):
+    path = []
+    while node.parent:
+        path.append((node.move, unpack_state(node.state, size)))
+        node = node.parent
+    path.reverse()
+    return path
+
+def is_solvable(initial_state, goal_state):
+    """
+    A board can reach the goal iff the parity of the permutation between them
+    equals the parity of the blank's Manhattan displacement.
+    """
+    size = len(initial_state)
+    start = [value for row in initial_state for value in row]
+    goal = [value for row in goal_state for value in row]
+    where = {value: i for i, value in enumerate(goal)}
+    permutation = [where[value] for value in start]
+
+    parity = 0
+    seen = [False] * len(permutation)
+    for i in range(len(permutation)):
+        length = 0
+        while not seen[i]:
+            seen[i] = True
+            i = permutation[i]
+            length += 1
+        if length:
+            parity ^= (length - 1) & 1
+
+    blank_row, blank_col = divmod(start.index(0), size)
+    goal_row, goal_col = divmod(goal.index(0), size)
+    return parity == (abs(blank_row - goal_row) + abs(blank_col - goal_col)) & 1
+
+@instrumented
+def ida_star_search(initial_state, goal_state, heuristic=None, budget=None, stats=None):
+    """
+    Iterative-deepening A* on one mutable flat board with in-place make/unmake
+    moves. Memory is proportional to the solution depth, not the search size.
+    The inverse of the previous move is never generated.
+
+    Returns:
+    - path: list of (move, state) like solve_8_puzzle, or None if unsolvable.
+    - iterations: list of (threshold, nodes generated) for every deepening pass.
+    """
+    size = len(initial_state)
+    cells = size * size
+    if not is_solvable(initial_state, goal_state):
+        return None, []
+
+    board = [value for row in initial_state for value in row]
+    goal = [value for row in goal_state for value in row]
+
+    # Manhattan distances relative to the requested goal layout
+    distances = [[0] * cells for _ in range(cells)]
+    for position, value in enumerate(goal):
+        if value != 0:
+            goal_row, goal_col = divmod(position, size)
+            for i in range(cells):
+                r, c = divmod(i, size)
+                distances[value][i] = abs(r - goal_row) + abs(c - goal_col)
+
+    # moves[blank] = [(direction, target)], directions 0..3 so that inverse = direction ^ 1
+    names = ('up', 'down', 'left', 'right')
+    moves = [[(names.index(name), target) for name, target in entries] for entries in blank_moves(size)]
+
+    path = []
+    nodes = 0
+    found = -1
+
+    def search(g, bound, h, blank, previous):
+        nonlocal nodes
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0 and board == goal:
+            return found
+        if stats:
+            stats.expand(len(path))  # The frontier of a depth-first search is its current path
+        minimum = float('inf')
+        for direction, target in moves[blank]:
+            if direction == previous ^ 1:
+                if stats:
+                    stats.duplicate()
+                continue
+            nodes += 1
+            if stats:
+                stats.generate()
+            if budget:
+                budget.charge()
+            tile = board[target]
+            board[blank], board[target] = tile, 0
+            if heuristic:
+                new_h = heuristic(board)
+            else:
+                new_h = h - distances[tile][target] + distances[tile][blank]
+            path.append(direction)
+            result = search(g + 1, bound, new_h, target, direction)
+            if result == found:
+                return found
+            path.pop()
+            board[blank], board[target] = 0, tile
+            if result < minimum:
+                minimum = result
+        return minimum
+
+    blank = board.index(0)
+    h = heuristic(board) if heuristic else sum(distances[value][i] for i, value in enumerate(board))
+    bound = h
+    iterations = []
+    while True:
+        nodes = 0
+        result = search(0, bound, h, blank, -2)
+        iterations.append((bound, nodes))
+        if result == found:
+            break
+        bound = result
+
+    # Replay the move list from the start board to build the (move, state) path
+    board = [value for row in initial_state for value in row]
+    blank = board.index(0)
+    solution = []
+    for direction in path:
+        target = next(t for d, t in moves[blank] if d == direction)
+        board[blank], board[target] = board[target], 0
+        blank = target
+        solution.append((names[direction], tuple(tuple(board[r * size:(r + 1) * size]) for r in range(size))))
+    return solution, iterations
+
 if __name__ == '__main__':
     initial_state = (
         (1, 2, 3),
@@ -0,0 +1,172 @@
+import mmap
+import struct
+import sys
+import time
+from collections import deque
+
+from Puzzle import blank_moves, is_solvable
+
+MAGIC = b'PTB1'
+UNREACHABLE = 255
+
+
+def flatten(board):
+    """Accepts a flat sequence or a list/tuple of rows and returns a flat list."""
+    if board and isinstance(board[0], (list, tuple)):
+        return [value for row in board for value in row]
+    return list(board)
+
+
+def rank(board):
+    """Myrvold-Ruskey linear-time rank of a permutation of 0..n-1."""
+    n = len(board)
+    perm = list(board)
+    inverse = [0] * n
+    for i, value in enumerate(perm):
+        inverse[value] = i
+    result = 0
+    multiplier = 1
+    for m in range(n, 1, -1):
+        s = perm[m - 1]
+        j = inverse[m - 1]
+        perm[m - 1], perm[j] = perm[j], perm[m - 1]
+        inverse[s], inverse[m - 1] = j, m - 1
+        result += s * multiplier
+        multiplier *= m
+    return result
+
+
+def unrank(r, n):
+    """Inverse of rank."""
+    perm = list(range(n))
+    for m in range(n, 0, -1):
+        r, digit = divmod(r, m)
+        perm[m - 1], perm[digit] = perm[digit], perm[m - 1]
+    return perm
+
+
+class DistanceTable:
+    """
+    Exact distance-to-goal for every permutation of a small sliding puzzle,
+    indexed by its Myrvold-Ruskey rank. One byte per permutation (9! bytes for
+    the 8-puzzle); boards of the wrong parity are marked UNREACHABLE.
+    """
+
+    def __init__(self, goal, table, size=3):
+        self.size = size
+        self.goal = tuple(goal)
+        self.table = table  # bytearray, or memoryview over an mmap after load()
+        self.moves = blank_moves(size)
+        self._mmap = None
+
+    @classmethod
+    def build(cls, goal=None, size=3):
+        """One retrograde BFS from the goal over the whole reachable space."""
+        cells = size * size
+        goal = flatten(goal) if goal else list(range(1, cells)) + [0]
+        moves = blank_moves(size)
+        total = 1
+        for m in range(2, cells + 1):
+            total *= m
+
+        table = bytearray([UNREACHABLE]) * total
+        start = rank(goal)
+        table[start] = 0
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            board = unrank(current, cells)
+            distance = table[current] + 1
+            blank = board.index(0)
+            for _, target in moves[blank]:
+                board[blank], board[target] = board[target], 0
+                neighbor = rank(board)
+                if table[neighbor] == UNREACHABLE:
+                    table[neighbor] = distance
+                    queue.append(neighbor)
+                board[target], board[blank] = board[blank], 0
+        return cls(goal, table, size)
+
+    def save(self, path):
+        """Writes a header with the goal layout followed by the raw table."""
+        header = struct.pack('<4sB', MAGIC, self.size) + bytes(self.goal)
+        header += b'\0' * (-len(header) % 8)
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.write(self.table)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps a table written by save()."""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size = struct.unpack_from('<4sB', mapped)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a puzzle distance table")
+        cells = size * size
+        goal = tuple(mapped[5:5 + cells])
+        offset = 5 + cells
+        offset += -offset % 8
+        table = cls(goal, memoryview(mapped)[offset:], size)
+        table._mmap = mapped
+        return table
+
+    def to_rows(self, board):
+        return tuple(tuple(board[r * self.size:(r + 1) * self.size]) for r in range(self.size))
+
+    def distance(self, board):
+        """Optimal number of moves to the goal, or None if the board is unsolvable."""
+        board = flatten(board)
+        if not is_solvable(self.to_rows(board), self.to_rows(self.goal)):
+            return None
+        return self.table[rank(board)]
+
+    def solve(self, board):
+        """
+        Optimal solution by greedy descent through the table: O(depth) lookups.
+
+        Returns:
+        - path: list of (move, state) like Puzzle.solve_8_puzzle, or None if unsolvable.
+        """
+        board = flatten(board)
+        distance = self.distance(board)
+        if distance is None:
+            return None
+
+        path = []
+        blank = board.index(0)
+        while distance:
+            for move, target in self.moves[blank]:
+                board[blank], board[target] = board[target], 0
+                if self.table[rank(board)] == distance - 1:
+                    path.append((move, self.to_rows(board)))
+                    blank = target
+                    distance -= 1
+                    break
+                board[target], board[blank] = board[blank], 0
+        return path
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else 'pdb/8puzzle.table'
+
+    started = time.perf_counter()
+    table = DistanceTable.build()
+    print(f"Built in {time.perf_counter() - started:.2f}s, "
+          f"{sum(1 for d in table.table if d != UNREACHABLE)} reachable states, "
+          f"max distance {max(d for d in table.table if d != UNREACHABLE)}")
+
+    import os
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    table.save(path)
+    table = DistanceTable.load(path)
+
+    initial_state = [[1, 2, 3], [4, 5, 6], [0, 7, 8]]
+    solution = table.solve(initial_state)
+    print(f"Distance: {table.distance(initial_state)}")
+    for move, state in solution:
+        print(f"Move: {move}")
+        for row in state:
+            print(row)
+        print("---")
+    print("Unsolvable board:", table.solve([[2, 1, 3], [4, 5, 6], [7, 8, 0]]))
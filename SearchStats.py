@@ -0,0 +1,117 @@
+import functools
+import json
+import sys
+import time
+import tracemalloc
+
+
+class SearchStats:
+    """
+    Counters filled in by any search entry point that is given stats=...
+
+    - generated: successor states created
+    - expanded: states whose successors were generated
+    - duplicates: successors or queue entries dropped because the state was already seen
+    - peak_frontier: largest open list / queue / recursion depth observed
+    - wall_time: seconds spent inside the instrumented call(s)
+    - peak_memory: bytes allocated at peak (only with track_memory=True, via tracemalloc)
+
+    An optional 'trace' sink (e.g. JsonLinesTrace, or any callable taking an
+    event dict) receives one event per expansion.
+    """
+
+    def __init__(self, trace=None, track_memory=False):
+        self.generated = 0
+        self.expanded = 0
+        self.duplicates = 0
+        self.peak_frontier = 0
+        self.wall_time = 0.0
+        self.peak_memory = None
+        self.trace = trace
+        self.track_memory = track_memory
+        self._depth = 0
+        self._started = None
+        self._owns_tracemalloc = False
+
+    def __enter__(self):
+        # Re-entrant so that instrumented entry points can call each other
+        self._depth += 1
+        if self._depth == 1:
+            if self.track_memory:
+                self._owns_tracemalloc = not tracemalloc.is_tracing()
+                if self._owns_tracemalloc:
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            self.wall_time += time.perf_counter() - self._started
+            if self.track_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peak_memory = max(self.peak_memory or 0, peak)
+                if self._owns_tracemalloc:
+                    tracemalloc.stop()
+        return False
+
+    def expand(self, frontier_size=0, state=None):
+        """Records one expansion; frontier_size is the open list size at that moment."""
+        self.expanded += 1
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+        if self.trace is not None:
+            self.trace({'event': 'expand', 'n': self.expanded, 'frontier': frontier_size, 'state': state})
+
+    def generate(self, count=1):
+        self.generated += count
+
+    def duplicate(self, count=1):
+        self.duplicates += count
+
+    def as_dict(self):
+        return {
+            'generated': self.generated,
+            'expanded': self.expanded,
+            'duplicates': self.duplicates,
+            'peak_frontier': self.peak_frontier,
+            'wall_time': round(self.wall_time, 6),
+            'peak_memory': self.peak_memory,
+        }
+
+    def __repr__(self):
+        return 'SearchStats(' + ', '.join(f'{key}={value}' for key, value in self.as_dict().items()) + ')'
+
+
+class JsonLinesTrace:
+    """Trace sink writing every 'every'-th event as one JSON line to a file object or path."""
+
+    def __init__(self, target=sys.stderr, every=1):
+        self.file = open(target, 'w') if isinstance(target, str) else target
+        self.every = every
+        self.count = 0
+
+    def __call__(self, event):
+        self.count += 1
+        if self.count % self.every == 0:
+            self.file.write(json.dumps(event, default=str) + '\n')
+
+    def close(self):
+        if self.file not in (sys.stdout, sys.stderr):
+            self.file.close()
+
+
+def instrumented(search):
+    """
+    Decorator for search entry points that take a 'stats' keyword: when a
+    SearchStats is passed, the call is timed (and memory-tracked) through it.
+    """
+    @functools.wraps(search)
+    def wrapper(*args, **kwargs):
+        stats = kwargs.get('stats')
+        if stats is None:
+            return search(*args, **kwargs)
+        with stats:
+            return search(*args, **kwargs)
+    return wrapper
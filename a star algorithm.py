@@ -1,6 +1,10 @@
 import heapq
 
-def a_star(graph, start, goal, h):
+from SearchStats import SearchStats, instrumented
+
+
+@instrumented
+def a_star(graph, start, goal, h, stats=None):
     open_set = []
     heapq.heappush(open_set, (0, start))
     came_from = {}
@@ -20,6 +24,8 @@ def a_star(graph, start, goal, h):
             path.append(start)
             return path[::-1], g_score[goal]
         
+        if stats:
+            stats.expand(len(open_set) + 1, current)
         for neighbor, cost in graph[current].items():
             tentative_g_score = g_score[current] + cost
             if tentative_g_score < g_score[neighbor]:
@@ -27,6 +33,10 @@ def a_star(graph, start, goal, h):
                 g_score[neighbor] = tentative_g_score
                 f_score[neighbor] = tentative_g_score + h[neighbor]
                 heapq.heappush(open_set, (f_score[neighbor], neighbor))
+                if stats:
+                    stats.generate()
+            elif stats:
+                stats.duplicate()
     
     return None, float('inf')
 
@@ -41,5 +51,7 @@ heuristic = {'A': 7, 'B': 6, 'C': 2, 'D': 0}  # Estimated costs to goal 'D'
 
 start_node = 'A'
 goal_node = 'D'
-path, cost = a_star(graph, start_node, goal_node, heuristic)
+stats = SearchStats()
+path, cost = a_star(graph, start_node, goal_node, heuristic, stats=stats)
 print(f"Optimal path: {path} with cost {cost}")
+print(stats)
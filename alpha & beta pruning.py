@@ -1,29 +1,46 @@
 import math
-def alpha_beta_pruning(depth, node_index, is_max, values, alpha, beta):
+
+from SearchStats import SearchStats, instrumented
+
+@instrumented
+def alpha_beta_pruning(depth, node_index, is_max, values, alpha, beta, verbose=False, stats=None):
     if depth == 3: 
         return values[node_index] 
+    if stats:
+        stats.expand(depth, node_index)
     if is_max:
         max_eval = -math.inf
         for i in range(2):
-            eval = alpha_beta_pruning(depth + 1, node_index * 2 + i, False, values, alpha, beta)
+            if stats:
+                stats.generate()
+            eval = alpha_beta_pruning(depth + 1, node_index * 2 + i, False, values, alpha, beta, verbose, stats=stats)
             max_eval = max(max_eval, eval)
             alpha = max(alpha, eval)
-            print(f"Max Node: Depth {depth}, Node {node_index}, Alpha {alpha}, Beta {beta}")
+            if verbose:
+                print(f"Max Node: Depth {depth}, Node {node_index}, Alpha {alpha}, Beta {beta}")
             if beta <= alpha:
-                print("Pruning occurs")
+                if verbose:
+                    print("Pruning occurs")
                 break
         return max_eval
     else:
         min_eval = math.inf
         for i in range(2):
-            eval = alpha_beta_pruning(depth + 1, node_index * 2 + i, True, values, alpha, beta)
+            if stats:
+                stats.generate()
+            eval = alpha_beta_pruning(depth + 1, node_index * 2 + i, True, values, alpha, beta, verbose, stats=stats)
             min_eval = min(min_eval, eval)
             beta = min(beta, eval)
-            print(f"Min Node: Depth {depth}, Node {node_index}, Alpha {alpha}, Beta {beta}")
+            if verbose:
+                print(f"Min Node: Depth {depth}, Node {node_index}, Alpha {alpha}, Beta {beta}")
             if beta <= alpha:
-                print("Pruning occurs")
+                if verbose:
+                    print("Pruning occurs")
                 break
         return min_eval
-values = [3, 5, 6, 9, 1, 2, 0, -1]
-result = alpha_beta_pruning(0, 0, True, values, -math.inf, math.inf)
-print("Final optimal value:", result)
+if __name__ == "__main__":
+    values = [3, 5, 6, 9, 1, 2, 0, -1]
+    stats = SearchStats()
+    result = alpha_beta_pruning(0, 0, True, values, -math.inf, math.inf, verbose=True, stats=stats)
+    print("Final optimal value:", result)
+    print(stats)
@@ -1,6 +1,10 @@
 from itertools import permutations
 
-def solve_cryptarithmetic(words, result):
+from SearchStats import SearchStats, instrumented
+
+@instrumented
+def solve_cryptarithmetic(words, result, stats=None):
+    """Brute force over digit permutations; 'stats' takes a SearchStats to fill in."""
     unique_letters = set("".join(words) + result)
     
     if len(unique_letters) > 10:
@@ -13,6 +17,9 @@ def solve_cryptarithmetic(words, result):
     # Try all possible digit assignments
     for perm in permutations(range(10), len(unique_letters)):
         mapping = dict(zip(unique_letters, perm))
+        if stats:
+            stats.expand()
+            stats.generate()
         
         # Ensure no number starts with zero
         if any(mapping[word[0]] == 0 for word in words + [result]):
@@ -31,8 +38,179 @@ def solve_cryptarithmetic(words, result):
 
     print("No solution found.")
 
+def columns_of(words, result):
+    """Per column, right to left: ([(operand letter, times it occurs in the column)], result letter)."""
+    columns = []
+    for c in range(len(result)):
+        counts = {}
+        for word in words:
+            if c < len(word):
+                counts[word[-1 - c]] = counts.get(word[-1 - c], 0) + 1
+        columns.append((list(counts.items()), result[-1 - c]))
+    return columns
+
+@instrumented
+def solve_columnwise(words, result, all_solutions=False, stats=None):
+    """
+    Solves the addition column by column from the right, carrying into the
+    next column. Only the operand letters of the current column are branched
+    on; the result letter is then fixed by the column sum, and the column's
+    last open letter is only given digits whose units digit fits the result,
+    so a wrong partial assignment is rejected as soon as its column is complete.
+
+    Returns:
+    - solutions: list of {letter: digit}; at most one unless all_solutions is set.
+    - stats: {'nodes': number of letter-to-digit assignments tried}.
+
+    A SearchStats passed as 'stats' receives the full counters as well.
+    """
+    letters = set("".join(words) + result)
+    # No leading zeros, so an operand longer than the result can never fit
+    if len(letters) > 10 or max(map(len, words)) > len(result):
+        return [], {'nodes': 0}
+
+    leading = {word[0] for word in words + [result]}
+    columns = columns_of(words, result)
+    digit_of = {}
+    used = [False] * 10
+    solutions = []
+    nodes = 0
+
+    def place(letter, digit, depth):
+        nonlocal nodes
+        nodes += 1
+        if stats:
+            stats.expand(depth, letter)
+            stats.generate()
+        digit_of[letter] = digit
+        used[digit] = True
+
+    def remove(letter):
+        used[digit_of.pop(letter)] = False
+
+    def next_column(c, carry):
+        if c == len(columns):
+            if carry:
+                return False
+            solutions.append(dict(digit_of))
+            return not all_solutions
+        return fill_column(c, carry, 0, 0)
+
+    def fill_column(c, carry, position, total):
+        operands, result_letter = columns[c]
+        if position < len(operands):
+            letter, count = operands[position]
+            if letter in digit_of:
+                return fill_column(c, carry, position + 1, total + count * digit_of[letter])
+            # The column's last open letter must already give a usable units digit
+            rest = operands[position + 1:]
+            last = all(other in digit_of for other, _ in rest)
+            if last:
+                # Operands after this one are all assigned but not yet added into 'total'
+                assigned = total + carry + sum(n * digit_of[other] for other, n in rest)
+            for digit in range(1 if letter in leading else 0, 10):
+                if used[digit]:
+                    continue
+                if last:
+                    units = (assigned + count * digit) % 10
+                    if result_letter == letter:
+                        if units != digit:
+                            continue
+                    elif result_letter in digit_of:
+                        if units != digit_of[result_letter]:
+                            continue
+                    elif used[units] or units == digit or (units == 0 and result_letter in leading):
+                        continue
+                place(letter, digit, len(digit_of))
+                if fill_column(c, carry, position + 1, total + count * digit):
+                    return True
+                remove(letter)
+            return False
+
+        total += carry
+        digit, carry = total % 10, total // 10
+        if result_letter in digit_of:
+            return digit_of[result_letter] == digit and next_column(c + 1, carry)
+        if used[digit] or (digit == 0 and result_letter in leading):
+            return False
+        place(result_letter, digit, len(digit_of))
+        found = next_column(c + 1, carry)
+        remove(result_letter)
+        return found
+
+    next_column(0, 0)
+    return solutions, {'nodes': nodes}
+
+def brute_force_solutions(words, result):
+    """Every solution of the addition, by trying all digit permutations (small puzzles only)."""
+    letters = sorted(set("".join(words) + result))
+    if len(letters) > 10:
+        return []
+    leading = {word[0] for word in words + [result]}
+
+    def value(word, mapping):
+        number = 0
+        for char in word:
+            number = number * 10 + mapping[char]
+        return number
+
+    solutions = []
+    for perm in permutations(range(10), len(letters)):
+        mapping = dict(zip(letters, perm))
+        if any(mapping[letter] == 0 for letter in leading):
+            continue
+        if sum(value(word, mapping) for word in words) == value(result, mapping):
+            solutions.append(mapping)
+    return solutions
+
+def cross_check(puzzles=400, seed=0):
+    """
+    Compares solve_columnwise(all_solutions=True) with brute force on random
+    puzzles of at most 6 letters; returns the puzzles where they disagree.
+    """
+    import random
+
+    rng = random.Random(seed)
+    mismatches = []
+    for _ in range(puzzles):
+        letters = rng.sample("ABCDEF", rng.randint(2, 6))
+        words = ["".join(rng.choice(letters) for _ in range(rng.randint(1, 3)))
+                 for _ in range(rng.randint(1, 3))]
+        result = "".join(rng.choice(letters) for _ in range(rng.randint(1, 4)))
+        expected = sorted(sorted(s.items()) for s in brute_force_solutions(words, result))
+        found = sorted(sorted(s.items()) for s in solve_columnwise(words, result, all_solutions=True)[0])
+        if found != expected:
+            mismatches.append((words, result))
+    return mismatches
+
 # Example usage
-words = ["SEND", "MORE"]
-result = "MONEY"
+if __name__ == "__main__":
+    import sys
+
+    words = ["SEND", "MORE"]
+    result = "MONEY"
+
+    stats = SearchStats()
+    solve_cryptarithmetic(words, result, stats=stats)
+    print("Brute force:", stats)
+
+    solutions, counts = solve_columnwise(words, result)
+    print("Column-wise:", solutions[0], f"({counts['nodes']} nodes)")
+
+    # Every solution, and a long multi-operand sum over all ten digits
+    for words, result in [(["TWO", "TWO"], "FOUR"),
+                          ("SO MANY MORE MEN SEEM TO SAY THAT THEY MAY SOON TRY TO STAY AT HOME SO AS TO SEE "
+                           "OR HEAR THE SAME ONE MAN TRY TO MEET THE TEAM ON THE MOON AS HE HAS AT THE OTHER TEN".split(),
+                           "TESTS")]:
+        stats = SearchStats()
+        solutions, counts = solve_columnwise(words, result, all_solutions=True, stats=stats)
+        print(f"{' + '.join(words[:4])}{' + ...' if len(words) > 4 else ''} = {result}: "
+              f"{len(solutions)} solutions, {counts['nodes']} nodes in {stats.wall_time:.3f}s")
 
-solve_cryptarithmetic(words, result)
+    # python "cript arthemetic.py" --check: also compare with brute force on random puzzles (about 10 s)
+    if "--check" in sys.argv[1:]:
+        mismatches = cross_check()
+        print(f"Column-wise vs brute force on 400 random puzzles: {len(mismatches)} mismatches")
+        for words, result in mismatches[:5]:
+            print(f"  {' + '.join(words)} = {result}")
+        sys.exit(1 if mismatches else 0)